@@ -24,6 +24,7 @@ import numpy as np
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from config import GOOGLE_SHEET_ID_DATA
 from google_sheets_data import GoogleSheetsData
+from patrones_data import canonical_item_url
 
 class AnalizadorHistoricoData:
     def __init__(self):
@@ -214,6 +215,14 @@ class AnalizadorHistoricoData:
             df = df[df['URL'].notna()]
             df = df[df['URL'] != 'No especificado']
         
+        # Clave canonica: la misma moto con query o barra final no cuenta como otra
+        df = df.copy()
+        df['URL'] = df['URL'].map(canonical_item_url)
+        duplicadas = df['URL'].duplicated().sum()
+        if duplicadas > 0:
+            print(f"AVISO: {duplicadas} filas repetidas (misma URL canonica) descartadas")
+            df = df.drop_duplicates(subset='URL', keep='first')
+        
         return df
         
     def leer_datos_scraper(self):
@@ -400,6 +409,9 @@ class AnalizadorHistoricoData:
             if columnas_faltantes:
                 raise Exception(f"Columnas faltantes en historico: {columnas_faltantes}")
             
+            # Misma clave canonica que los datos nuevos del scraper
+            df_historico['URL'] = df_historico['URL'].map(canonical_item_url)
+            
             self.stats['total_historico'] = len(df_historico)
             print(f"Motos en historico: {self.stats['total_historico']:,}")
             
@@ -694,6 +706,7 @@ class AnalizadorHistoricoData:
                 df_historico_final, 
                 self.fecha_display
             )
+            self.gs_handler.mostrar_estadisticas_api()
             
             if not success:
                 print("ERROR: No se pudo guardar el historico en Google Sheets")
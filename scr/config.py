@@ -11,6 +11,86 @@ load_dotenv()
 # Google Sheets Configuration
 GOOGLE_SHEET_ID_DATA = os.getenv('GOOGLE_SHEET_ID_DATA', '')
 
+# Rendimiento - Navegadores en paralelo para extraer anuncios (1 = secuencial)
+AD_WORKERS = max(1, int(os.getenv('AD_WORKERS', '1')))
+
+# Rendimiento - Cuentas procesadas en paralelo, cada una con su navegador (1 = secuencial)
+ACCOUNT_WORKERS = max(1, int(os.getenv('ACCOUNT_WORKERS', '1')))
+
+# Rendimiento - Modo de extraccion por anuncio
+# 'classic': llamadas WebDriver por campo | 'snapshot': un solo volcado del DOM por anuncio
+EXTRACTION_MODE = os.getenv('EXTRACTION_MODE', 'classic').lower()
+
+# Rendimiento - Sin esperas implicitas (una espera explicita "pagina lista" por anuncio)
+ZERO_IMPLICIT_WAIT = os.getenv('ZERO_IMPLICIT_WAIT', 'false').lower() == 'true'
+
+# Rendimiento - Ruta rapida HTTP: JSON embebido de la pagina, Selenium solo si falta
+HTTP_FAST_PATH = os.getenv('HTTP_FAST_PATH', 'false').lower() == 'true'
+HTTP_MAX_CONNECTIONS = max(1, int(os.getenv('HTTP_MAX_CONNECTIONS', '8')))
+
+# Rendimiento - Refresco en dos niveles: anuncios ya conocidos solo actualizan precio/visitas/likes
+STATS_REFRESH = os.getenv('STATS_REFRESH', 'false').lower() == 'true'
+
+# Rendimiento - Bloqueo de recursos por CDP: images,fonts,media,trackers (vacio = sin bloqueo)
+BLOCK_RESOURCES = [c.strip().lower() for c in os.getenv('BLOCK_RESOURCES', '').split(',') if c.strip()]
+# Excepciones por patron (no por URL): se descarta cada patron de bloqueo que contenga la entrada
+BLOCK_ALLOWLIST = [c.strip() for c in os.getenv('BLOCK_ALLOWLIST', '').split(',') if c.strip()]
+
+# Rendimiento - Reciclar Chrome cada N paginas o al superar X MB de RSS (0 = sin limite)
+BROWSER_MAX_PAGES = max(0, int(os.getenv('BROWSER_MAX_PAGES', '0')))
+BROWSER_MAX_RSS_MB = max(0, int(os.getenv('BROWSER_MAX_RSS_MB', '0')))
+
+# Rendimiento - Pipeline: el navegador carga el siguiente anuncio mientras otro hilo parsea el actual
+# (usa la extraccion por snapshot)
+PIPELINE_MODE = os.getenv('PIPELINE_MODE', 'false').lower() == 'true'
+PIPELINE_PARSERS = max(1, int(os.getenv('PIPELINE_PARSERS', '2')))
+
+# Rendimiento - Presupuesto de tiempo por anuncio (s, 0 = sin limite); los lentos se reintentan al final
+AD_DEADLINE = max(0.0, float(os.getenv('AD_DEADLINE', '0')))
+AD_RETRY_DEADLINE = max(0.0, float(os.getenv('AD_RETRY_DEADLINE', '0'))) or AD_DEADLINE * 2
+
+# Rendimiento - Estrategia de carga de Chrome: normal | eager (DOM listo) | none (sin esperar)
+# Con eager/none cada anuncio espera una condicion propia (URL + titulo + precio)
+PAGE_LOAD_STRATEGY = os.getenv('PAGE_LOAD_STRATEGY', 'normal').lower()
+if PAGE_LOAD_STRATEGY not in ('normal', 'eager', 'none'):
+    PAGE_LOAD_STRATEGY = 'normal'
+
+# Rendimiento - Pestañas en paralelo dentro de un solo navegador (1 = una pestaña)
+BROWSER_TABS = max(1, int(os.getenv('BROWSER_TABS', '1')))
+
+# Rendimiento - Capturar las respuestas JSON del listado del perfil (log de red de Chrome)
+# Los anuncios con todos los datos en el listado no se visitan
+LISTING_CAPTURE = os.getenv('LISTING_CAPTURE', 'false').lower() == 'true'
+
+# Rendimiento - Guardado del historico en una sola peticion batchUpdate (las 3 hojas)
+# Si el cuerpo supera SHEETS_MAX_PAYLOAD_MB se guarda hoja a hoja como antes
+SHEETS_BATCH_WRITE = os.getenv('SHEETS_BATCH_WRITE', 'false').lower() == 'true'
+SHEETS_MAX_PAYLOAD_MB = max(0.5, float(os.getenv('SHEETS_MAX_PAYLOAD_MB', '9')))
+
+# Rendimiento - Data_Historico por diferencias frente a lo leido al empezar (sin reescribir la hoja)
+# Las motos nuevas se insertan en su posicion por KM; si las existentes cambian de orden, escritura completa
+SHEETS_DELTA_WRITE = os.getenv('SHEETS_DELTA_WRITE', 'false').lower() == 'true'
+
+# Rendimiento - Cuota del API de Sheets (por usuario y minuto): lecturas y escrituras
+# espaciadas con un cubo de fichas (0 = sin espaciar); 429/5xx se reintentan con espera
+SHEETS_READS_PER_MINUTE = max(0, int(os.getenv('SHEETS_READS_PER_MINUTE', '60')))
+SHEETS_WRITES_PER_MINUTE = max(0, int(os.getenv('SHEETS_WRITES_PER_MINUTE', '60')))
+SHEETS_MAX_RETRIES = max(0, int(os.getenv('SHEETS_MAX_RETRIES', '6')))
+
+# Rendimiento - Subida por trozos de tablas grandes (MB estimados por peticion, 0 = desactivada)
+# y trozos en paralelo
+SHEETS_CHUNK_MB = max(0.0, float(os.getenv('SHEETS_CHUNK_MB', '0')))
+SHEETS_UPLOAD_WORKERS = max(1, int(os.getenv('SHEETS_UPLOAD_WORKERS', '2')))
+
+# Reanudar la extraccion del dia desde el diario local (equivale a --resume)
+RESUME = os.getenv('SCRAPER_RESUME', 'false').lower() == 'true'
+
+# Rendimiento - Espera maxima (s) a que aparezcan anuncios nuevos tras "Ver mas productos"
+LOAD_MORE_TIMEOUT = max(0.5, float(os.getenv('LOAD_MORE_TIMEOUT', '5')))
+
+# Directorio de cache local entre ejecuciones (tamaño de cuentas, etc.)
+CACHE_DIR = os.getenv('SCRAPER_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache'))
+
 # Para testing local - RUTA CORREGIDA
 LOCAL_CREDENTIALS_FILE = "../credentials/service-account.json"
 
@@ -0,0 +1,146 @@
+"""
+Cliente HTTP de gspread con control de cuota del API de Sheets
+Las cuotas son por minuto (lecturas y escrituras por separado): un 429 o un 5xx
+al subir ya no tumba una ejecucion de horas de scraping
+
+- Cubo de fichas por tipo de llamada: GET = lectura, el resto = escritura
+- Reintentos con espera exponencial y jitter completo ante 429/500/502/503/504
+  y errores de conexion; respeta Retry-After si el API lo envia
+- Un 5xx o un corte pueden llegar con la llamada ya aplicada: solo se repiten las
+  idempotentes (GET y escrituras de valores). addSheet, append... solo ante 429
+- Contadores: llamadas, esperas por cuota, reintentos y errores por codigo
+- Seguro entre hilos (subidas por trozos en paralelo)
+- Se instala con gspread.authorize(credentials, http_client=QuotaHTTPClient)
+"""
+
+import random
+import threading
+import time
+
+from gspread.exceptions import APIError
+from gspread.http_client import HTTPClient
+from requests.exceptions import ConnectionError, Timeout
+
+from config import SHEETS_READS_PER_MINUTE, SHEETS_WRITES_PER_MINUTE, SHEETS_MAX_RETRIES
+
+RETRY_STATUS = (429, 500, 502, 503, 504)
+QUOTA_STATUS = 429    # rechazada por cuota antes de aplicarse: siempre se puede repetir
+BACKOFF_BASE = 1.0    # segundos del primer reintento (maximo, con jitter)
+BACKOFF_MAX = 64.0    # techo de la espera entre reintentos
+BUCKET_BURST = 10     # llamadas seguidas permitidas antes de empezar a espaciar
+
+class TokenBucket:
+    """Cubo de fichas: per_minute llamadas por minuto con rafagas de hasta burst"""
+
+    def __init__(self, per_minute, burst=BUCKET_BURST):
+        self.rate = per_minute / 60.0
+        self.capacity = float(max(1, min(burst, per_minute)))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Reserva una ficha; devuelve los segundos esperados (0 si habia ficha)"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+        # Se duerme fuera del lock: la ficha ya esta reservada
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+# Escrituras de valores: repetirlas deja la hoja igual (values:append no, añade otra vez)
+IDEMPOTENT_VALUES_SUFFIXES = (':batchUpdate', ':clear', ':batchClear')
+
+def is_idempotent(method, endpoint):
+    """GET, PUT de valores y values:batchUpdate/clear; no spreadsheets:batchUpdate (addSheet...)"""
+    method = method.upper()
+    if method == 'GET':
+        return True
+    path = str(endpoint).split('?', 1)[0]
+    if '/values' not in path:
+        return False
+    if method == 'PUT':
+        return True
+    return method == 'POST' and path.endswith(IDEMPOTENT_VALUES_SUFFIXES)
+
+def _retry_after(error):
+    """Segundos de la cabecera Retry-After, si la respuesta la trae"""
+    try:
+        return float(error.response.headers.get('Retry-After'))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+class QuotaHTTPClient(HTTPClient):
+    """HTTPClient de gspread que espacia las llamadas y reintenta los fallos temporales"""
+
+    def __init__(self, auth, session=None):
+        super().__init__(auth, session)
+        self.buckets = {
+            'lectura': TokenBucket(SHEETS_READS_PER_MINUTE) if SHEETS_READS_PER_MINUTE else None,
+            'escritura': TokenBucket(SHEETS_WRITES_PER_MINUTE) if SHEETS_WRITES_PER_MINUTE else None,
+        }
+        self.stats = {
+            'lecturas': 0, 'escrituras': 0, 'esperas_cuota': 0, 'tiempo_cuota': 0.0,
+            'reintentos': 0, 'tiempo_reintentos': 0.0, 'errores': {},
+        }
+        self._stats_lock = threading.Lock()
+
+    def _count(self, **increments):
+        with self._stats_lock:
+            for key, value in increments.items():
+                self.stats[key] += value
+
+    def _count_error(self, code):
+        with self._stats_lock:
+            self.stats['errores'][code] = self.stats['errores'].get(code, 0) + 1
+
+    def request(self, method, endpoint, *args, **kwargs):
+        kind = 'lectura' if method.upper() == 'GET' else 'escritura'
+        self._count(**{'lecturas' if kind == 'lectura' else 'escrituras': 1})
+        idempotent = is_idempotent(method, endpoint)
+
+        attempt = 0
+        while True:
+            bucket = self.buckets[kind]
+            if bucket is not None:
+                waited = bucket.acquire()
+                if waited:
+                    self._count(esperas_cuota=1, tiempo_cuota=waited)
+
+            try:
+                return super().request(method, endpoint, *args, **kwargs)
+            except APIError as e:
+                code = getattr(e, 'code', None)
+                self._count_error(code)
+                if code not in RETRY_STATUS or attempt >= SHEETS_MAX_RETRIES:
+                    raise
+                if code != QUOTA_STATUS and not idempotent:
+                    raise
+                delay = _retry_after(e)
+            except (ConnectionError, Timeout):
+                self._count_error('conexion')
+                if attempt >= SHEETS_MAX_RETRIES or not idempotent:
+                    raise
+                delay = None
+
+            # Espera exponencial con jitter completo (Retry-After manda si viene)
+            if delay is None:
+                delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+            attempt += 1
+            self._count(reintentos=1, tiempo_reintentos=delay)
+            print(f"[CUOTA] {method} {kind}: reintento {attempt}/{SHEETS_MAX_RETRIES} en {delay:.1f}s")
+            time.sleep(delay)
+
+    def print_report(self):
+        """Resumen de llamadas, esperas por cuota y reintentos"""
+        stats = self.stats
+        print(f"CUOTA SHEETS: {stats['lecturas']} lecturas | {stats['escrituras']} escrituras | "
+              f"{stats['esperas_cuota']} esperas por cuota ({stats['tiempo_cuota']:.1f}s) | "
+              f"{stats['reintentos']} reintentos ({stats['tiempo_reintentos']:.1f}s)")
+        if stats['errores']:
+            print(f"• Errores: {', '.join(f'{code}: {count}' for code, count in stats['errores'].items())}")
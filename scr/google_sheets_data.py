@@ -11,8 +11,13 @@ import os
 import time
 import hashlib
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
+from config import SHEETS_BATCH_WRITE, SHEETS_MAX_PAYLOAD_MB, SHEETS_DELTA_WRITE, SHEETS_CHUNK_MB, SHEETS_UPLOAD_WORKERS
+from patrones_data import canonical_item_url
+from cuota_data import QuotaHTTPClient
+
 class GoogleSheetsData:
     def __init__(self, credentials_json_string=None, sheet_id=None, credentials_file=None):
         """
@@ -40,15 +45,66 @@ class GoogleSheetsData:
         else:
             raise Exception("Se necesitan credenciales validas (JSON string o archivo)")
         
-        self.client = gspread.authorize(self.credentials)
+        # Transporte con control de cuota: espacia llamadas y reintenta 429/5xx
+        self.client = gspread.authorize(self.credentials, http_client=QuotaHTTPClient)
         self.sheet_id = sheet_id
         
+        # Celdas de Data_Historico tal como se leyeron (base de la escritura por diferencias)
+        self.historico_grid = None
+        
+        # Cache de la ejecucion: spreadsheet abierto una vez e indice titulo -> worksheet
+        self._spreadsheet = None
+        self._hojas = None
+        self.api_stats = {'aperturas': 0, 'metadatos': 0, 'evitadas': 0}
+        
         print("CONEXION: Google Sheets establecida correctamente")
         
+    def abrir_spreadsheet(self):
+        """Spreadsheet de la ejecucion (open_by_key solo la primera vez)"""
+        if self._spreadsheet is None:
+            self._spreadsheet = self.client.open_by_key(self.sheet_id)
+            self.api_stats['aperturas'] += 1
+        else:
+            self.api_stats['evitadas'] += 1
+        return self._spreadsheet
+    
+    def indice_hojas(self):
+        """Titulo -> worksheet, con una sola lectura de metadatos hasta que se invalide"""
+        if self._hojas is None:
+            self._hojas = {ws.title: ws for ws in self.abrir_spreadsheet().worksheets()}
+            self.api_stats['metadatos'] += 1
+        else:
+            self.api_stats['evitadas'] += 1
+        return self._hojas
+    
+    def hoja(self, nombre):
+        """Worksheet por titulo desde el indice; gspread.WorksheetNotFound si no existe"""
+        hojas = self.indice_hojas()
+        if nombre not in hojas:
+            raise gspread.WorksheetNotFound(nombre)
+        return hojas[nombre]
+    
+    def crear_hoja(self, nombre, rows, cols):
+        """add_worksheet registrando la hoja nueva en el indice"""
+        worksheet = self.abrir_spreadsheet().add_worksheet(title=nombre, rows=rows, cols=cols)
+        if self._hojas is not None:
+            self._hojas[nombre] = worksheet
+        return worksheet
+    
+    def invalidar_indice_hojas(self):
+        """Tras crear, borrar o redimensionar hojas por batchUpdate: se relee al usarlo"""
+        self._hojas = None
+    
+    def mostrar_estadisticas_api(self):
+        """Llamadas de apertura/metadatos hechas y evitadas por la cache"""
+        stats = self.api_stats
+        print(f"API SHEETS: {stats['aperturas']} aperturas | {stats['metadatos']} lecturas de metadatos | {stats['evitadas']} llamadas evitadas por cache")
+        self.client.http_client.print_report()
+    
     def test_connection(self):
         """Probar conexion a Google Sheets"""
         try:
-            spreadsheet = self.client.open_by_key(self.sheet_id)
+            spreadsheet = self.abrir_spreadsheet()
             print(f"CONEXION: Exitosa al Sheet: {spreadsheet.title}")
             print(f"URL: https://docs.google.com/spreadsheets/d/{self.sheet_id}")
             return True
@@ -132,29 +188,23 @@ class GoogleSheetsData:
             print(f"SUBIENDO: Datos a hoja {sheet_name}")
             
             # Abrir Google Sheet
-            spreadsheet = self.client.open_by_key(self.sheet_id)
+            spreadsheet = self.abrir_spreadsheet()
             print(f"ACCEDIENDO: Sheet {spreadsheet.title}")
             
-            # Crear o limpiar worksheet
+            # Buscar o crear worksheet (subir_tabla limpia lo anterior)
             try:
-                worksheet = spreadsheet.worksheet(sheet_name)
-                worksheet.clear()
-                print(f"LIMPIANDO: Hoja {sheet_name}")
+                worksheet = self.hoja(sheet_name)
+                print(f"SOBRESCRIBIENDO: Hoja {sheet_name}")
             except gspread.WorksheetNotFound:
-                worksheet = spreadsheet.add_worksheet(
-                    title=sheet_name,
+                worksheet = self.crear_hoja(
+                    sheet_name,
                     rows=len(df_motos_clean) + 10,
                     cols=len(df_motos_clean.columns) + 2
                 )
                 print(f"CREANDO: Nueva hoja {sheet_name}")
             
-            # Preparar datos para subir (YA LIMPIADOS)
-            headers = df_motos_clean.columns.values.tolist()
-            data_rows = df_motos_clean.values.tolist()
-            all_data = [headers] + data_rows
-            
-            # Subir datos
-            worksheet.update(all_data)
+            # Subir datos YA LIMPIADOS (por trozos si la tabla es grande)
+            self.subir_tabla(worksheet, df_motos_clean)
             
             print(f"SUBIDA EXITOSA: {sheet_name}")
             print(f"DATOS: {len(df_motos_clean)} filas x {len(df_motos_clean.columns)} columnas")
@@ -173,11 +223,10 @@ class GoogleSheetsData:
         Lee datos del historico desde Google Sheets
         """
         try:
-            spreadsheet = self.client.open_by_key(self.sheet_id)
-            
             try:
-                worksheet = spreadsheet.worksheet(sheet_name)
+                worksheet = self.hoja(sheet_name)
                 data = worksheet.get_all_values()
+                self.historico_grid = data if sheet_name == "Data_Historico" and data else None
                 
                 if not data:
                     print(f"AVISO: Hoja {sheet_name} esta vacia")
@@ -216,8 +265,7 @@ class GoogleSheetsData:
         Lee los datos mas recientes del scraper desde hojas SCR
         """
         try:
-            spreadsheet = self.client.open_by_key(self.sheet_id)
-            hojas_disponibles = [worksheet.title for worksheet in spreadsheet.worksheets()]
+            hojas_disponibles = list(self.indice_hojas())
             
             print(f"DEBUG: Hojas disponibles: {hojas_disponibles}")
             
@@ -273,7 +321,7 @@ class GoogleSheetsData:
             print(f"DEBUG: Hoja mas reciente seleccionada: {hoja_reciente[0]} ({hoja_reciente[2]})")
             
             # Leer datos de la hoja mas reciente
-            worksheet = spreadsheet.worksheet(hoja_reciente[0])
+            worksheet = self.hoja(hoja_reciente[0])
             data = worksheet.get_all_values()
             
             print(f"DEBUG: Datos brutos obtenidos: {len(data)} filas")
@@ -305,133 +353,388 @@ class GoogleSheetsData:
             traceback.print_exc()
             return None, None
     
+    def preparar_hojas_historico(self, df_historico, incluir_principal=True):
+        """
+        Tablas a guardar, en orden: [(hoja, DataFrame limpio, filas extra, columnas extra)]
+        Data_Historico ordenado por KM; activas por Likes_Totales; vendidas por Fecha_Venta
+        Las hojas sin motos no se tocan
+        """
+        hojas = []
+        
+        # 1. HOJA PRINCIPAL: Data_Historico
+        if incluir_principal:
+            df_ordenado = self.ordenar_historico_completo(df_historico)
+            print("LIMPIANDO: Datos para Data_Historico")
+            hojas.append(("Data_Historico", self.limpiar_dataframe_para_sheets(df_ordenado), 50, 20))
+        
+        # 2. HOJA MOTOS_ACTIVAS (solo activas)
+        motos_activas = df_historico[df_historico['Estado'] == 'activa'].copy()
+        if not motos_activas.empty:
+            # Ordenar por Likes_Totales descendente
+            if 'Likes_Totales' in motos_activas.columns:
+                motos_activas = motos_activas.sort_values('Likes_Totales', ascending=False, na_position='last')
+            print("LIMPIANDO: Datos para Motos_Activas")
+            hojas.append(("Motos_Activas", self.limpiar_dataframe_para_sheets(motos_activas), 20, 5))
+        else:
+            print("AVISO: No hay motos activas")
+        
+        # 3. HOJA MOTOS_VENDIDAS (solo vendidas)
+        motos_vendidas = df_historico[df_historico['Estado'] == 'vendida'].copy()
+        if not motos_vendidas.empty:
+            # Ordenar por Fecha_Venta descendente
+            if 'Fecha_Venta' in motos_vendidas.columns:
+                motos_vendidas = motos_vendidas.sort_values('Fecha_Venta', ascending=False, na_position='last')
+            print("LIMPIANDO: Datos para Motos_Vendidas")
+            hojas.append(("Motos_Vendidas", self.limpiar_dataframe_para_sheets(motos_vendidas), 20, 5))
+        else:
+            print("AVISO: No hay motos vendidas")
+        
+        return hojas
+    
+    def construir_lote_hojas(self, hojas):
+        """
+        Cuerpo de un unico spreadsheets.batchUpdate para todas las hojas
+        - Hoja nueva: addSheet con sheetId explicito (las peticiones siguientes la referencian)
+        - Hoja existente: updateSheetProperties con el tamaño exacto de la tabla
+        - Valores: updateCells sobre todo el rango (lo que no cubren las filas se borra)
+        """
+        existentes = {titulo: ws.id for titulo, ws in self.indice_hojas().items()}
+        siguiente_id = max(existentes.values(), default=0) + 1
+        
+        requests = []
+        for nombre, df_clean, _, _ in hojas:
+            filas = self.filas_de_tabla(df_clean)
+            num_filas = len(filas)
+            num_columnas = max(len(fila) for fila in filas)
+            grid = {'rowCount': num_filas, 'columnCount': num_columnas}
+            
+            if nombre in existentes:
+                sheet_id = existentes[nombre]
+                requests.append({'updateSheetProperties': {
+                    'properties': {'sheetId': sheet_id, 'gridProperties': grid},
+                    'fields': 'gridProperties(rowCount,columnCount)'
+                }})
+                print(f"LOTE: {nombre} existente -> {num_filas} filas x {num_columnas} columnas")
+            else:
+                sheet_id = siguiente_id
+                siguiente_id += 1
+                requests.append({'addSheet': {
+                    'properties': {'sheetId': sheet_id, 'title': nombre, 'gridProperties': grid}
+                }})
+                print(f"LOTE: {nombre} nueva (sheetId {sheet_id}) -> {num_filas} filas x {num_columnas} columnas")
+            
+            requests.append({'updateCells': {
+                'range': {
+                    'sheetId': sheet_id,
+                    'startRowIndex': 0, 'endRowIndex': num_filas,
+                    'startColumnIndex': 0, 'endColumnIndex': num_columnas
+                },
+                'rows': [
+                    {'values': [{'userEnteredValue': {'stringValue': str(valor)}} for valor in fila]}
+                    for fila in filas
+                ],
+                'fields': 'userEnteredValue'
+            }})
+        
+        return {'requests': requests}
+    
+    def guardar_hojas_en_lote(self, spreadsheet, hojas):
+        """
+        Guarda todas las hojas con una sola escritura (batchUpdate)
+        False si el cuerpo supera SHEETS_MAX_PAYLOAD_MB: el llamador guarda hoja a hoja
+        """
+        inicio = time.time()
+        body = self.construir_lote_hojas(hojas)
+        
+        # Validar el tamaño ANTES de enviar
+        payload_bytes = len(json.dumps(body, ensure_ascii=False).encode('utf-8'))
+        limite_bytes = int(SHEETS_MAX_PAYLOAD_MB * 1024 * 1024)
+        if payload_bytes > limite_bytes:
+            print(f"LOTE: {payload_bytes/1024/1024:.1f} MB supera el limite de {SHEETS_MAX_PAYLOAD_MB} MB - guardado hoja a hoja")
+            return False
+        
+        spreadsheet.batch_update(body)
+        self.invalidar_indice_hojas()
+        
+        print(f"LOTE: {len(body['requests'])} operaciones | {payload_bytes/1024:.0f} KB | 1 escritura | {time.time() - inicio:.1f}s")
+        return True
+    
+    def calcular_delta_historico(self, df_historico):
+        """
+        Cambios de Data_Historico respecto a lo leido, manteniendo el orden de la escritura
+        completa (ordenar_historico_completo). Devuelve (inserciones, rangos, filas, columnas,
+        celdas) o None si no se puede: sin lectura previa, columnas o motos desaparecidas,
+        URLs repetidas, o motos existentes que cambian de orden entre si (km, estado...)
+
+        - inserciones: [(indice de fila desde 0, cantidad)] de filas vacias para las motos
+          nuevas en su posicion ordenada, en orden ascendente (indices ya finales)
+        - rangos: [(fila, columna, valores)] (indices desde 1, tras las inserciones)
+        - Filas existentes: solo tramos de celdas cambiadas
+        - Columnas nuevas (Visitas_/Likes_ del dia): un bloque a la derecha
+        - Motos nuevas: una fila completa en su hueco
+        """
+        grid = self.historico_grid
+        if not grid or 'URL' not in grid[0]:
+            return None
+        
+        cabecera = list(grid[0])
+        columnas = list(df_historico.columns)
+        if any(col not in columnas for col in cabecera if col):
+            return None
+        nuevas_columnas = [col for col in columnas if col not in cabecera]
+        cabecera_final = cabecera + nuevas_columnas
+        
+        df_clean = self.limpiar_dataframe_para_sheets(df_historico)
+        filas_nuevas = {}
+        for fila in df_clean.to_dict('records'):
+            filas_nuevas[canonical_item_url(fila['URL'])] = fila
+        
+        col_url = cabecera.index('URL')
+        posiciones = [canonical_item_url(fila[col_url]) if col_url < len(fila) else '' for fila in grid[1:]]
+        if len(set(posiciones)) != len(posiciones) or any(url not in filas_nuevas for url in posiciones):
+            return None
+        
+        # Orden final = el de la escritura completa; las existentes no pueden moverse entre si
+        existentes = set(posiciones)
+        orden = [canonical_item_url(url) for url in self.ordenar_historico_completo(df_historico)['URL']]
+        if [url for url in orden if url in existentes] != posiciones:
+            print("DELTA: Motos existentes cambian de orden por KM/estado - reescritura completa")
+            return None
+        fila_final = {url: i + 2 for i, url in enumerate(orden)}
+        
+        inserciones = []
+        for i, url in enumerate(orden):
+            if url in existentes:
+                continue
+            if inserciones and sum(inserciones[-1]) == i + 1:
+                inserciones[-1] = (inserciones[-1][0], inserciones[-1][1] + 1)
+            else:
+                inserciones.append((i + 1, 1))
+        
+        rangos = []
+        num_antiguas = len(cabecera)
+        for i, url in enumerate(posiciones):
+            antigua = list(grid[i + 1]) + [''] * (num_antiguas - len(grid[i + 1]))
+            nueva = [filas_nuevas[url].get(col, '') if col else antigua[j] for j, col in enumerate(cabecera)]
+            
+            # Tramos contiguos de celdas cambiadas
+            j = 0
+            while j < num_antiguas:
+                if nueva[j] == antigua[j]:
+                    j += 1
+                    continue
+                inicio = j
+                while j < num_antiguas and nueva[j] != antigua[j]:
+                    j += 1
+                rangos.append((fila_final[url], inicio + 1, [nueva[inicio:j]]))
+        
+        # Motos nuevas: fila completa en cada hueco insertado
+        for inicio, cantidad in inserciones:
+            bloque = [[filas_nuevas[url].get(col, '') for col in cabecera_final] for url in orden[inicio - 1:inicio - 1 + cantidad]]
+            rangos.append((inicio + 1, 1, bloque))
+        
+        # Columnas nuevas: cabecera + valores de las filas existentes (las nuevas ya van completas)
+        if nuevas_columnas:
+            rangos.append((1, num_antiguas + 1, [nuevas_columnas]))
+            for url in posiciones:
+                rangos.append((fila_final[url], num_antiguas + 1, [[filas_nuevas[url][col] for col in nuevas_columnas]]))
+        
+        celdas = sum(len(valores) * len(valores[0]) for _, _, valores in rangos)
+        return inserciones, rangos, len(orden) + 1, len(cabecera_final), celdas
+    
+    def guardar_historico_delta(self, spreadsheet, df_historico):
+        """
+        Escribe en Data_Historico solo columnas nuevas, motos nuevas y celdas cambiadas
+        Las motos nuevas se insertan en su posicion (mismo orden que la escritura completa)
+        False si hay que reescribir la hoja entera
+        """
+        delta = self.calcular_delta_historico(df_historico)
+        if delta is None:
+            print("DELTA: Sin base comparable de Data_Historico - reescritura completa")
+            return False
+        inserciones, rangos, num_filas, num_columnas, celdas = delta
+        
+        worksheet = self.hoja("Data_Historico")
+        # Al menos una fila libre bajo la tabla: insertDimension no inserta pasado el final del grid
+        filas_actuales = num_filas - sum(cantidad for _, cantidad in inserciones)
+        filas_grid = max(worksheet.row_count, filas_actuales + 1) if inserciones else worksheet.row_count
+        if filas_grid > worksheet.row_count or num_columnas > worksheet.col_count:
+            worksheet.resize(rows=filas_grid, cols=max(num_columnas, worksheet.col_count))
+        
+        # Huecos para las motos nuevas (las filas de debajo bajan con su contenido)
+        if inserciones:
+            spreadsheet.batch_update({'requests': [
+                {'insertDimension': {
+                    'range': {'sheetId': worksheet.id, 'dimension': 'ROWS', 'startIndex': inicio, 'endIndex': inicio + cantidad},
+                    'inheritFromBefore': True
+                }}
+                for inicio, cantidad in inserciones
+            ]})
+        
+        if rangos:
+            spreadsheet.values_batch_update({
+                'valueInputOption': 'RAW',
+                'data': [
+                    {
+                        'range': f"'Data_Historico'!{gspread.utils.rowcol_to_a1(fila, columna)}",
+                        'values': valores
+                    }
+                    for fila, columna, valores in rangos
+                ]
+            })
+        
+        print(f"DELTA: Data_Historico {len(inserciones)} inserciones | {len(rangos)} rangos | {celdas:,} de {num_filas * num_columnas:,} celdas enviadas")
+        return True
+    
+    def estimar_bytes_fila(self, fila):
+        """Bytes aproximados de una fila en el JSON de la peticion (comillas y comas incluidas)"""
+        return sum(len(str(valor).encode('utf-8')) + 3 for valor in fila) + 2
+    
+    def filas_de_tabla(self, df, inicio=0, fin=None):
+        """Filas [inicio, fin) de la tabla: la fila 0 es la cabecera, la i es df.iloc[i - 1]"""
+        fin = len(df) + 1 if fin is None else fin
+        filas = [df.columns.values.tolist()] if inicio == 0 else []
+        return filas + df.iloc[max(inicio - 1, 0):fin - 1].values.tolist()
+    
+    def tamanos_filas(self, df, bloque=1000):
+        """Bytes estimados de cada fila de la tabla, por bloques (sin convertirla entera a listas)"""
+        yield self.estimar_bytes_fila(df.columns.values.tolist())
+        for inicio in range(0, len(df), bloque):
+            for fila in df.iloc[inicio:inicio + bloque].values.tolist():
+                yield self.estimar_bytes_fila(fila)
+    
+    def dividir_en_trozos(self, tamanos, max_bytes):
+        """[(inicio, fin)] de filas de la tabla con como mucho max_bytes estimados (minimo una fila)"""
+        trozos = []
+        inicio = 0
+        acumulado = 0
+        num_filas = 0
+        for i, tamano in enumerate(tamanos):
+            if i > inicio and acumulado + tamano > max_bytes:
+                trozos.append((inicio, i))
+                inicio = i
+                acumulado = 0
+            acumulado += tamano
+            num_filas = i + 1
+        if inicio < num_filas:
+            trozos.append((inicio, num_filas))
+        return trozos
+    
+    def subir_tabla(self, worksheet, df):
+        """
+        Sustituye el contenido de la hoja por la tabla (cabecera + filas de df) desde A1
+        Con SHEETS_CHUNK_MB = 0, o si cabe en un trozo: limpiar y una sola peticion
+        """
+        max_bytes = int(SHEETS_CHUNK_MB * 1024 * 1024)
+        trozos = self.dividir_en_trozos(self.tamanos_filas(df), max_bytes) if max_bytes else []
+        if len(trozos) <= 1:
+            worksheet.clear()
+            worksheet.update(self.filas_de_tabla(df))
+        else:
+            self.subir_por_trozos(worksheet, df, trozos)
+    
+    def subir_por_trozos(self, worksheet, df, trozos, rondas=3):
+        """
+        SUBIDA POR TROZOS: tabla grande en rangos consecutivos de tamaño acotado
+        - Las filas de cada trozo se generan al enviarlo: en memoria solo los trozos en vuelo
+        - El grid se amplia UNA vez al principio (las escrituras no lo redimensionan)
+        - SHEETS_UPLOAD_WORKERS trozos en vuelo a la vez (la cuota la espacia el cliente)
+        - Si un trozo falla se reanuda desde el primero sin confirmar, hasta 'rondas' veces
+        - Sin limpiar antes: los trozos sobrescriben la tabla anterior y lo que sobra de ella
+          se borra solo cuando todos estan confirmados (un fallo no deja la hoja a medias)
+        """
+        inicio_total = time.time()
+        num_filas = len(df) + 1
+        num_columnas = len(df.columns)
+        
+        if num_filas > worksheet.row_count or num_columnas > worksheet.col_count:
+            worksheet.resize(rows=max(num_filas, worksheet.row_count), cols=max(num_columnas, worksheet.col_count))
+        
+        print(f"[TROZOS] {worksheet.title}: {num_filas} filas en {len(trozos)} trozos de hasta {SHEETS_CHUNK_MB:.1f} MB ({SHEETS_UPLOAD_WORKERS} en paralelo)")
+        
+        latencias = []
+        pendientes = list(range(len(trozos)))
+        for ronda in range(1, rondas + 1):
+            fallidos = []
+            with ThreadPoolExecutor(max_workers=SHEETS_UPLOAD_WORKERS) as pool:
+                futures = {
+                    pool.submit(self._subir_trozo, worksheet, df, *trozos[idx]): idx
+                    for idx in pendientes
+                }
+                for future in as_completed(futures):
+                    try:
+                        latencias.append(future.result())
+                    except Exception as e:
+                        print(f"[TROZOS] Trozo {futures[future] + 1}/{len(trozos)} fallido: {str(e)[:100]}")
+                        fallidos.append(futures[future])
+            
+            if not fallidos:
+                break
+            pendientes = sorted(fallidos)
+            if ronda == rondas:
+                raise Exception(f"Subida por trozos incompleta: {len(pendientes)} trozos sin confirmar desde la fila {trozos[pendientes[0]][0] + 1}")
+            print(f"[TROZOS] Ronda {ronda}: confirmados hasta el trozo {pendientes[0]}, reanudando {len(pendientes)} trozos")
+        
+        self.limpiar_sobrante(worksheet, num_filas, num_columnas)
+        print(f"[TROZOS] {worksheet.title}: completado en {time.time() - inicio_total:.1f}s | trozo mas lento {max(latencias):.1f}s")
+    
+    def _subir_trozo(self, worksheet, df, inicio, fin):
+        """Escribe las filas [inicio, fin) de la tabla en su rango; devuelve la latencia"""
+        inicio_trozo = time.time()
+        worksheet.update(self.filas_de_tabla(df, inicio, fin), f"A{inicio + 1}")
+        return time.time() - inicio_trozo
+    
+    def limpiar_sobrante(self, worksheet, num_filas, num_columnas):
+        """Borra lo que quede de la tabla anterior fuera de las num_filas x num_columnas escritas"""
+        rangos = []
+        if worksheet.row_count > num_filas:
+            rangos.append(f"A{num_filas + 1}:{gspread.utils.rowcol_to_a1(worksheet.row_count, worksheet.col_count)}")
+        if worksheet.col_count > num_columnas:
+            rangos.append(f"{gspread.utils.rowcol_to_a1(1, num_columnas + 1)}:{gspread.utils.rowcol_to_a1(num_filas, worksheet.col_count)}")
+        if rangos:
+            worksheet.batch_clear(rangos)
+    
+    def guardar_hoja_completa(self, nombre, df_clean, filas_extra, columnas_extra):
+        """Guardado clasico de una hoja: buscar (o crear) y sustituir su contenido por la tabla"""
+        try:
+            worksheet = self.hoja(nombre)
+            print(f"SOBRESCRIBIENDO: Hoja {nombre} existente")
+        except gspread.WorksheetNotFound:
+            worksheet = self.crear_hoja(
+                nombre,
+                rows=len(df_clean) + 1 + filas_extra,
+                cols=len(df_clean.columns) + columnas_extra
+            )
+            print(f"CREANDO: Nueva hoja {nombre}")
+        
+        print(f"SUBIENDO: {len(df_clean) + 1} filas a {nombre}")
+        self.subir_tabla(worksheet, df_clean)
+        print(f"EXITO: {nombre} actualizada con {len(df_clean)} motos")
+    
     def guardar_historico_con_hojas_originales(self, df_historico, fecha_procesamiento):
         """
         CORREGIDO: Guarda historico con limpieza completa de NA values
         Guarda en 3 hojas: Data_Historico, Motos_Activas, Motos_Vendidas
+        Con SHEETS_BATCH_WRITE las 3 hojas van en una sola peticion
         """
         try:
-            spreadsheet = self.client.open_by_key(self.sheet_id)
+            spreadsheet = self.abrir_spreadsheet()
             
             print(f"INICIANDO GUARDADO: {len(df_historico)} motos total")
             
-            # ===============================================
-            # 1. HOJA PRINCIPAL: Data_Historico
-            # ===============================================
-            print("PROCESANDO: Hoja principal Data_Historico")
+            # Data_Historico por diferencias; si no es posible va con las demas hojas
+            delta_ok = SHEETS_DELTA_WRITE and self.guardar_historico_delta(spreadsheet, df_historico)
+            hojas = self.preparar_hojas_historico(df_historico, incluir_principal=not delta_ok)
             
-            try:
-                worksheet_main = spreadsheet.worksheet("Data_Historico")
-                worksheet_main.clear()
-                print(f"LIMPIANDO: Hoja principal Data_Historico")
-            except gspread.WorksheetNotFound:
-                worksheet_main = spreadsheet.add_worksheet(
-                    title="Data_Historico",
-                    rows=len(df_historico) + 50,
-                    cols=len(df_historico.columns) + 20
-                )
-                print(f"CREANDO: Nueva hoja Data_Historico")
-            
-            # Ordenar historico completo
-            df_ordenado = self.ordenar_historico_completo(df_historico)
-            
-            # LIMPIEZA CRITICA: Eliminar NA values antes de subir
-            print("LIMPIANDO: Datos para Data_Historico")
-            df_ordenado_clean = self.limpiar_dataframe_para_sheets(df_ordenado)
-            
-            # Preparar y subir datos principales
-            headers = df_ordenado_clean.columns.values.tolist()
-            data_rows = df_ordenado_clean.values.tolist()
-            all_data = [headers] + data_rows
-            
-            print(f"SUBIENDO: {len(all_data)} filas a Data_Historico")
-            worksheet_main.update(all_data)
-            
-            print(f"EXITO: Data_Historico actualizada con {len(df_ordenado)} motos")
-            
-            # ===============================================
-            # 2. HOJA MOTOS_ACTIVAS (solo activas)
-            # ===============================================
-            print("PROCESANDO: Hoja Motos_Activas")
-            
-            motos_activas = df_historico[df_historico['Estado'] == 'activa'].copy()
-            
-            if not motos_activas.empty:
-                # Ordenar por Likes_Totales descendente
-                if 'Likes_Totales' in motos_activas.columns:
-                    motos_activas = motos_activas.sort_values('Likes_Totales', ascending=False, na_position='last')
-                
-                try:
-                    ws_activas = spreadsheet.worksheet("Motos_Activas")
-                    ws_activas.clear()
-                    print(f"LIMPIANDO: Hoja Motos_Activas existente")
-                except gspread.WorksheetNotFound:
-                    ws_activas = spreadsheet.add_worksheet(
-                        "Motos_Activas", 
-                        rows=len(motos_activas)+20, 
-                        cols=len(motos_activas.columns)+5
-                    )
-                    print(f"CREANDO: Nueva hoja Motos_Activas")
-                
-                # LIMPIEZA CRITICA: Eliminar NA values
-                print("LIMPIANDO: Datos para Motos_Activas")
-                motos_activas_clean = self.limpiar_dataframe_para_sheets(motos_activas)
-                
-                # Preparar y subir motos activas
-                headers_activas = motos_activas_clean.columns.values.tolist()
-                data_activas = motos_activas_clean.values.tolist()
-                activas_data = [headers_activas] + data_activas
-                
-                print(f"SUBIENDO: {len(activas_data)} filas a Motos_Activas")
-                ws_activas.update(activas_data)
-                
-                print(f"EXITO: Motos_Activas actualizada con {len(motos_activas)} motos")
-            else:
-                print("AVISO: No hay motos activas")
-            
-            # ===============================================
-            # 3. HOJA MOTOS_VENDIDAS (solo vendidas)
-            # ===============================================
-            print("PROCESANDO: Hoja Motos_Vendidas")
-            
-            motos_vendidas = df_historico[df_historico['Estado'] == 'vendida'].copy()
-            
-            if not motos_vendidas.empty:
-                # Ordenar por Fecha_Venta descendente
-                if 'Fecha_Venta' in motos_vendidas.columns:
-                    motos_vendidas = motos_vendidas.sort_values('Fecha_Venta', ascending=False, na_position='last')
-                
-                try:
-                    ws_vendidas = spreadsheet.worksheet("Motos_Vendidas")
-                    ws_vendidas.clear()
-                    print(f"LIMPIANDO: Hoja Motos_Vendidas existente")
-                except gspread.WorksheetNotFound:
-                    ws_vendidas = spreadsheet.add_worksheet(
-                        "Motos_Vendidas", 
-                        rows=len(motos_vendidas)+20, 
-                        cols=len(motos_vendidas.columns)+5
-                    )
-                    print(f"CREANDO: Nueva hoja Motos_Vendidas")
-                
-                # LIMPIEZA CRITICA: Eliminar NA values
-                print("LIMPIANDO: Datos para Motos_Vendidas")
-                motos_vendidas_clean = self.limpiar_dataframe_para_sheets(motos_vendidas)
-                
-                # Preparar y subir motos vendidas
-                headers_vendidas = motos_vendidas_clean.columns.values.tolist()
-                data_vendidas = motos_vendidas_clean.values.tolist()
-                vendidas_data = [headers_vendidas] + data_vendidas
-                
-                print(f"SUBIENDO: {len(vendidas_data)} filas a Motos_Vendidas")
-                ws_vendidas.update(vendidas_data)
-                
-                print(f"EXITO: Motos_Vendidas actualizada con {len(motos_vendidas)} motos")
-            else:
-                print("AVISO: No hay motos vendidas")
+            if not (SHEETS_BATCH_WRITE and self.guardar_hojas_en_lote(spreadsheet, hojas)):
+                for nombre, df_clean, filas_extra, columnas_extra in hojas:
+                    print(f"PROCESANDO: Hoja {nombre}")
+                    self.guardar_hoja_completa(nombre, df_clean, filas_extra, columnas_extra)
             
             print(f"GUARDADO COMPLETO EXITOSO")
             print(f"DATOS FINALES: {len(df_historico)} filas x {len(df_historico.columns)} columnas")
-            print(f"HOJAS ACTUALIZADAS: Data_Historico, Motos_Activas, Motos_Vendidas")
+            actualizadas = (["Data_Historico"] if delta_ok else []) + [nombre for nombre, _, _, _ in hojas]
+            print(f"HOJAS ACTUALIZADAS: {', '.join(actualizadas)}")
             print(f"URL: https://docs.google.com/spreadsheets/d/{self.sheet_id}")
             
             return True
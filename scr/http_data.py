@@ -0,0 +1,308 @@
+"""
+Ruta rapida HTTP - Lee los datos del anuncio desde el JSON embebido (Next.js)
+Descarga las paginas /item/ con un cliente HTTP con pool keep-alive, sin Chrome
+
+- Busca <script id="__NEXT_DATA__"> y localiza el objeto del anuncio
+- Devuelve campos en bruto (titulo, precio, descripcion, km, año, visitas, likes)
+- Si no hay JSON utilizable devuelve None y el scraper usa Selenium
+- Funciona contra cualquier host: se puede probar con un servidor local
+  que sirva paginas grabadas (python -m http.server)
+- parse_listing_payload: mismos campos desde las respuestas JSON del listado
+  del perfil (capturadas del navegador); se prueba con respuestas grabadas
+"""
+
+import json
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import urllib3  # Dependencia de selenium
+
+from patrones_data import ITEM_BASE_URL, canonical_item_url
+
+NEXT_DATA_RE = re.compile(
+    r'<script[^>]*id=["\']__NEXT_DATA__["\'][^>]*>(.*?)</script>',
+    re.DOTALL | re.IGNORECASE
+)
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+def _text_value(value):
+    """Texto de un campo que puede venir como str o como {'original': ...}"""
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, dict):
+        for key in ('original', 'translated', 'text', 'value'):
+            if isinstance(value.get(key), str):
+                return value[key].strip()
+    return None
+
+NUMBER_TEXT_RE = re.compile(r'\d[\d.,]*')
+
+def _number_from_text(text):
+    """
+    Entero de un texto con separadores ("7.690 €", "3,500", "3500.50", "1.234,5")
+    El ultimo separador es decimal si le siguen 1-2 cifras (o si hay de los dos tipos);
+    los decimales se truncan como en la ruta Selenium
+    """
+    match = NUMBER_TEXT_RE.search(text)
+    if not match:
+        return None
+    number = match.group(0).rstrip('.,')
+
+    last = max(number.rfind('.'), number.rfind(','))
+    if last != -1:
+        decimals = number[last + 1:]
+        mixed = '.' in number and ',' in number
+        repeated = number.count(number[last]) > 1
+        if mixed or (not repeated and len(decimals) != 3):
+            number = number[:last]
+    return int(re.sub(r'[.,]', '', number))
+
+def _number_value(value):
+    """Numero de un campo que puede venir como int, str o {'amount'/'value': ...}"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        return _number_from_text(value)
+    if isinstance(value, dict):
+        for key in ('cash', 'amount', 'value'):
+            if key in value:
+                number = _number_value(value[key])
+                if number is not None:
+                    return number
+    return None
+
+def _find_key(data, keys, max_depth=6):
+    """Primer valor (recorrido en anchura) cuya clave esta en keys"""
+    level = [data]
+    for _ in range(max_depth):
+        next_level = []
+        for node in level:
+            if isinstance(node, dict):
+                for key in keys:
+                    if key in node and node[key] is not None:
+                        return node[key]
+                next_level.extend(node.values())
+            elif isinstance(node, list):
+                next_level.extend(node)
+        level = next_level
+    return None
+
+def _find_item(data):
+    """Localiza el objeto del anuncio: dict con titulo y precio o contadores"""
+    level = [data]
+    while level:
+        next_level = []
+        for node in level:
+            if isinstance(node, dict):
+                if 'title' in node and ('price' in node or 'counters' in node):
+                    return node
+                next_level.extend(node.values())
+            elif isinstance(node, list):
+                next_level.extend(node)
+        level = next_level
+    return None
+
+def parse_item_page(html):
+    """
+    Extrae los campos en bruto del JSON embebido de una pagina /item/
+    Devuelve None si la pagina no trae JSON con el anuncio
+    """
+    match = NEXT_DATA_RE.search(html)
+    if not match:
+        return None
+
+    try:
+        data = json.loads(match.group(1))
+    except ValueError:
+        return None
+
+    item = _find_item(data)
+    if item is None:
+        return None
+
+    counters = item.get('counters') if isinstance(item.get('counters'), dict) else item
+
+    return {
+        'title': _text_value(item.get('title')),
+        'price': _number_value(item.get('price')),
+        'description': _text_value(item.get('description')) or '',
+        'km': _number_value(_find_key(item, ('km', 'kilometers', 'mileage'))),
+        'year': _number_value(_find_key(item, ('year', 'registration_year'))),
+        'views': _number_value(_find_key(counters, ('views', 'visits'))),
+        'likes': _number_value(_find_key(counters, ('favorites', 'favourites', 'likes'))),
+        'html': html,
+    }
+
+def _is_listing_item(node):
+    return isinstance(node, dict) and 'title' in node and any(
+        key in node for key in ('web_slug', 'slug', 'share_url', 'url')
+    )
+
+def _listing_items(data):
+    """Primera lista (recorrido en anchura) cuyos elementos parecen anuncios"""
+    level = [data]
+    while level:
+        next_level = []
+        for node in level:
+            if isinstance(node, list):
+                if node and all(_is_listing_item(item) for item in node):
+                    return node
+                next_level.extend(node)
+            elif isinstance(node, dict):
+                next_level.extend(node.values())
+        level = next_level
+    return []
+
+def _listing_item_url(raw):
+    """URL publica del anuncio: enlace directo si existe, si no /item/<slug>"""
+    for key in ('share_url', 'url'):
+        value = raw.get(key)
+        if isinstance(value, str) and '/item/' in value:
+            return canonical_item_url(value)
+    slug = raw.get('web_slug') or raw.get('slug')
+    return canonical_item_url(ITEM_BASE_URL + slug) if isinstance(slug, str) and slug else None
+
+def _listing_seller(raw):
+    """Id del vendedor si el anuncio lo trae (user_id, seller_id o user.id)"""
+    for key in ('user_id', 'seller_id'):
+        if isinstance(raw.get(key), (str, int)):
+            return str(raw[key])
+    user = raw.get('user')
+    if isinstance(user, dict) and isinstance(user.get('id'), (str, int)):
+        return str(user['id'])
+    return None
+
+def parse_listing_payload(payload):
+    """
+    Anuncios de una respuesta JSON del listado de un perfil (str, bytes o ya decodificada)
+    Mismos campos que parse_item_page (mas 'url' y 'vendedor'); los que no vengan quedan en None
+    """
+    if isinstance(payload, (str, bytes)):
+        try:
+            payload = json.loads(payload)
+        except ValueError:
+            return []
+
+    items = []
+    for raw in _listing_items(payload):
+        url = _listing_item_url(raw)
+        if not url:
+            continue
+        counters = raw.get('counters') if isinstance(raw.get('counters'), dict) else raw
+        items.append({
+            'url': url,
+            'vendedor': _listing_seller(raw),
+            'title': _text_value(raw.get('title')),
+            'price': _number_value(raw.get('price')),
+            'description': _text_value(raw.get('description')) or '',
+            'km': _number_value(_find_key(raw, ('km', 'kilometers', 'mileage'))),
+            'year': _number_value(_find_key(raw, ('year', 'registration_year'))),
+            'views': _number_value(_find_key(counters, ('views', 'visits'))),
+            'likes': _number_value(_find_key(counters, ('favorites', 'favourites', 'likes'))),
+            'html': '',
+        })
+    return items
+
+class HttpItemFetcher:
+    """Descarga paginas de anuncios con un pool de conexiones keep-alive"""
+
+    def __init__(self, max_connections=8, timeout=10):
+        self.max_connections = max_connections
+        self.pool = urllib3.PoolManager(
+            maxsize=max_connections,
+            block=True,
+            headers={'User-Agent': USER_AGENT, 'Accept-Language': 'es-ES,es;q=0.9'},
+            timeout=urllib3.Timeout(connect=timeout, read=timeout),
+            retries=urllib3.Retry(total=2, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+        )
+        self.stats = {'descargas': 0, 'con_json': 0, 'sin_json': 0, 'errores': 0, 'bytes': 0, 'tiempo': 0.0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, **increments):
+        with self._stats_lock:
+            for key, value in increments.items():
+                self.stats[key] += value
+
+    def fetch_item(self, url):
+        """Datos en bruto del anuncio o None (sin JSON o error HTTP)"""
+        start = time.time()
+        try:
+            response = self.pool.request('GET', url)
+            self._count(descargas=1, bytes=len(response.data))
+            if response.status != 200:
+                self._count(errores=1)
+                return None
+
+            item = parse_item_page(response.data.decode('utf-8', errors='replace'))
+            if item is None:
+                self._count(sin_json=1)
+            else:
+                self._count(con_json=1)
+            return item
+        except Exception:
+            self._count(errores=1)
+            return None
+        finally:
+            self._count(tiempo=time.time() - start)
+
+    def fetch_many(self, urls):
+        """Descarga concurrente; resultados en el mismo orden que urls"""
+        with ThreadPoolExecutor(max_workers=self.max_connections) as executor:
+            return list(executor.map(self.fetch_item, urls))
+
+    def close(self):
+        """Cierra las conexiones keep-alive del pool"""
+        self.pool.clear()
+
+    def print_stats(self, elapsed=None):
+        """Resumen de la ruta rapida"""
+        s = self.stats
+        print(f"[HTTP] {s['descargas']} descargas | {s['con_json']} con JSON | {s['sin_json']} sin JSON | {s['errores']} errores | {s['bytes']/1024/1024:.1f} MB")
+        if elapsed:
+            print(f"[HTTP] {s['descargas']/elapsed:.1f} paginas/s en {elapsed:.1f}s")
+
+def benchmark_http_fetcher(urls, max_connections=8):
+    """Mide el throughput de la ruta HTTP sobre una lista de URLs"""
+    fetcher = HttpItemFetcher(max_connections=max_connections)
+    start = time.time()
+    try:
+        results = fetcher.fetch_many(urls)
+    finally:
+        fetcher.close()
+    elapsed = time.time() - start
+
+    fetcher.print_stats(elapsed)
+    for url, item in list(zip(urls, results))[:5]:
+        if item:
+            print(f"  {item['title']} | {item['price']} | {item['km']} km | {item['year']} | Views {item['views']} | Likes {item['likes']}")
+        else:
+            print(f"  SIN JSON: {url}")
+    return results
+
+def print_listing_payloads(paths):
+    """Muestra lo que se extrae de respuestas de listado grabadas (.json)"""
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            items = parse_listing_payload(f.read())
+        print(f"{path}: {len(items)} anuncios")
+        for item in items[:5]:
+            print(f"  {item['title']} | {item['price']} | {item['km']} km | {item['year']} | Views {item['views']} | Likes {item['likes']}")
+            print(f"    {item['url']}")
+
+if __name__ == "__main__":
+    # Uso: python http_data.py URL [URL ...]  (o un fichero con una URL por linea)
+    #      python http_data.py --listing respuesta.json [...]  (respuestas de listado grabadas)
+    args = sys.argv[1:]
+    if args and args[0] == '--listing':
+        print_listing_payloads(args[1:])
+        sys.exit(0)
+    if len(args) == 1 and not args[0].startswith('http'):
+        with open(args[0], encoding='utf-8') as f:
+            args = [line.strip() for line in f if line.strip()]
+    benchmark_http_fetcher(args)
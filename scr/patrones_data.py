@@ -0,0 +1,351 @@
+"""
+Registro de patrones de extraccion - compilados UNA SOLA VEZ al importar
+Precio, KM, año, likes y visitas: antes se reconstruian y buscaban en cada llamada
+
+- Cada familia mantiene el ORDEN DE PRIORIDAD original (gana el primer patron valido)
+- Duplicados equivalentes con IGNORECASE (p.ej. 'KM:' y 'km:') se compilan una vez:
+  si el primero no da un valor valido el duplicado tampoco, asi que no se pierde nada
+- NO se fusionan en una sola regex con alternativas: con el motor 're' la alternancia
+  pierde la busqueda rapida por prefijo literal y mide mas lenta (ver benchmark_patrones)
+"""
+
+import re
+import time
+
+def _case_key(pattern, flags):
+    """Clave para detectar patrones equivalentes con IGNORECASE"""
+    if not flags & re.IGNORECASE or re.search(r'\\[A-Z]', pattern):
+        return pattern
+    return pattern.lower()
+
+class PatternFamily:
+    """Patrones precompilados en orden de prioridad"""
+
+    def __init__(self, name, patterns, flags=re.IGNORECASE):
+        self.name = name
+        self.source_patterns = list(patterns)
+        self.patterns = []
+        seen = set()
+        for pattern in patterns:
+            key = _case_key(pattern, flags)
+            if key in seen:
+                continue
+            seen.add(key)
+            self.patterns.append(re.compile(pattern, flags))
+
+    def first_matches(self, text):
+        """Equivalente a: for p in patrones: m = re.search(p, text); if m: yield p, m"""
+        for pattern in self.patterns:
+            match = pattern.search(text)
+            if match:
+                yield pattern, match
+
+    def iter_matches(self, text):
+        """Equivalente a: for p in patrones: for m in re.finditer(p, text): yield p, m"""
+        for pattern in self.patterns:
+            for match in pattern.finditer(text):
+                yield pattern, match
+
+# ===============================================
+# PRECIO
+# ===============================================
+# REGEX ESPECIFICOS PARA WALLAPOP (copiados del scraper de coches exitoso)
+PRICE_TEXT = PatternFamily('precio_texto', [
+    r'(\d{1,3}(?:\.\d{3})+)\s*€',           # "7.690 €"
+    r'(\d{4,6})\s*€',                       # "7690 €"
+    r'(\d{1,2})\s*\.\s*(\d{3})\s*€',        # "7 . 690 €"
+    r'(\d{1,2}),(\d{3})\s*€',               # "7,690 €"
+    r'€\s*(\d{1,2}\.?\d{3,6})',             # "€ 7690"
+    r'(\d{1,2}\.?\d{3,6})\s*euros?',        # "7690 euros"
+])
+
+# REGEX PARA CAPTURAR PRECIOS REALISTAS DE MOTOS (cualquier elemento con €)
+PRICE_ANY = PatternFamily('precio_cualquiera', [
+    r'(\d{1,3}(?:\.\d{3})+)\s*€',
+    r'(\d{1,6})\s*€'
+], flags=0)
+
+# ===============================================
+# KILOMETROS Y AÑO EN LA DESCRIPCION
+# ===============================================
+KM_DESCRIPTION = PatternFamily('km_descripcion', [
+    r'Kilómetros:\s*(\d+)',
+    r'kilometros:\s*(\d+)',
+    r'•\s*KM:\s*(\d+)',
+    r'•\s*km:\s*(\d+)',
+    r'KM:\s*(\d+)',
+    r'km:\s*(\d+)',
+    r'-\s*Kilometros:\s*(\d+)',
+    r'-\s*kilometros:\s*(\d+)',
+    r'-\s*KM:\s*(\d+)',
+    r'-\s*km:\s*(\d+)',
+    r'(\d+)\s*km',
+    r'(\d+)\s*kilometros',
+    r'(\d+)\s*mil\s*km',
+])
+
+YEAR_DESCRIPTION = PatternFamily('ano_descripcion', [
+    # FORMATO MOTOSPLUS: "Año: 2022"
+    r'Año:\s*(\d{4})',
+    r'año:\s*(\d{4})',
+
+    # FORMATO CUIMO: "• Año: 2017"
+    r'•\s*Año:\s*(\d{4})',
+    r'•\s*año:\s*(\d{4})',
+
+    # FORMATOS CON GUIONES
+    r'-\s*Año:\s*(\d{4})',
+    r'-\s*año:\s*(\d{4})',
+
+    # FORMATOS ADICIONALES
+    r'modelo\s+(\d{4})',
+    r'del\s+(\d{4})',
+    r'(\d{4})\s*(?:cc|cilindros)',
+])
+
+# ===============================================
+# KILOMETROS Y AÑO EN EL HTML (fallback)
+# ===============================================
+KM_HTML = PatternFamily('km_html', [
+    r'Kilómetros["\s:>]*</span><span[^>]*>(\d+(?:[\.\s]\d+)*)</span>',
+    r'kilometros["\s:>]*</span><span[^>]*>(\d+(?:[\.\s]\d+)*)</span>',
+    r'>(\d+)\s*km',
+    r'•\s*KM["\s:>]*(\d+)',
+])
+
+YEAR_HTML = PatternFamily('ano_html', [
+    r'Año["\s:>]*</span><span[^>]*>(\d{4})</span>',
+    r'año["\s:>]*</span><span[^>]*>(\d{4})</span>',
+    r'•\s*Año["\s:>]*(\d{4})',
+])
+
+# ===============================================
+# LIKES Y VISITAS
+# ===============================================
+DIGITS = re.compile(r'(\d+)')
+K_VIEWS = re.compile(r'(\d+(?:\.\d+)?)\s*k')
+
+# ===============================================
+# ESCANEO ACOTADO DEL HTML COMPLETO (likes y visitas)
+# ===============================================
+# Antes: 'favorite.*?(\d+)', '(\d+).*?view'... sobre todo page_source con IGNORECASE.
+# En HTML minificado (una sola linea enorme) eso es cuadratico. Ahora se localizan las
+# anclas con una busqueda de subcadena y solo se examina una ventana fija junto a cada una.
+ANCHOR_WINDOW = 200  # caracteres examinados junto a cada ancla
+
+# Primer numero DESPUES del ancla en la misma linea (como '.*?(\d+)')
+NUMBER_AFTER = re.compile(r'[^\n]*?(\d+)')
+# Numero mas cercano ANTES del ancla en la misma linea
+NUMBER_BEFORE = re.compile(r'(\d+)[^\d\n]*\Z')
+# Formato K: '1.1k views' / 'views ...>1.1k'
+K_NUMBER_BEFORE = re.compile(r'(\d+(?:\.\d+)?)\s*k\s*\Z', re.IGNORECASE)
+K_NUMBER_AFTER = re.compile(r'[^>]*>(\d+(?:\.\d+)?)\s*k', re.IGNORECASE)
+
+# Reglas en el orden de prioridad de los patrones anteriores: (ancla, lado, patron)
+LIKES_ANCHORED = [
+    ('favorites', 'after', NUMBER_AFTER),
+    ('favorite', 'after', NUMBER_AFTER),
+    ('heart', 'after', NUMBER_AFTER),
+    ('favorite', 'before', NUMBER_BEFORE),
+    ('heart', 'before', NUMBER_BEFORE),
+]
+
+VIEWS_K_ANCHORED = [
+    ('views', 'before', K_NUMBER_BEFORE),
+    ('views', 'after', K_NUMBER_AFTER),
+    ('visitas', 'before', K_NUMBER_BEFORE),
+]
+
+VIEWS_ANCHORED = [
+    ('views', 'after', NUMBER_AFTER),
+    ('view', 'after', NUMBER_AFTER),
+    ('view', 'before', NUMBER_BEFORE),
+]
+
+class BoundedPageScanner:
+    """Escaneo lineal de page_source: anclas por subcadena + ventana fija por ancla"""
+
+    def __init__(self, page_source, window=ANCHOR_WINDOW):
+        self.page = page_source
+        self.window = window
+        self._anchors = {}
+
+    def anchor_positions(self, anchor):
+        """Posiciones del ancla (sin distinguir mayusculas), calculadas una vez por ancla"""
+        if anchor not in self._anchors:
+            anchor_re = re.compile(re.escape(anchor), re.IGNORECASE)
+            self._anchors[anchor] = [m.start() for m in anchor_re.finditer(self.page)]
+        return self._anchors[anchor]
+
+    def scan(self, rules):
+        """Coincidencias de cada regla en orden de prioridad y, dentro, por posicion"""
+        for anchor, side, pattern in rules:
+            for pos in self.anchor_positions(anchor):
+                if side == 'after':
+                    start = pos + len(anchor)
+                    match = pattern.match(self.page[start:start + self.window])
+                else:
+                    match = pattern.search(self.page[max(0, pos - self.window):pos])
+                if match:
+                    yield match
+
+# ===============================================
+# CLAVE CANONICA DEL ANUNCIO
+# ===============================================
+# El slug tras /item/ identifica el anuncio: query de tracking, fragmento, barra final,
+# mayusculas o dominio (es./www.) no cambian de anuncio
+ITEM_BASE_URL = "https://es.wallapop.com/item/"
+ITEM_SLUG = re.compile(r'/item/([^/?#\s]+)', re.IGNORECASE)
+
+def item_key(url):
+    """Slug del anuncio en minusculas, o None si la URL no es de un anuncio"""
+    match = ITEM_SLUG.search(str(url or ''))
+    return match.group(1).lower() if match else None
+
+def canonical_item_url(url):
+    """URL canonica del anuncio; las que no son de anuncio se devuelven recortadas"""
+    key = item_key(url)
+    return ITEM_BASE_URL + key if key else str(url or '').strip()
+
+def dedupe_item_urls(urls, seen=None):
+    """
+    URLs canonicas sin repetir, en el orden de entrada: (urls, duplicados descartados)
+    seen: set de claves compartido (p.ej. entre cuentas); se actualiza en el sitio
+    """
+    seen = set() if seen is None else seen
+    unicas = []
+    duplicados = 0
+    for url in urls:
+        key = item_key(url)
+        if key is None:
+            continue
+        if key in seen:
+            duplicados += 1
+            continue
+        seen.add(key)
+        unicas.append(ITEM_BASE_URL + key)
+    return unicas, duplicados
+
+# ===============================================
+# MICRO-BENCHMARK
+# ===============================================
+BENCHMARK_DESCRIPTIONS = [
+    "Honda CB500F en perfecto estado.\n• Año: 2019\n• KM: 15999\n• Cilindrada: 471cc\nRevisiones al dia.",
+    "Yamaha MT-07 ABS\nAño: 2021\nKilómetros: 12400\nGarantia 12 meses, financiacion disponible.",
+    "Vespa Primavera 125 del 2018, 8500 km, un solo propietario, libro de mantenimiento.",
+    "Moto en buen estado, ITV pasada, se entrega con dos llaves y manual.",
+]
+
+def _legacy_first_valid(patterns, text, low, high):
+    """Forma anterior: lista reconstruida y re.search por patron en cada llamada"""
+    for pattern in list(patterns):
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            try:
+                value = int(match.group(1))
+                if low <= value <= high:
+                    return value
+            except ValueError:
+                continue
+    return None
+
+def _registry_first_valid(family, text, low, high):
+    """Forma nueva: patrones precompilados y sin duplicados"""
+    for _, match in family.first_matches(text):
+        try:
+            value = int(match.group(1))
+            if low <= value <= high:
+                return value
+        except ValueError:
+            continue
+    return None
+
+def benchmark_patrones(iteraciones=20000):
+    """Compara busqueda KM/año por anuncio: patrones en cada llamada vs registro"""
+    km_patterns = KM_DESCRIPTION.source_patterns
+    year_patterns = YEAR_DESCRIPTION.source_patterns
+
+    # Mismos resultados en ambas formas
+    for text in BENCHMARK_DESCRIPTIONS:
+        assert _legacy_first_valid(km_patterns, text, 0, 200000) == _registry_first_valid(KM_DESCRIPTION, text, 0, 200000)
+        assert _legacy_first_valid(year_patterns, text, 1990, 2025) == _registry_first_valid(YEAR_DESCRIPTION, text, 1990, 2025)
+
+    start = time.perf_counter()
+    for _ in range(iteraciones):
+        for text in BENCHMARK_DESCRIPTIONS:
+            _legacy_first_valid(km_patterns, text, 0, 200000)
+            _legacy_first_valid(year_patterns, text, 1990, 2025)
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(iteraciones):
+        for text in BENCHMARK_DESCRIPTIONS:
+            _registry_first_valid(KM_DESCRIPTION, text, 0, 200000)
+            _registry_first_valid(YEAR_DESCRIPTION, text, 1990, 2025)
+    registry = time.perf_counter() - start
+
+    anuncios = iteraciones * len(BENCHMARK_DESCRIPTIONS)
+    print(f"BENCHMARK PATRONES KM/AÑO ({anuncios:,} descripciones)")
+    print(f"• Antes:    {legacy / anuncios * 1e6:.2f} µs por anuncio")
+    print(f"• Registro: {registry / anuncios * 1e6:.2f} µs por anuncio")
+    print(f"• Mejora:   x{legacy / registry:.2f}")
+
+LEGACY_PAGE_PATTERNS = [
+    r'favorites.*?(\d+)',
+    r'favorite.*?(\d+)',
+    r'heart.*?(\d+)',
+    r'(\d+).*?favorite',
+    r'(\d+).*?heart',
+    r'views.*?(\d+)',
+    r'view.*?(\d+)',
+    r'(\d+).*?view',
+]
+
+def _synthetic_page(size):
+    """HTML minificado en una linea, con muchos numeros y anclas solo al principio"""
+    head = '<button aria-label="favorite">12</button><span aria-label="Views">340</span>'
+    body = '<div class="c-1234" data-id="567890">Precio 7.690 € 2019</div>'
+    return head + body * (size // len(body))
+
+def _legacy_page_scan(page_source):
+    """Forma anterior: todos los patrones sobre el documento completo"""
+    found = 0
+    for pattern in LEGACY_PAGE_PATTERNS:
+        for match in re.finditer(pattern, page_source, re.IGNORECASE):
+            found += 1
+    return found
+
+def _bounded_page_scan(page_source):
+    """Forma nueva: anclas + ventana fija"""
+    scanner = BoundedPageScanner(page_source)
+    return sum(1 for _ in scanner.scan(LIKES_ANCHORED + VIEWS_K_ANCHORED + VIEWS_ANCHORED))
+
+def benchmark_page_scan(paths=None, sizes=(5000, 10000, 20000)):
+    """
+    Compara el escaneo de page_source: regex sobre todo el documento vs ventanas acotadas
+    paths: paginas grabadas (.html); si no hay, HTML sintetico de tamaño creciente
+    """
+    pages = []
+    if paths:
+        for path in paths:
+            with open(path, encoding='utf-8', errors='replace') as f:
+                pages.append((path, f.read()))
+    else:
+        pages = [(f"sintetico {size // 1000} KB", _synthetic_page(size)) for size in sizes]
+
+    print("BENCHMARK ESCANEO PAGE_SOURCE (likes/visitas)")
+    for name, page in pages:
+        start = time.perf_counter()
+        _legacy_page_scan(page)
+        legacy = time.perf_counter() - start
+
+        start = time.perf_counter()
+        _bounded_page_scan(page)
+        bounded = time.perf_counter() - start
+
+        print(f"• {name} ({len(page) / 1024:.0f} KB): antes {legacy * 1000:.1f} ms | acotado {bounded * 1000:.2f} ms")
+
+if __name__ == "__main__":
+    import sys
+    benchmark_patrones()
+    benchmark_page_scan(sys.argv[1:])
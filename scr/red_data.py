@@ -0,0 +1,175 @@
+"""
+Red del navegador - Bloqueo de recursos por CDP y lectura del log de rendimiento
+Evita descargar fotos, fuentes, video y trackers en cada perfil y anuncio
+
+- Categorias configurables: images, fonts, media, trackers
+- Bloqueo con Network.setBlockedURLs (patrones con comodin *)
+- Lista de permitidos POR PATRON: se descarta cada patron que contiene una entrada
+  (BLOCK_ALLOWLIST=googletagmanager.com quita *googletagmanager.com* y deja pasar los
+  scripts de GTM). Network.setBlockedURLs no admite excepciones por URL: las imagenes o
+  fuentes de un dominio permitido siguen bloqueadas por los patrones de extension (*.jpg...)
+- Peticiones bloqueadas contadas desde el log de rendimiento (Network.loadingFailed)
+- Cuerpos de respuestas JSON (listado del perfil) con Network.getResponseBody
+"""
+
+import base64
+import json
+import re
+import threading
+
+# Patrones por categoria. Los extractores solo leen texto, aria-label y meta del DOM
+BLOCK_CATEGORIES = {
+    'images': [
+        '*.jpg', '*.jpg?*', '*.jpeg', '*.jpeg?*', '*.png', '*.png?*', '*.gif', '*.gif?*',
+        '*.webp', '*.webp?*', '*.avif', '*.avif?*', '*.ico', '*cdn.wallapop.com/images/*',
+    ],
+    'fonts': [
+        '*.woff', '*.woff?*', '*.woff2', '*.woff2?*', '*.ttf', '*.ttf?*', '*.otf', '*.otf?*',
+        '*fonts.googleapis.com*', '*fonts.gstatic.com*',
+    ],
+    'media': [
+        '*.mp4', '*.mp4?*', '*.webm', '*.webm?*', '*.m3u8', '*.m3u8?*', '*.mp3', '*.mp3?*',
+    ],
+    'trackers': [
+        '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+        '*googlesyndication.com*', '*googleadservices.com*', '*adservice.google.*',
+        '*facebook.net*', '*connect.facebook.*', '*hotjar.com*', '*criteo.*',
+        '*amazon-adsystem.com*', '*scorecardresearch.com*', '*taboola.com*',
+        '*outbrain.com*', '*bat.bing.com*', '*analytics.tiktok.com*', '*quantserve.com*',
+        '*adnxs.com*', '*rubiconproject.com*', '*pubmatic.com*', '*smartadserver.com*',
+        '*didomi.io/*/events*', '*sentry.io*', '*newrelic.com*', '*nr-data.net*',
+    ],
+}
+
+# Tipo de recurso de CDP -> categoria (lo demas bloqueado son trackers)
+RESOURCE_TYPE_CATEGORY = {'Image': 'images', 'Font': 'fonts', 'Media': 'media'}
+
+# Tamaño medio estimado de cada recurso bloqueado (bytes), para estimar el ahorro
+ESTIMATED_BYTES = {
+    'images': 60 * 1024,
+    'fonts': 35 * 1024,
+    'media': 400 * 1024,
+    'trackers': 25 * 1024,
+}
+
+def build_blocked_urls(categories, allowlist=()):
+    """Patrones de bloqueo de las categorias pedidas, sin los que contienen una entrada permitida"""
+    urls = []
+    usadas = set()
+    for category in categories:
+        if category not in BLOCK_CATEGORIES:
+            print(f"[RED] AVISO: categoria de bloqueo desconocida '{category}'")
+            continue
+        for pattern in BLOCK_CATEGORIES[category]:
+            permitidas = [allowed for allowed in allowlist if allowed in pattern]
+            if permitidas:
+                usadas.update(permitidas)
+                continue
+            urls.append(pattern)
+
+    # La excepcion es por patron: una entrada que no aparece en ninguno no exime nada
+    for allowed in allowlist:
+        if allowed not in usadas:
+            print(f"[RED] AVISO: '{allowed}' no coincide con ningun patron de bloqueo; "
+                  f"sus peticiones siguen sujetas a los patrones genericos (*.jpg, *.woff...)")
+    return urls
+
+def enable_request_blocking(driver, categories, allowlist=()):
+    """Activa el bloqueo en la pestaña actual; devuelve los patrones aplicados"""
+    urls = build_blocked_urls(categories, allowlist)
+    if urls:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': urls})
+    return urls
+
+def drain_performance_log(driver):
+    """
+    Vacia el log de rendimiento de Chrome y devuelve los eventos CDP ({'method', 'params'})
+    Requiere la capacidad goog:loggingPrefs {'performance': 'ALL'}; si no, lista vacia
+    """
+    try:
+        entries = driver.get_log('performance')
+    except Exception:
+        return []
+
+    events = []
+    for entry in entries:
+        try:
+            events.append(json.loads(entry['message'])['message'])
+        except (ValueError, KeyError, TypeError):
+            continue
+    return events
+
+# Anuncios de un usuario en el API de Wallapop: /api/v3/users/<id>/items
+# (recomendaciones, busquedas u otros endpoints v3 no son el listado del vendedor)
+USER_ITEMS_API_RE = re.compile(r'api\.wallapop\.com/api/v3/users/([^/?#]+)/items')
+
+def listing_user_id(url):
+    """Id del usuario de una URL del listado de anuncios, o None si es otro endpoint"""
+    match = USER_ITEMS_API_RE.search(url)
+    return match.group(1) if match else None
+
+def json_response_bodies(driver, events, url_pattern=USER_ITEMS_API_RE):
+    """
+    Cuerpos de las respuestas JSON cuya URL encaja con url_pattern: [(url, texto)]
+    Llamar antes de salir de la pagina: Chrome descarta los cuerpos al navegar
+    """
+    bodies = []
+    for event in events:
+        if event.get('method') != 'Network.responseReceived':
+            continue
+        params = event.get('params', {})
+        response = params.get('response', {})
+        url = response.get('url', '')
+        if 'json' not in response.get('mimeType', '') or not url_pattern.search(url):
+            continue
+
+        try:
+            result = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': params['requestId']})
+        except Exception:
+            continue
+
+        body = result.get('body', '')
+        if result.get('base64Encoded'):
+            body = base64.b64decode(body).decode('utf-8', errors='replace')
+        bodies.append((url, body))
+    return bodies
+
+class NetworkStats:
+    """Peticiones bloqueadas y bytes descargados por ejecucion (seguro entre hilos)"""
+
+    def __init__(self):
+        self.bloqueadas = {category: 0 for category in BLOCK_CATEGORIES}
+        self.peticiones = 0
+        self.bytes_descargados = 0
+        self._lock = threading.Lock()
+
+    def record_events(self, events):
+        """Cuenta peticiones, bytes recibidos y bloqueos de una tanda de eventos"""
+        with self._lock:
+            for event in events:
+                method = event.get('method')
+                params = event.get('params', {})
+                if method == 'Network.requestWillBeSent':
+                    self.peticiones += 1
+                elif method == 'Network.loadingFinished':
+                    self.bytes_descargados += int(params.get('encodedDataLength') or 0)
+                elif method == 'Network.loadingFailed' and params.get('blockedReason') == 'inspector':
+                    category = RESOURCE_TYPE_CATEGORY.get(params.get('type'), 'trackers')
+                    self.bloqueadas[category] += 1
+
+    def print_report(self):
+        """Resumen de bloqueo de recursos"""
+        total = sum(self.bloqueadas.values())
+        if not self.peticiones and not total:
+            return
+
+        ahorro = sum(count * ESTIMATED_BYTES[category] for category, count in self.bloqueadas.items())
+        print(f"\nBLOQUEO DE RECURSOS:")
+        print(f"• Peticiones: {self.peticiones:,} | bloqueadas: {total:,} | descargado: {self.bytes_descargados/1024/1024:.1f} MB")
+        for category, count in self.bloqueadas.items():
+            if count:
+                print(f"• {category}: {count:,} bloqueadas (~{count * ESTIMATED_BYTES[category]/1024/1024:.1f} MB)")
+        print(f"• Ahorro estimado: ~{ahorro/1024/1024:.1f} MB")
+
+NETWORK_STATS = NetworkStats()
@@ -14,6 +14,12 @@ import time
 import re
 import os
 import sys
+import json
+import argparse
+import queue
+from collections import deque
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 from datetime import datetime
 from selenium import webdriver
@@ -27,12 +33,87 @@ import hashlib
 
 # Importar modulos locales
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from config import get_moto_accounts, GOOGLE_SHEET_ID_DATA
+from config import get_moto_accounts, GOOGLE_SHEET_ID_DATA, AD_WORKERS, ACCOUNT_WORKERS, CACHE_DIR, EXTRACTION_MODE, ZERO_IMPLICIT_WAIT, HTTP_FAST_PATH, HTTP_MAX_CONNECTIONS, LOAD_MORE_TIMEOUT, STATS_REFRESH, BLOCK_RESOURCES, BLOCK_ALLOWLIST, BROWSER_MAX_PAGES, BROWSER_MAX_RSS_MB, RESUME, PIPELINE_MODE, PIPELINE_PARSERS, AD_DEADLINE, AD_RETRY_DEADLINE, PAGE_LOAD_STRATEGY, BROWSER_TABS, LISTING_CAPTURE
 from google_sheets_data import GoogleSheetsData
+from http_data import HttpItemFetcher, parse_listing_payload
+import patrones_data as patrones
+import red_data as red
 
-def setup_browser():
+# Espera implicita clasica: cada find_element(s) que no encuentra nada bloquea este tiempo
+IMPLICIT_WAIT_SECONDS = 0.3
+
+# Contabilidad de busquedas fallidas por campo (cada fallo = una espera implicita)
+WAIT_STATS = {}
+_wait_stats_lock = threading.Lock()
+
+def _record_lookup(field, found, elapsed):
+    """Registra una busqueda de elementos para el informe de esperas"""
+    with _wait_stats_lock:
+        stats = WAIT_STATS.setdefault(field, {'busquedas': 0, 'fallos': 0, 'tiempo_fallos': 0.0})
+        stats['busquedas'] += 1
+        if not found:
+            stats['fallos'] += 1
+            stats['tiempo_fallos'] += elapsed
+
+def find_all(driver, by, selector, field):
+    """
+    find_elements con contabilidad de fallos por campo
+    Con presupuesto por anuncio la espera implicita se recorta a lo que queda;
+    agotado, no se busca y el anuncio queda marcado como recortado
+    """
+    remaining = remaining_ad_budget()
+    if remaining is not None and remaining <= 0:
+        _ad_deadline.recortado = True
+        return []
+    
+    capped = remaining is not None and not ZERO_IMPLICIT_WAIT and remaining < IMPLICIT_WAIT_SECONDS
+    start = time.time()
+    if capped:
+        driver.implicitly_wait(remaining)
+    try:
+        elements = driver.find_elements(by, selector)
+    finally:
+        if capped:
+            driver.implicitly_wait(IMPLICIT_WAIT_SECONDS)
+    _record_lookup(field, bool(elements), time.time() - start)
+    return elements
+
+def find_first(driver, by, selector, field):
+    """Primer elemento o None, con contabilidad de fallos por campo"""
+    elements = find_all(driver, by, selector, field)
+    return elements[0] if elements else None
+
+def print_wait_report():
+    """Resumen de tiempo en esperas implicitas por campo"""
+    if not WAIT_STATS:
+        return
+    
+    if ZERO_IMPLICIT_WAIT:
+        print(f"\nESPERAS IMPLICITAS ELIMINADAS (modo espera cero, {IMPLICIT_WAIT_SECONDS}s por fallo):")
+    else:
+        print(f"\nESPERAS IMPLICITAS ({IMPLICIT_WAIT_SECONDS}s por busqueda fallida):")
+    
+    total = 0.0
+    for field, stats in sorted(WAIT_STATS.items(), key=lambda item: -item[1]['fallos']):
+        ahorro = stats['fallos'] * IMPLICIT_WAIT_SECONDS
+        total += ahorro
+        if ZERO_IMPLICIT_WAIT:
+            print(f"• {field}: {stats['fallos']}/{stats['busquedas']} fallos | {ahorro:.1f}s eliminados | {stats['tiempo_fallos']:.1f}s reales")
+        else:
+            print(f"• {field}: {stats['fallos']}/{stats['busquedas']} fallos | {stats['tiempo_fallos']:.1f}s esperando")
+    
+    if ZERO_IMPLICIT_WAIT:
+        print(f"• TOTAL eliminado: {total/60:.1f} minutos")
+    else:
+        print(f"• TOTAL evitable con ZERO_IMPLICIT_WAIT=true: {total/60:.1f} minutos")
+
+# Log de rendimiento de Chrome activo (bloqueo de recursos o captura del listado)
+PERFORMANCE_LOG = bool(BLOCK_RESOURCES) or LISTING_CAPTURE
+
+def setup_browser(page_load_strategy=None):
     """Configura navegador Chrome ULTRA RAPIDO"""
     options = Options()
+    options.page_load_strategy = page_load_strategy or PAGE_LOAD_STRATEGY
     
     # Configuraciones de maxima velocidad
     options.add_argument("--headless")  
@@ -59,24 +140,211 @@ def setup_browser():
     options.add_argument("--log-level=3")
     options.add_experimental_option('excludeSwitches', ['enable-logging'])
     
+    # Log de rendimiento: bloqueos contados y respuestas del listado capturadas
+    if PERFORMANCE_LOG:
+        options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    
     browser = webdriver.Chrome(options=options)
-    browser.implicitly_wait(0.3)
+    browser.implicitly_wait(0 if ZERO_IMPLICIT_WAIT else IMPLICIT_WAIT_SECONDS)
+    
+    if BLOCK_RESOURCES:
+        try:
+            red.enable_request_blocking(browser, BLOCK_RESOURCES, BLOCK_ALLOWLIST)
+        except Exception as e:
+            print(f"[RED] No se pudo activar el bloqueo de recursos: {str(e)}")
     return browser
 
+def drain_network_events(driver):
+    """Vacia el log de rendimiento (si esta activo) y cuenta bloqueos; devuelve los eventos"""
+    if not PERFORMANCE_LOG:
+        return []
+    events = red.drain_performance_log(driver)
+    red.NETWORK_STATS.record_events(events)
+    return events
+
+# PRESUPUESTO POR ANUNCIO: limite de carga de pagina + esperas recortadas al tiempo restante
+PAGE_LOAD_TIMEOUT_DEFAULT = 300  # valor por defecto de Chrome
+AD_DEFERRED = object()  # marca de anuncio aplazado a la cola de reintentos
+AD_LATENCIES = []
+_ad_latencies_lock = threading.Lock()
+_ad_deadline = threading.local()
+
+class AdDeadlineExceeded(Exception):
+    """El anuncio supero su presupuesto de tiempo"""
+
+def capped_wait(seconds):
+    """Espera recortada al presupuesto restante del anuncio en curso (si lo hay)"""
+    deadline = getattr(_ad_deadline, 'fin', None)
+    if deadline is None:
+        return seconds
+    return max(0, min(seconds, deadline - time.time()))
+
+def mark_wait_truncated(granted, requested):
+    """Una espera que vence tras recortarse al presupuesto deja el anuncio como recortado"""
+    if granted < requested:
+        _ad_deadline.recortado = True
+
+def remaining_ad_budget():
+    """Segundos que le quedan al anuncio en curso (None sin presupuesto)"""
+    deadline = getattr(_ad_deadline, 'fin', None)
+    return None if deadline is None else deadline - time.time()
+
+def ad_deadline_expired():
+    deadline = getattr(_ad_deadline, 'fin', None)
+    return deadline is not None and time.time() >= deadline
+
+def check_ad_truncated():
+    """Aplaza el anuncio si alguna busqueda se salto por falta de presupuesto (datos incompletos)"""
+    if getattr(_ad_deadline, 'recortado', False):
+        raise AdDeadlineExceeded()
+
+def check_ad_deadline():
+    """Corta el anuncio si ya no queda presupuesto"""
+    if ad_deadline_expired():
+        raise AdDeadlineExceeded()
+
+def run_ad_with_deadline(driver, ad_url, account_name, page_function=None, budget=None):
+    """
+    page_function(driver, ad_url, account_name) con presupuesto de tiempo (AD_DEADLINE)
+    El presupuesto se aplica DENTRO de page_function (navegacion, esperas y busquedas
+    recortadas); un resultado completo se devuelve aunque llegue justo pasado el limite
+    Lanza AdDeadlineExceeded si se agota; registra la latencia de cada intento
+    """
+    page_function = page_function or process_ad
+    budget = AD_DEADLINE if budget is None else budget
+    start = time.time()
+    
+    if not budget:
+        try:
+            return page_function(driver, ad_url, account_name)
+        finally:
+            _record_ad_latency(time.time() - start)
+    
+    _ad_deadline.fin = start + budget
+    _ad_deadline.recortado = False
+    try:
+        driver.set_page_load_timeout(budget)
+        return page_function(driver, ad_url, account_name)
+    finally:
+        _ad_deadline.fin = None
+        _ad_deadline.recortado = False
+        _record_ad_latency(time.time() - start)
+        try:
+            driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT_DEFAULT)
+        except Exception:
+            pass
+
+def _record_ad_latency(elapsed):
+    with _ad_latencies_lock:
+        AD_LATENCIES.append(elapsed)
+
+def percentile(values, pct):
+    """Percentil por rango mas cercano de una lista ya ordenada"""
+    if not values:
+        return 0.0
+    index = max(0, min(len(values) - 1, -(-pct * len(values) // 100) - 1))
+    return values[index]
+
+def print_latency_report():
+    """p50/p95/p99 de latencia por anuncio (cada intento, incluidos los reintentos)"""
+    with _ad_latencies_lock:
+        latencies = sorted(AD_LATENCIES)
+    if not latencies:
+        return
+    
+    print(f"\nLATENCIA POR ANUNCIO ({len(latencies)} intentos):")
+    print(f"• p50 {percentile(latencies, 50):.2f}s | p95 {percentile(latencies, 95):.2f}s | p99 {percentile(latencies, 99):.2f}s | max {latencies[-1]:.2f}s")
+
+def early_return_navigation(driver):
+    """True si driver.get vuelve antes de la carga completa (estrategia eager/none)"""
+    try:
+        return driver.capabilities.get('pageLoadStrategy', 'normal') != 'normal'
+    except Exception:
+        return False
+
 def safe_navigate(driver, url):
     """Navega ULTRA RAPIDO sin reintentos innecesarios"""
+    # Con eager/none la pausa fija sobra: cada pagina espera su propia condicion
+    settle = 0 if early_return_navigation(driver) else 0.2
     try:
         driver.get(url)
-        time.sleep(0.2)
+        time.sleep(settle)
         return True
     except Exception:
+        if ad_deadline_expired():
+            return False  # Sin presupuesto para un segundo intento
         try:
             driver.get(url)
-            time.sleep(0.3)
+            time.sleep(settle * 1.5)
             return True
         except:
             return False
 
+# Pagina lista: URL ya es la del anuncio (con 'none' puede seguir la anterior) + h1 + precio
+AD_READY_SCRIPT = """
+var expected = arguments[0];
+if (expected && location.href.indexOf(expected) === -1) return false;
+if (!document.querySelector('h1')) return false;
+return !!document.evaluate(arguments[1], document, null,
+    XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+"""
+
+# Perfil listo: URL del perfil + al menos un enlace a anuncio
+PROFILE_READY_SCRIPT = """
+var expected = arguments[0];
+if (expected && location.href.indexOf(expected) === -1) return false;
+return !!document.querySelector('a[href*="/item/"]');
+"""
+
+def wait_for_ad_ready(driver, ad_url=None, timeout=5):
+    """
+    Condicion unica de "pagina lista" por anuncio: URL + titulo (h1) + precio
+    Sustituye las esperas implicitas y la carga completa de la pagina (eager/none)
+    """
+    expected = ad_url.split('/item/')[-1].split('?')[0] if ad_url else ''
+    try:
+        WebDriverWait(driver, capped_wait(timeout), poll_frequency=0.1).until(
+            lambda d: d.execute_script(AD_READY_SCRIPT, expected, PRICE_ANY_XPATH)
+        )
+        return True
+    except:
+        return False
+
+# Contadores listos: algun nodo de likes y alguno de visitas (se hidratan tras titulo y precio)
+STATS_READY_SCRIPT = """
+var present = function(selectors) {
+    for (var i = 0; i < selectors.length; i++) {
+        try { if (document.querySelector(selectors[i])) return true; } catch (e) {}
+    }
+    return false;
+};
+return present(arguments[0]) && present(arguments[1]);
+"""
+
+def wait_for_stats_ready(driver, timeout=3):
+    """
+    Espera acotada a los nodos de likes y visitas (modo espera cero / eager / none)
+    Sin esperas implicitas se leerian como 0 si aun no se han pintado
+    """
+    try:
+        WebDriverWait(driver, capped_wait(timeout), poll_frequency=0.1).until(
+            lambda d: d.execute_script(STATS_READY_SCRIPT, LIKE_SELECTORS, VIEW_SELECTORS)
+        )
+        return True
+    except:
+        return False
+
+def wait_for_profile_ready(driver, user_url, timeout=10):
+    """Perfil con anuncios pintados (solo hace falta con eager/none)"""
+    expected = user_url.split('/user/')[-1].split('?')[0]
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+            lambda d: d.execute_script(PROFILE_READY_SCRIPT, expected)
+        )
+        return True
+    except:
+        return False
+
 def accept_cookies(driver):
     """Acepta cookies de forma ultrarapida"""
     try:
@@ -89,91 +357,362 @@ def accept_cookies(driver):
     except:
         return False
 
+def process_tree_rss_mb(root_pid):
+    """RSS (MB) de un proceso y todos sus descendientes, leido de /proc (None si no hay /proc)"""
+    if not os.path.isdir('/proc'):
+        return None
+    
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+            children.setdefault(ppid, []).append(int(entry))
+        except (OSError, ValueError, IndexError):
+            continue
+    
+    total_kb = 0
+    pending = [root_pid]
+    while pending:
+        pid = pending.pop()
+        try:
+            with open(f'/proc/{pid}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total_kb += int(line.split()[1])
+                        break
+        except (OSError, ValueError, IndexError):
+            pass
+        pending.extend(children.get(pid, []))
+    return total_kb / 1024
+
+BROWSER_LIFECYCLES = []
+_lifecycles_lock = threading.Lock()
+
+class DriverLifecycle:
+    """
+    CICLO DE VIDA DEL NAVEGADOR: recicla Chrome cada N paginas o al superar X MB de RSS
+    - Conserva las cookies (consentimiento aceptado) entre reciclajes
+    - Si Chrome cae (WebDriverException), lo reinicia y repite la pagina una vez
+    - Un TimeoutException es una pagina lenta, no una caida: cuenta como fallo
+    """
+    RSS_CHECK_EVERY = 10  # paginas entre lecturas de /proc
+    
+    def __init__(self, name='principal', max_pages=BROWSER_MAX_PAGES, max_rss_mb=BROWSER_MAX_RSS_MB):
+        self.name = name
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.driver = setup_browser()
+        self.pages = 0
+        self.pages_since_start = 0
+        self.latencies = []
+        self.recycles = []
+        self.peak_rss_mb = 0.0
+        with _lifecycles_lock:
+            BROWSER_LIFECYCLES.append(self)
+    
+    def rss_mb(self):
+        """RSS de chromedriver + Chrome + renderers (None si no se puede medir)"""
+        try:
+            rss = process_tree_rss_mb(self.driver.service.process.pid)
+        except Exception:
+            return None
+        if rss:
+            self.peak_rss_mb = max(self.peak_rss_mb, rss)
+        return rss
+    
+    def is_alive(self):
+        try:
+            self.driver.execute_script("return 1;")
+            return True
+        except Exception:
+            return False
+    
+    def _restore_cookies(self, cookies):
+        """Copia las cookies al navegador nuevo; si no hay, acepta el banner"""
+        if not safe_navigate(self.driver, "https://es.wallapop.com"):
+            return 0
+        restored = 0
+        for cookie in cookies:
+            try:
+                self.driver.add_cookie(cookie)
+                restored += 1
+            except Exception:
+                continue
+        if not restored:
+            accept_cookies(self.driver)
+        return restored
+    
+    def recycle(self, reason):
+        """Cierra Chrome y abre uno nuevo con las mismas cookies"""
+        rss = self.rss_mb()
+        cookies = []
+        try:
+            drain_network_events(self.driver)
+            cookies = self.driver.get_cookies()
+        except Exception:
+            pass
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+        
+        start = time.time()
+        self.driver = setup_browser()
+        restored = self._restore_cookies(cookies)
+        
+        self.recycles.append({'motivo': reason, 'paginas': self.pages_since_start, 'rss_mb': rss, 'tiempo': time.time() - start})
+        rss_text = f"{rss:.0f} MB" if rss else "RSS n/d"
+        print(f"[NAVEGADOR] {self.name}: reciclado ({reason}) tras {self.pages_since_start} paginas | {rss_text} | {restored} cookies")
+        self.pages_since_start = 0
+    
+    def recycle_reason(self):
+        """Motivo para reciclar (limite de paginas o de memoria), o None"""
+        if self.max_pages and self.pages_since_start >= self.max_pages:
+            return "limite de paginas"
+        
+        if self.pages_since_start and self.pages_since_start % self.RSS_CHECK_EVERY == 0:
+            rss = self.rss_mb()
+            if self.max_rss_mb and rss and rss > self.max_rss_mb:
+                return f"RSS {rss:.0f} MB"
+        return None
+    
+    def ensure_fresh(self):
+        """Recicla si se supera el limite de paginas o de memoria"""
+        reason = self.recycle_reason()
+        if reason:
+            self.recycle(reason)
+    
+    def run_page(self, page_function, *args):
+        """page_function(driver, *args) con reciclaje previo y reinicio si Chrome cae"""
+        self.ensure_fresh()
+        start = time.time()
+        
+        try:
+            try:
+                result = page_function(self.driver, *args)
+            except TimeoutException as e:
+                # Subclase de WebDriverException, pero Chrome sigue vivo: pagina fallida, sin reinicio
+                print(f"[NAVEGADOR] {self.name}: pagina sin respuesta a tiempo: {str(e).strip()[:80]}")
+                return None
+            except WebDriverException:
+                result = None
+            
+            if result is None and not self.is_alive():
+                self.recycle("caida del navegador")
+                try:
+                    result = page_function(self.driver, *args)
+                except WebDriverException:
+                    result = None
+            return result
+        finally:
+            self.pages += 1
+            self.pages_since_start += 1
+            self.latencies.append(time.time() - start)
+    
+    def add_pages(self, count, latencies=()):
+        """Paginas procesadas fuera de run_page (modo multi-pestaña)"""
+        self.pages += count
+        self.pages_since_start += count
+        self.latencies.extend(latencies)
+    
+    def quit(self):
+        self.rss_mb()
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+
+def print_lifecycle_report():
+    """Reciclajes, pico de RSS y latencia por pagina (inicio vs final) de cada navegador"""
+    with _lifecycles_lock:
+        lifecycles = [lc for lc in BROWSER_LIFECYCLES if lc.pages]
+    if not lifecycles:
+        return
+    
+    print(f"\nCICLO DE VIDA DEL NAVEGADOR:")
+    for lc in lifecycles:
+        tramo = max(1, len(lc.latencies) // 5)
+        inicio = sum(lc.latencies[:tramo]) / tramo
+        final = sum(lc.latencies[-tramo:]) / tramo
+        rss_text = f"{lc.peak_rss_mb:.0f} MB" if lc.peak_rss_mb else "n/d"
+        print(f"• {lc.name}: {lc.pages} paginas | {len(lc.recycles)} reciclajes | pico RSS {rss_text} | latencia {inicio:.2f}s (inicio) -> {final:.2f}s (final)")
+        for event in lc.recycles:
+            print(f"    - {event['motivo']} tras {event['paginas']} paginas ({event['tiempo']:.1f}s)")
+
+# SELECTORES COMPARTIDOS: extraccion clasica (WebDriver) y por snapshot (un solo JS)
+TITLE_H1_SELECTORS = [
+    "h1",
+    "h1[class*='title']",
+    "h1[class*='Title']",
+    "[class*='title'] h1",
+    "[class*='Title'] h1"
+]
+
+TITLE_DESCRIPTION_SELECTORS = [
+    "[class*='description']",
+    "section[class*='description']", 
+    "div[class*='description']",
+    "[class*='Description']"
+]
+
+TITLE_BRANDS = ['HONDA', 'YAMAHA', 'KAWASAKI', 'SUZUKI', 'BMW', 'KTM', 'DUCATI', 'PIAGGIO', 'VESPA', 'APRILIA', 'TRIUMPH']
+
+# SELECTORES CSS ESPECIFICOS DE WALLAPOP (del scraper de coches exitoso)
+PRICE_SELECTORS = [
+    "span.item-detail-price_ItemDetailPrice--standardFinanced__f9ceG",
+    ".item-detail-price_ItemDetailPrice--standardFinanced__f9ceG", 
+    "span.item-detail-price_ItemDetailPrice--standard__fMa16",
+    "span.item-detail-price_ItemDetailPrice--financed__LgMRH",
+    ".item-detail-price_ItemDetailPrice--financed__LgMRH",
+    "[class*='ItemDetailPrice']",
+    "[class*='standardFinanced'] span",
+    "[class*='financed'] span"
+]
+
+PRICE_CONTADO_XPATH = "//span[text()='Precio al contado']/following::span[contains(@class, 'ItemDetailPrice') and contains(text(), '€')]"
+PRICE_ANY_XPATH = "//*[contains(text(), '€')]"
+
+LIKE_SELECTORS = [
+    "button[aria-label*='favorite'] span",
+    "button[aria-label*='Favorite'] span", 
+    "[aria-label*='favorite']",
+    "[aria-label*='Favorite']",
+    "button[class*='favorite'] span",
+    "button[class*='heart'] span",
+    "[class*='favorite-counter']",
+    "[class*='heart']"
+]
+
+DESCRIPTION_WAIT_SELECTOR = "section.item-detail_ItemDetailTwoColumns__description__0DKb0"
+
+# EXTRAER DE LA DESCRIPCION usando selector especifico de Wallapop
+DESCRIPTION_SELECTORS = [
+    "section.item-detail_ItemDetailTwoColumns__description__0DKb0",
+    ".item-detail_ItemDetailTwoColumns__description__0DKb0",
+    "[class*='description']",
+    "section[class*='description']"
+]
+
+VIEW_SELECTORS = [
+    'span[aria-label="Views"]',
+    '[aria-label*="Views"]',
+    '[aria-label*="views"]',
+    '[class*="views"]',
+    '[class*="Views"]'
+]
+
+def _title_from_h1_text(text):
+    """Valida un texto de H1 como titulo (None si no lo parece)"""
+    if text and len(text) > 3 and len(text) < 100:
+        # Validar que parece un titulo de moto
+        if any(word.upper() in text.upper() for word in TITLE_BRANDS):
+            return text
+        elif len(text) > 10:  # Si es suficientemente largo, probablemente es el titulo
+            return text
+    return None
+
+def _title_from_og(content):
+    """Titulo desde og:title (None si no sirve)"""
+    if content and len(content) > 5:
+        return content.split(' - ')[0].strip()  # Quitar " - Wallapop"
+    return None
+
+def _title_from_description(desc_text):
+    """Titulo desde la primera linea de la descripcion (None si no sirve)"""
+    if desc_text:
+        first_line = desc_text.split('\n')[0].strip()
+        if len(first_line) > 5 and len(first_line) < 80:
+            return first_line
+    return None
+
 def extract_title_robust(driver):
     """Extrae titulo con MULTIPLES ESTRATEGIAS ROBUSTAS"""
     
     # ESTRATEGIA 1: Selectores H1 genericos
-    h1_selectors = [
-        "h1",
-        "h1[class*='title']",
-        "h1[class*='Title']",
-        "[class*='title'] h1",
-        "[class*='Title'] h1"
-    ]
-    
-    for selector in h1_selectors:
+    for selector in TITLE_H1_SELECTORS:
         try:
-            elements = driver.find_elements(By.CSS_SELECTOR, selector)
+            elements = find_all(driver, By.CSS_SELECTOR, selector, 'titulo')
             for element in elements:
-                text = element.text.strip()
-                if text and len(text) > 3 and len(text) < 100:
-                    # Validar que parece un titulo de moto
-                    if any(word.upper() in text.upper() for word in ['HONDA', 'YAMAHA', 'KAWASAKI', 'SUZUKI', 'BMW', 'KTM', 'DUCATI', 'PIAGGIO', 'VESPA', 'APRILIA', 'TRIUMPH']):
-                        return text
-                    elif len(text) > 10:  # Si es suficientemente largo, probablemente es el titulo
-                        return text
+                title = _title_from_h1_text(element.text.strip())
+                if title:
+                    return title
         except:
             continue
     
     # ESTRATEGIA 2: Buscar en metadatos
     try:
-        title_meta = driver.find_element(By.XPATH, "//meta[@property='og:title']")
-        content = title_meta.get_attribute("content")
-        if content and len(content) > 5:
-            return content.split(' - ')[0].strip()  # Quitar " - Wallapop"
+        title_meta = find_first(driver, By.XPATH, "//meta[@property='og:title']", 'titulo')
+        if title_meta is not None:
+            title = _title_from_og(title_meta.get_attribute("content"))
+            if title:
+                return title
     except:
         pass
     
     # ESTRATEGIA 3: Extraer desde la descripcion (primera linea)
-    try:
-        desc_selectors = [
-            "[class*='description']",
-            "section[class*='description']", 
-            "div[class*='description']",
-            "[class*='Description']"
-        ]
-        
-        for selector in desc_selectors:
-            try:
-                element = driver.find_element(By.CSS_SELECTOR, selector)
-                desc_text = element.text.strip()
-                if desc_text:
-                    first_line = desc_text.split('\n')[0].strip()
-                    if len(first_line) > 5 and len(first_line) < 80:
-                        return first_line
-            except:
+    for selector in TITLE_DESCRIPTION_SELECTORS:
+        try:
+            element = find_first(driver, By.CSS_SELECTOR, selector, 'titulo')
+            if element is None:
                 continue
-    except:
-        pass
+            title = _title_from_description(element.text.strip())
+            if title:
+                return title
+        except:
+            continue
     
     return "Titulo no encontrado"
 
+def _highest_price_from_texts(texts):
+    """De los textos con '€' toma el precio realista mas alto (None si no hay)"""
+    valid_prices = []
+    for text in texts:
+        try:
+            text = text.strip().replace('&nbsp;', ' ').replace('\xa0', ' ')
+            if not text:
+                continue
+            
+            # REGEX PARA CAPTURAR PRECIOS REALISTAS DE MOTOS (registro precompilado)
+            for pattern in patrones.PRICE_ANY.patterns:
+                price_matches = pattern.findall(text)
+                for price_match in price_matches:
+                    try:
+                        price_clean = price_match.replace('.', '')
+                        price_value = int(price_clean)
+                        
+                        # RANGO PARA MOTOS: 500€ - 60,000€
+                        if 500 <= price_value <= 60000:
+                            formatted_price = f"{price_value:,}".replace(',', '.') + " €" if price_value >= 1000 else f"{price_value} €"
+                            valid_prices.append((price_value, formatted_price))
+                    except:
+                        continue
+        except:
+            continue
+    
+    # Tomar el precio mas alto como precio principal
+    if valid_prices:
+        valid_prices = sorted(set(valid_prices), key=lambda x: x[0], reverse=True)
+        return valid_prices[0][1]
+    return None
+
 def extract_price_robust(driver):
     """Extrae precio usando SELECTORES EXITOSOS del scraper de COCHES"""
     
     # ESPERAR A QUE CARGUEN LOS PRECIOS (copiado del scraper de coches)
     try:
-        WebDriverWait(driver, 5).until(
-            EC.presence_of_element_located((By.XPATH, "//*[contains(text(), '€')]"))
+        WebDriverWait(driver, capped_wait(5)).until(
+            EC.presence_of_element_located((By.XPATH, PRICE_ANY_XPATH))
         )
     except:
         pass
     
-    # ESTRATEGIA 1: SELECTORES CSS ESPECIFICOS DE WALLAPOP (del scraper de coches exitoso)
-    price_selectors = [
-        "span.item-detail-price_ItemDetailPrice--standardFinanced__f9ceG",
-        ".item-detail-price_ItemDetailPrice--standardFinanced__f9ceG", 
-        "span.item-detail-price_ItemDetailPrice--standard__fMa16",
-        "span.item-detail-price_ItemDetailPrice--financed__LgMRH",
-        ".item-detail-price_ItemDetailPrice--financed__LgMRH",
-        "[class*='ItemDetailPrice']",
-        "[class*='standardFinanced'] span",
-        "[class*='financed'] span"
-    ]
-    
-    for selector in price_selectors:
+    # ESTRATEGIA 1: SELECTORES CSS ESPECIFICOS DE WALLAPOP
+    for selector in PRICE_SELECTORS:
         try:
-            elements = driver.find_elements(By.CSS_SELECTOR, selector)
+            elements = find_all(driver, By.CSS_SELECTOR, selector, 'precio')
             for element in elements:
                 text = element.text.strip()
                 if text and '€' in text:
@@ -185,9 +724,7 @@ def extract_price_robust(driver):
     
     # ESTRATEGIA 2: XPATH POR ETIQUETA "Precio al contado" (del scraper de coches)
     try:
-        contado_elements = driver.find_elements(By.XPATH, 
-            "//span[text()='Precio al contado']/following::span[contains(@class, 'ItemDetailPrice') and contains(text(), '€')]"
-        )
+        contado_elements = find_all(driver, By.XPATH, PRICE_CONTADO_XPATH, 'precio')
         
         if contado_elements:
             raw_price = contado_elements[0].text.strip()
@@ -197,41 +734,18 @@ def extract_price_robust(driver):
     
     # ESTRATEGIA 3: BUSCAR CUALQUIER PRECIO EN WALLAPOP (metodo exitoso del scraper de coches)
     try:
-        price_elements = driver.find_elements(By.XPATH, "//*[contains(text(), '€')]")
+        price_elements = find_all(driver, By.XPATH, PRICE_ANY_XPATH, 'precio')
         
-        valid_prices = []
+        texts = []
         for elem in price_elements[:10]:
             try:
-                text = elem.text.strip().replace('&nbsp;', ' ').replace('\xa0', ' ')
-                if not text:
-                    continue
-                
-                # REGEX PARA CAPTURAR PRECIOS REALISTAS DE MOTOS
-                price_patterns = [
-                    r'(\d{1,3}(?:\.\d{3})+)\s*€',
-                    r'(\d{1,6})\s*€'
-                ]
-                
-                for pattern in price_patterns:
-                    price_matches = re.findall(pattern, text)
-                    for price_match in price_matches:
-                        try:
-                            price_clean = price_match.replace('.', '')
-                            price_value = int(price_clean)
-                            
-                            # RANGO PARA MOTOS: 500€ - 60,000€
-                            if 500 <= price_value <= 60000:
-                                formatted_price = f"{price_value:,}".replace(',', '.') + " €" if price_value >= 1000 else f"{price_value} €"
-                                valid_prices.append((price_value, formatted_price))
-                        except:
-                            continue
+                texts.append(elem.text)
             except:
                 continue
         
-        # Tomar el precio mas alto como precio principal
-        if valid_prices:
-            valid_prices = sorted(set(valid_prices), key=lambda x: x[0], reverse=True)
-            return valid_prices[0][1]
+        price = _highest_price_from_texts(texts)
+        if price:
+            return price
                     
     except:
         pass
@@ -248,93 +762,173 @@ def extract_price_from_text_wallapop(text):
     if not clean_text:
         return "No especificado"
     
-    # REGEX ESPECIFICOS PARA WALLAPOP (copiados del scraper de coches exitoso)
-    price_patterns = [
-        r'(\d{1,3}(?:\.\d{3})+)\s*€',           # "7.690 €"
-        r'(\d{4,6})\s*€',                       # "7690 €"
-        r'(\d{1,2})\s*\.\s*(\d{3})\s*€',        # "7 . 690 €"
-        r'(\d{1,2}),(\d{3})\s*€',               # "7,690 €"
-        r'€\s*(\d{1,2}\.?\d{3,6})',             # "€ 7690"
-        r'(\d{1,2}\.?\d{3,6})\s*euros?',        # "7690 euros"
-    ]
-    
-    for pattern in price_patterns:
-        matches = re.finditer(pattern, clean_text, re.IGNORECASE)
-        for match in matches:
-            try:
-                if len(match.groups()) == 2:  # Formato como 7.690
-                    price_value = int(match.group(1) + match.group(2))
-                else:
-                    price_str = match.group(1).replace('.', '').replace(',', '')
-                    price_value = int(price_str)
-                
-                # RANGO PARA MOTOS: 500€ - 60,000€
-                if 500 <= price_value <= 60000:
-                    return f"{price_value:,} €".replace(',', '.')
-            except:
-                continue
+    # REGEX ESPECIFICOS PARA WALLAPOP (registro precompilado, mismo orden)
+    for pattern, match in patrones.PRICE_TEXT.iter_matches(clean_text):
+        try:
+            if len(match.groups()) == 2:  # Formato como 7.690
+                price_value = int(match.group(1) + match.group(2))
+            else:
+                price_str = match.group(1).replace('.', '').replace(',', '')
+                price_value = int(price_str)
+            
+            # RANGO PARA MOTOS: 500€ - 60,000€
+            if 500 <= price_value <= 60000:
+                return f"{price_value:,} €".replace(',', '.')
+        except:
+            continue
     
     return "No especificado"
 
+def _likes_from_element(text, aria_label):
+    """Likes desde el texto o aria-label de un elemento (None si no hay)"""
+    # Buscar numero en el texto
+    text = text.strip()
+    if text.isdigit() and 0 <= int(text) <= 1000:
+        return int(text)
+    
+    # Buscar en aria-label
+    numbers = patrones.DIGITS.findall(aria_label or '')
+    if numbers:
+        likes_value = int(numbers[0])
+        if 0 <= likes_value <= 1000:
+            return likes_value
+    return None
+
+def _likes_from_page_source(page_source):
+    """Busca likes junto a sus anclas en el HTML, ventana acotada (None si no hay)"""
+    for match in patrones.BoundedPageScanner(page_source).scan(patrones.LIKES_ANCHORED):
+        try:
+            likes_value = int(match.group(1))
+            if 0 <= likes_value <= 1000:
+                return likes_value
+        except:
+            continue
+    return None
+
 def extract_likes_robust(driver):
     """Extrae likes con MULTIPLES ESTRATEGIAS"""
     
     # ESTRATEGIA 1: Selectores especificos de favoritos
-    like_selectors = [
-        "button[aria-label*='favorite'] span",
-        "button[aria-label*='Favorite'] span", 
-        "[aria-label*='favorite']",
-        "[aria-label*='Favorite']",
-        "button[class*='favorite'] span",
-        "button[class*='heart'] span",
-        "[class*='favorite-counter']",
-        "[class*='heart']"
-    ]
-    
-    for selector in like_selectors:
+    for selector in LIKE_SELECTORS:
         try:
-            elements = driver.find_elements(By.CSS_SELECTOR, selector)
+            elements = find_all(driver, By.CSS_SELECTOR, selector, 'likes')
             for element in elements:
-                # Buscar numero en el texto
                 text = element.text.strip()
                 if text.isdigit() and 0 <= int(text) <= 1000:
                     return int(text)
                 
-                # Buscar en aria-label
-                aria_label = element.get_attribute('aria-label') or ''
-                numbers = re.findall(r'(\d+)', aria_label)
-                if numbers:
-                    likes_value = int(numbers[0])
-                    if 0 <= likes_value <= 1000:
-                        return likes_value
+                likes_value = _likes_from_element(text, element.get_attribute('aria-label'))
+                if likes_value is not None:
+                    return likes_value
         except:
             continue
     
     # ESTRATEGIA 2: Buscar patron en todo el HTML
     try:
-        page_source = driver.page_source
-        like_patterns = [
-            r'favorites.*?(\d+)',
-            r'favorite.*?(\d+)',
-            r'heart.*?(\d+)',
-            r'(\d+).*?favorite',
-            r'(\d+).*?heart'
-        ]
-        
-        for pattern in like_patterns:
-            matches = re.finditer(pattern, page_source, re.IGNORECASE)
-            for match in matches:
-                try:
-                    likes_value = int(match.group(1))
-                    if 0 <= likes_value <= 1000:
-                        return likes_value
-                except:
-                    continue
+        likes_value = _likes_from_page_source(driver.page_source)
+        if likes_value is not None:
+            return likes_value
     except:
         pass
     
     return 0
 
+def _year_and_km_from_texts(description_text, get_html):
+    """
+    Año y KM desde la descripcion, con fallback al HTML completo
+    get_html: funcion que devuelve el HTML (solo se llama si hace falta)
+    """
+    year = "No especificado"
+    km = "No especificado"
+    
+    if description_text:
+        # DEBUG: Solo mostrar para los primeros ejemplos
+        if len(description_text) > 50:
+            print(f"[DEBUG] Descripción encontrada: {description_text[:150]}...")
+        
+        # EXTRAER KILOMETROS - PATRONES CORREGIDOS PARA AMBOS FORMATOS (registro precompilado)
+        for pattern, match in patrones.KM_DESCRIPTION.first_matches(description_text):
+            try:
+                km_text = match.group(1)
+                print(f"[DEBUG] KM encontrado: '{km_text}' con patrón: {pattern.pattern[:30]}...")
+                
+                # Manejar diferentes formatos
+                if 'mil' in pattern.pattern.lower():
+                    # Formato "42 mil km"
+                    km_value = int(km_text) * 1000
+                else:
+                    # Formato normal con puntos como separadores de miles
+                    km_value = int(km_text.replace('.', ''))
+                
+                # RANGO VALIDADO: 0 - 200,000 KM como solicita
+                if 0 <= km_value <= 200000:
+                    if km_value == 0:
+                        km = "0 km"
+                    else:
+                        km = f"{km_value:,} km".replace(',', '.')
+                    print(f"[DEBUG] KM extraído exitosamente: {km}")
+                    break
+                    
+            except Exception as e:
+                print(f"[DEBUG] Error procesando KM: {e}")
+                continue
+        
+        # EXTRAER AÑO - PATRONES CORREGIDOS PARA AMBOS FORMATOS (registro precompilado)
+        for pattern, match in patrones.YEAR_DESCRIPTION.first_matches(description_text):
+            try:
+                year_value = int(match.group(1))
+                print(f"[DEBUG] Año encontrado: '{year_value}' con patrón: {pattern.pattern[:30]}...")
+                if 1990 <= year_value <= 2025:
+                    year = str(year_value)
+                    print(f"[DEBUG] Año extraído exitosamente: {year}")
+                    break
+            except Exception as e:
+                print(f"[DEBUG] Error procesando año: {e}")
+                continue
+    
+    # FALLBACK: Si no encuentra en descripcion, buscar en HTML general
+    if km == "No especificado" or year == "No especificado":
+        try:
+            html_content = get_html()
+            
+            if km == "No especificado":
+                for pattern in patrones.KM_HTML.patterns:
+                    matches = pattern.findall(html_content)
+                    for match in matches:
+                        try:
+                            km_clean = match.replace('.', '').replace(',', '').replace(' ', '')
+                            km_value = int(km_clean)
+                            if 0 <= km_value <= 200000:
+                                if km_value == 0:
+                                    km = "0 km"
+                                else:
+                                    km = f"{km_value:,} km".replace(',', '.')
+                                break
+                        except:
+                            continue
+                    if km != "No especificado":
+                        break
+            
+            if year == "No especificado":
+                for pattern in patrones.YEAR_HTML.patterns:
+                    matches = pattern.findall(html_content)
+                    for match in matches:
+                        try:
+                            year_value = int(match)
+                            if 1990 <= year_value <= 2025:
+                                year = str(year_value)
+                                break
+                        except:
+                            continue
+                    if year != "No especificado":
+                        break
+                        
+        except Exception as e:
+            print(f"[DEBUG] Error en fallback HTML: {e}")
+            pass
+    
+    return year, km
+
 def extract_year_and_km_robust(driver):
     """
     CORREGIDO: Extrae año y KM con patrones para MOTOSPLUS y CUIMO
@@ -349,171 +943,27 @@ def extract_year_and_km_robust(driver):
         # CAMBIO ÚNICO: ESPERA EXPLÍCITA AÑADIDA
         # ==========================================
         try:
-            WebDriverWait(driver, 3).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, 
-                    "section.item-detail_ItemDetailTwoColumns__description__0DKb0"))
+            WebDriverWait(driver, capped_wait(3)).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, DESCRIPTION_WAIT_SELECTOR))
             )
-            time.sleep(0.3)  # Buffer adicional
+            time.sleep(capped_wait(0.3))  # Buffer adicional
         except:
             pass  # Si no carga en 3 seg, continuar igual
         # ==========================================
         
-        # EXTRAER DE LA DESCRIPCION usando selector especifico de Wallapop
-        description_selectors = [
-            "section.item-detail_ItemDetailTwoColumns__description__0DKb0",
-            ".item-detail_ItemDetailTwoColumns__description__0DKb0",
-            "[class*='description']",
-            "section[class*='description']"
-        ]
-        
         description_text = ""
-        for selector in description_selectors:
+        for selector in DESCRIPTION_SELECTORS:
             try:
-                description_element = driver.find_element(By.CSS_SELECTOR, selector)
+                description_element = find_first(driver, By.CSS_SELECTOR, selector, 'descripcion')
+                if description_element is None:
+                    continue
                 description_text = description_element.text
                 if description_text:
                     break
             except:
                 continue
         
-        if description_text:
-            # DEBUG: Solo mostrar para los primeros ejemplos
-            if len(description_text) > 50:
-                print(f"[DEBUG] Descripción encontrada: {description_text[:150]}...")
-            
-            # EXTRAER KILOMETROS - PATRONES CORREGIDOS PARA AMBOS FORMATOS            
-
-            km_patterns = [
-                r'Kilómetros:\s*(\d+)',
-                r'kilometros:\s*(\d+)',
-                r'•\s*KM:\s*(\d+)',
-                r'•\s*km:\s*(\d+)',
-                r'KM:\s*(\d+)',
-                r'km:\s*(\d+)',
-                r'-\s*Kilometros:\s*(\d+)',
-                r'-\s*kilometros:\s*(\d+)',
-                r'-\s*KM:\s*(\d+)',
-                r'-\s*km:\s*(\d+)',
-                r'(\d+)\s*km',
-                r'(\d+)\s*kilometros',
-                r'(\d+)\s*mil\s*km',
-            ]
-            
-            for pattern in km_patterns:
-                match = re.search(pattern, description_text, re.IGNORECASE)
-                if match:
-                    try:
-                        km_text = match.group(1)
-                        print(f"[DEBUG] KM encontrado: '{km_text}' con patrón: {pattern[:30]}...")
-                        
-                        # Manejar diferentes formatos
-                        if 'mil' in pattern.lower():
-                            # Formato "42 mil km"
-                            km_value = int(km_text) * 1000
-                        else:
-                            # Formato normal con puntos como separadores de miles
-                            km_value = int(km_text.replace('.', ''))
-                        
-                        # RANGO VALIDADO: 0 - 200,000 KM como solicita
-                        if 0 <= km_value <= 200000:
-                            if km_value == 0:
-                                km = "0 km"
-                            else:
-                                km = f"{km_value:,} km".replace(',', '.')
-                            print(f"[DEBUG] KM extraído exitosamente: {km}")
-                            break
-                            
-                    except Exception as e:
-                        print(f"[DEBUG] Error procesando KM: {e}")
-                        continue
-            
-            # EXTRAER AÑO - PATRONES CORREGIDOS PARA AMBOS FORMATOS
-            year_patterns = [
-                # FORMATO MOTOSPLUS: "Año: 2022"
-                r'Año:\s*(\d{4})',
-                r'año:\s*(\d{4})',
-                
-                # FORMATO CUIMO: "• Año: 2017"
-                r'•\s*Año:\s*(\d{4})',
-                r'•\s*año:\s*(\d{4})',
-                
-                # FORMATOS CON GUIONES
-                r'-\s*Año:\s*(\d{4})',
-                r'-\s*año:\s*(\d{4})',
-                
-                # FORMATOS ADICIONALES
-                r'modelo\s+(\d{4})',
-                r'del\s+(\d{4})',
-                r'(\d{4})\s*(?:cc|cilindros)',
-            ]
-            
-            for pattern in year_patterns:
-                match = re.search(pattern, description_text, re.IGNORECASE)
-                if match:
-                    try:
-                        year_value = int(match.group(1))
-                        print(f"[DEBUG] Año encontrado: '{year_value}' con patrón: {pattern[:30]}...")
-                        if 1990 <= year_value <= 2025:
-                            year = str(year_value)
-                            print(f"[DEBUG] Año extraído exitosamente: {year}")
-                            break
-                    except Exception as e:
-                        print(f"[DEBUG] Error procesando año: {e}")
-                        continue
-        
-        # FALLBACK: Si no encuentra en descripcion, buscar en HTML general
-        if km == "No especificado" or year == "No especificado":
-            try:
-                html_content = driver.page_source
-                
-                if km == "No especificado":
-                    km_patterns_html = [
-                        r'Kilómetros["\s:>]*</span><span[^>]*>(\d+(?:[\.\s]\d+)*)</span>',
-                        r'kilometros["\s:>]*</span><span[^>]*>(\d+(?:[\.\s]\d+)*)</span>',
-                        r'>(\d+)\s*km',
-                        r'•\s*KM["\s:>]*(\d+)',
-                    ]
-                    
-                    for pattern in km_patterns_html:
-                        matches = re.findall(pattern, html_content, re.IGNORECASE)
-                        for match in matches:
-                            try:
-                                km_clean = match.replace('.', '').replace(',', '').replace(' ', '')
-                                km_value = int(km_clean)
-                                if 0 <= km_value <= 200000:
-                                    if km_value == 0:
-                                        km = "0 km"
-                                    else:
-                                        km = f"{km_value:,} km".replace(',', '.')
-                                    break
-                            except:
-                                continue
-                        if km != "No especificado":
-                            break
-                
-                if year == "No especificado":
-                    year_patterns_html = [
-                        r'Año["\s:>]*</span><span[^>]*>(\d{4})</span>',
-                        r'año["\s:>]*</span><span[^>]*>(\d{4})</span>',
-                        r'•\s*Año["\s:>]*(\d{4})',
-                    ]
-                    
-                    for pattern in year_patterns_html:
-                        matches = re.findall(pattern, html_content, re.IGNORECASE)
-                        for match in matches:
-                            try:
-                                year_value = int(match)
-                                if 1990 <= year_value <= 2025:
-                                    year = str(year_value)
-                                    break
-                            except:
-                                continue
-                        if year != "No especificado":
-                            break
-                            
-            except Exception as e:
-                print(f"[DEBUG] Error en fallback HTML: {e}")
-                pass
+        year, km = _year_and_km_from_texts(description_text, lambda: driver.page_source)
                     
     except Exception as e:
         print(f"[DEBUG] Error general en extract_year_and_km_robust: {e}")
@@ -522,110 +972,240 @@ def extract_year_and_km_robust(driver):
     print(f"[DEBUG] RESULTADO FINAL - Año: {year}, KM: {km}")
     return year, km
 
+def _parse_k_views(text):
+    """Formato K (1.1k = 1,100) - None si no aplica"""
+    k_match = patrones.K_VIEWS.search(text.lower())
+    if k_match:
+        k_value = float(k_match.group(1))
+        views = int(k_value * 1000)
+        if 0 <= views <= 500000:  # Rango ampliado
+            return views
+    return None
+
+def _views_from_element(text, aria_label):
+    """Visitas desde el texto o aria-label de un elemento (None si no hay)"""
+    text = text.strip()
+    
+    # MANEJAR FORMATO K (1.1k = 1,100)
+    if 'k' in text.lower():
+        try:
+            views = _parse_k_views(text)
+            if views is not None:
+                return views
+        except:
+            pass
+    
+    # FORMATO NORMAL (numero entero) - CAMBIADO elif por if
+    if text.isdigit():
+        views = int(text)
+        if 0 <= views <= 500000:  # Rango ampliado
+            return views
+    
+    aria_label = aria_label or ''
+    
+    # MANEJAR FORMATO K EN ARIA-LABEL
+    if 'k' in aria_label.lower():
+        try:
+            views = _parse_k_views(aria_label)
+            if views is not None:
+                return views
+        except:
+            return None
+    
+    # FORMATO NORMAL EN ARIA-LABEL
+    numbers = patrones.DIGITS.findall(aria_label)
+    if numbers:
+        views_value = int(numbers[0])
+        if 0 <= views_value <= 500000:
+            return views_value
+    return None
+
+def _views_from_page_source(page_source):
+    """Busca visitas junto a sus anclas en el HTML, formato K primero (None si no hay)"""
+    scanner = patrones.BoundedPageScanner(page_source)
+    
+    # Buscar patrones con K
+    for match in scanner.scan(patrones.VIEWS_K_ANCHORED):
+        try:
+            k_value = float(match.group(1))
+            views = int(k_value * 1000)
+            if 0 <= views <= 500000:
+                return views
+        except:
+            continue
+    
+    # Buscar patrones normales
+    for match in scanner.scan(patrones.VIEWS_ANCHORED):
+        try:
+            views_value = int(match.group(1))
+            if 0 <= views_value <= 500000:
+                return views_value
+        except:
+            continue
+    return None
+
 def extract_views_robust(driver):
     """Extrae visitas con multiples estrategias - CORREGIDO PARA FORMATO K"""
     
     # ESTRATEGIA 1: Selectores especificos
-    view_selectors = [
-        'span[aria-label="Views"]',
-        '[aria-label*="Views"]',
-        '[aria-label*="views"]',
-        '[class*="views"]',
-        '[class*="Views"]'
-    ]
-    
-    for selector in view_selectors:
+    for selector in VIEW_SELECTORS:
         try:
-            elements = driver.find_elements(By.CSS_SELECTOR, selector)
+            elements = find_all(driver, By.CSS_SELECTOR, selector, 'visitas')
             for element in elements:
                 text = element.text.strip()
                 
-                # MANEJAR FORMATO K (1.1k = 1,100)
-                if 'k' in text.lower():
-                    try:
-                        # Extraer numero antes de 'k'
-                        k_match = re.search(r'(\d+(?:\.\d+)?)\s*k', text.lower())
-                        if k_match:
-                            k_value = float(k_match.group(1))
-                            views = int(k_value * 1000)
-                            if 0 <= views <= 500000:  # Rango ampliado
-                                return views
-                    except:
-                        pass
-                
-                # FORMATO NORMAL (numero entero) - CAMBIADO elif por if
-                if text.isdigit():
-                    views = int(text)
-                    if 0 <= views <= 500000:  # Rango ampliado
-                        return views
-                        
-                # Buscar en aria-label
-                aria_label = element.get_attribute('aria-label') or ''
-                
-                # MANEJAR FORMATO K EN ARIA-LABEL
-                if 'k' in aria_label.lower():
-                    try:
-                        k_match = re.search(r'(\d+(?:\.\d+)?)\s*k', aria_label.lower())
-                        if k_match:
-                            k_value = float(k_match.group(1))
-                            views = int(k_value * 1000)
-                            if 0 <= views <= 500000:
-                                return views
-                    except:
-                        continue
-                
-                # FORMATO NORMAL EN ARIA-LABEL
-                numbers = re.findall(r'(\d+)', aria_label)
-                if numbers:
-                    views_value = int(numbers[0])
-                    if 0 <= views_value <= 500000:
-                        return views_value
+                # Texto primero: aria-label solo se pide si el texto no sirve
+                views = _views_from_element(text, '')
+                if views is None:
+                    views = _views_from_element(text, element.get_attribute('aria-label'))
+                if views is not None:
+                    return views
         except:
             continue
     
     # ESTRATEGIA 2: Buscar en HTML completo formato K
     try:
-        page_source = driver.page_source
-        
-        # Buscar patrones con K
-        k_patterns = [
-            r'(\d+(?:\.\d+)?)\s*k\s*views',
-            r'views[^>]*>(\d+(?:\.\d+)?)\s*k',
-            r'(\d+(?:\.\d+)?)\s*k\s*visitas'
-        ]
-        
-        for pattern in k_patterns:
-            matches = re.finditer(pattern, page_source, re.IGNORECASE)
-            for match in matches:
-                try:
-                    k_value = float(match.group(1))
-                    views = int(k_value * 1000)
-                    if 0 <= views <= 500000:
-                        return views
-                except:
-                    continue
-        
-        # Buscar patrones normales
-        view_patterns = [
-            r'views.*?(\d+)',
-            r'view.*?(\d+)',
-            r'(\d+).*?view'
-        ]
-        
-        for pattern in view_patterns:
-            matches = re.finditer(pattern, page_source, re.IGNORECASE)
-            for match in matches:
-                try:
-                    views_value = int(match.group(1))
-                    if 0 <= views_value <= 500000:
-                        return views_value
-                except:
-                    continue
+        views = _views_from_page_source(driver.page_source)
+        if views is not None:
+            return views
     except:
         pass
     
     return 0
 
+# SNAPSHOT: un solo execute_script recoge todo lo que leen los extractores
+# (texto visible y aria-label de cada selector + HTML completo)
+AD_SNAPSHOT_SCRIPT = """
+const cfg = arguments[0];
+const visibleText = (el) => (el && el.getClientRects().length) ? (el.innerText || '') : '';
+const all = (sel) => { try { return Array.from(document.querySelectorAll(sel)); } catch (e) { return []; } };
+const first = (sel) => { try { return document.querySelector(sel); } catch (e) { return null; } };
+const xpathAll = (xp) => {
+    const out = [];
+    try {
+        const r = document.evaluate(xp, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        for (let i = 0; i < r.snapshotLength; i++) out.push(r.snapshotItem(i));
+    } catch (e) {}
+    return out;
+};
+const withAria = (el) => [visibleText(el), el.getAttribute('aria-label') || ''];
+const firstText = (sel) => { const el = first(sel); return el ? visibleText(el) : null; };
+const og = xpathAll("//meta[@property='og:title']")[0];
+return {
+    title_h1: cfg.title_h1.map(sel => all(sel).map(visibleText)),
+    og_title: og ? (og.getAttribute('content') || '') : null,
+    title_description: cfg.title_description.map(firstText),
+    price: cfg.price.map(sel => all(sel).map(visibleText)),
+    price_contado: xpathAll(cfg.price_contado).slice(0, 1).map(visibleText),
+    price_any: xpathAll(cfg.price_any).slice(0, 10).map(visibleText),
+    likes: cfg.likes.map(sel => all(sel).map(withAria)),
+    description: cfg.description.map(firstText),
+    views: cfg.views.map(sel => all(sel).map(withAria)),
+    page_source: document.documentElement.outerHTML
+};
+"""
+
+def capture_ad_snapshot(driver, wait_description=True):
+    """
+    Espera a que el anuncio este listo y captura TODO el DOM necesario en una llamada
+    Mismas esperas que los extractores clasicos (precio 5s, descripcion 3s), recortadas
+    al presupuesto del anuncio; si una vence recortada el anuncio queda como recortado
+    wait_description=False: refresco de estadisticas, la descripcion no hace falta
+    """
+    price_wait = capped_wait(5)
+    try:
+        WebDriverWait(driver, price_wait).until(
+            EC.presence_of_element_located((By.XPATH, PRICE_ANY_XPATH))
+        )
+    except:
+        mark_wait_truncated(price_wait, 5)
+    
+    if wait_description:
+        description_wait = capped_wait(3)
+        try:
+            WebDriverWait(driver, description_wait).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, DESCRIPTION_WAIT_SELECTOR))
+            )
+            time.sleep(capped_wait(0.3))  # Buffer adicional
+        except:
+            mark_wait_truncated(description_wait, 3)
+    
+    return driver.execute_script(AD_SNAPSHOT_SCRIPT, {
+        'title_h1': TITLE_H1_SELECTORS,
+        'title_description': TITLE_DESCRIPTION_SELECTORS,
+        'price': PRICE_SELECTORS,
+        'price_contado': PRICE_CONTADO_XPATH,
+        'price_any': PRICE_ANY_XPATH,
+        'likes': LIKE_SELECTORS,
+        'description': DESCRIPTION_SELECTORS,
+        'views': VIEW_SELECTORS,
+    })
+
+def title_from_snapshot(snapshot):
+    """Mismas estrategias que extract_title_robust sobre el snapshot"""
+    for texts in snapshot['title_h1']:
+        for text in texts:
+            title = _title_from_h1_text(text.strip())
+            if title:
+                return title
+    
+    if snapshot['og_title'] is not None:
+        title = _title_from_og(snapshot['og_title'])
+        if title:
+            return title
+    
+    for text in snapshot['title_description']:
+        if text is not None:
+            title = _title_from_description(text.strip())
+            if title:
+                return title
+    
+    return "Titulo no encontrado"
+
+def price_from_snapshot(snapshot):
+    """Mismas estrategias que extract_price_robust sobre el snapshot"""
+    for texts in snapshot['price']:
+        for text in texts:
+            text = text.strip()
+            if text and '€' in text:
+                price = extract_price_from_text_wallapop(text)
+                if price != "No especificado":
+                    return price
+    
+    if snapshot['price_contado']:
+        return extract_price_from_text_wallapop(snapshot['price_contado'][0].strip())
+    
+    return _highest_price_from_texts(snapshot['price_any']) or "No especificado"
+
+def likes_from_snapshot(snapshot):
+    """Mismas estrategias que extract_likes_robust sobre el snapshot"""
+    for elements in snapshot['likes']:
+        for text, aria_label in elements:
+            likes_value = _likes_from_element(text, aria_label)
+            if likes_value is not None:
+                return likes_value
+    
+    likes_value = _likes_from_page_source(snapshot['page_source'])
+    return likes_value if likes_value is not None else 0
+
+def year_and_km_from_snapshot(snapshot):
+    """Mismas estrategias que extract_year_and_km_robust sobre el snapshot"""
+    description_text = next((text for text in snapshot['description'] if text), "")
+    year, km = _year_and_km_from_texts(description_text, lambda: snapshot['page_source'])
+    print(f"[DEBUG] RESULTADO FINAL - Año: {year}, KM: {km}")
+    return year, km
+
+def views_from_snapshot(snapshot):
+    """Mismas estrategias que extract_views_robust sobre el snapshot"""
+    for elements in snapshot['views']:
+        for text, aria_label in elements:
+            views = _views_from_element(text, aria_label)
+            if views is not None:
+                return views
+    
+    views = _views_from_page_source(snapshot['page_source'])
+    return views if views is not None else 0
+
 def create_moto_id(title, price, year, km):
     """Crea ID unico para detectar duplicados"""
     try:
@@ -636,94 +1216,348 @@ def create_moto_id(title, price, year, km):
     except:
         return hashlib.md5(str(time.time()).encode()).hexdigest()[:10]
 
+# SELECTORES MÁS EXTENSOS para "Ver más productos" (orden inicial)
+LOAD_MORE_SELECTORS = [
+    ('css', 'walla-button[text="Ver mas productos"]'),
+    ('css', 'walla-button[text*="Ver mas"]'),
+    ('css', 'walla-button[text*="Ver más"]'),
+    ('css', 'button.walla-button__button'),
+    ('css', '.walla-button__button'),
+    ('xpath', '//walla-button[@text="Ver mas productos"]'),
+    ('xpath', '//walla-button[contains(@text, "Ver mas")]'),
+    ('xpath', '//walla-button[contains(@text, "Ver más")]'),
+    ('xpath', '//span[text()="Ver mas productos"]/ancestor::button'),
+    ('xpath', '//span[contains(text(), "Ver mas")]/ancestor::button'),
+    ('xpath', '//span[contains(text(), "Ver más")]/ancestor::button'),
+    ('xpath', '//span[text()="Ver mas productos"]/ancestor::walla-button'),
+    ('css', '.d-flex.justify-content-center walla-button'),
+    ('css', 'div[class*="justify-content-center"] walla-button'),
+    ('xpath', '//button[contains(@class, "walla-button")]'),
+    ('xpath', '//*[contains(text(), "Ver mas productos")]'),
+    ('xpath', '//*[contains(text(), "Ver más productos")]'),
+    ('css', '[class*="load-more"]'),
+    ('css', '[class*="more-items"]'),
+    ('css', '[class*="show-more"]'),
+    # NUEVOS SELECTORES MÁS AGRESIVOS
+    ('xpath', '//button[contains(text(), "Ver")]'),
+    ('xpath', '//walla-button[contains(text(), "Ver")]'),
+    ('css', 'button[class*="button"]'),
+    ('xpath', '//div[contains(@class, "justify-content-center")]//button'),
+    ('xpath', '//div[contains(@class, "text-center")]//button'),
+]
+
+LOAD_MORE_TEXTS = [
+    'ver mas', 'ver más', 'ver mas productos', 'ver más productos',
+    'cargar mas', 'cargar más', 'load more', 'show more',
+    'más productos', 'mas productos'
+]
+
+# Aprendizaje de selectores: aciertos/fallos persistidos entre ejecuciones
+LOAD_MORE_STATS_FILE = os.path.join(CACHE_DIR, "load_more_selectors.json")
+LOAD_MORE_STATS = {}
+LOAD_MORE_USAGE = {'clics': 0, 'busquedas': 0, 'cache_directa': 0}
+_load_more_state = {'cargado': False, 'ultimo': None}
+_load_more_lock = threading.Lock()
+
+def _selector_key(selector_type, selector):
+    return f"{selector_type}|{selector}"
+
+def load_load_more_stats():
+    """Lee aciertos/fallos de selectores de la ejecucion anterior"""
+    try:
+        with open(LOAD_MORE_STATS_FILE, encoding="utf-8") as f:
+            data = json.load(f)
+        return data.get('selectores', {}), data.get('ultimo')
+    except:
+        return {}, None
+
+def save_load_more_stats():
+    """Guarda aciertos/fallos de selectores para ordenar la siguiente ejecucion"""
+    with _load_more_lock:
+        if not _load_more_state['cargado']:
+            return
+        data = {'selectores': LOAD_MORE_STATS, 'ultimo': _load_more_state['ultimo']}
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(LOAD_MORE_STATS_FILE, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+    except Exception as e:
+        print(f"[AVISO] No se pudo guardar estadisticas de selectores: {str(e)}")
+
+def ordered_load_more_selectors():
+    """
+    Orden de prueba: ultimo selector con exito primero, despues por tasa de acierto
+    (suavizada, los no probados quedan en medio) y por orden original
+    """
+    with _load_more_lock:
+        if not _load_more_state['cargado']:
+            stats, ultimo = load_load_more_stats()
+            LOAD_MORE_STATS.update(stats)
+            _load_more_state['ultimo'] = ultimo
+            _load_more_state['cargado'] = True
+        
+        def rank(indexed):
+            index, (selector_type, selector) = indexed
+            key = _selector_key(selector_type, selector)
+            stats = LOAD_MORE_STATS.get(key, {'aciertos': 0, 'fallos': 0})
+            rate = (stats['aciertos'] + 1) / (stats['aciertos'] + stats['fallos'] + 2)
+            return (key != _load_more_state['ultimo'], -rate, index)
+        
+        return [selector for _, selector in sorted(enumerate(LOAD_MORE_SELECTORS), key=rank)]
+
+def _record_load_more(tried, clicked=None, loaded=False):
+    """
+    Fallo para cada selector probado sin exito
+    El selector que hizo clic solo suma acierto si aparecieron anuncios nuevos
+    (un selector generico puede pulsar otro boton: eso cuenta como fallo)
+    """
+    with _load_more_lock:
+        LOAD_MORE_USAGE['busquedas'] += len(tried) + (1 if clicked else 0)
+        for key in tried:
+            LOAD_MORE_STATS.setdefault(key, {'aciertos': 0, 'fallos': 0})['fallos'] += 1
+        if clicked:
+            if clicked == _load_more_state['ultimo'] and not tried:
+                LOAD_MORE_USAGE['cache_directa'] += 1
+            LOAD_MORE_USAGE['clics'] += 1
+            stats = LOAD_MORE_STATS.setdefault(clicked, {'aciertos': 0, 'fallos': 0})
+            if loaded:
+                stats['aciertos'] += 1
+                _load_more_state['ultimo'] = clicked
+            else:
+                stats['fallos'] += 1
+                if _load_more_state['ultimo'] == clicked:
+                    _load_more_state['ultimo'] = None
+
+def print_load_more_report():
+    """Resumen de busquedas del boton 'Ver más productos'"""
+    usage = LOAD_MORE_USAGE
+    if not usage['busquedas']:
+        return
+    por_clic = usage['busquedas'] / usage['clics'] if usage['clics'] else usage['busquedas']
+    print(f"\nBOTON 'VER MÁS': {usage['clics']} clics | {usage['busquedas']} busquedas ({por_clic:.1f} por clic) | {usage['cache_directa']} al primer intento")
+    if _load_more_state['ultimo']:
+        print(f"• Selector en cache: {_load_more_state['ultimo']}")
+
+def _is_load_more_button(element):
+    """Visible, habilitado y con texto de 'ver más' (o sin texto)"""
+    if not element.is_displayed() or not element.is_enabled():
+        return False
+    
+    # Texto primero: aria-label solo se pide si el texto no basta
+    element_text = element.text.strip().lower()
+    if not element_text or any(texto in element_text for texto in LOAD_MORE_TEXTS):
+        return True
+    aria_label = (element.get_attribute('aria-label') or '').lower()
+    return any(texto in aria_label for texto in LOAD_MORE_TEXTS)
+
+# Boton "Ver mas" pintado: algun button/walla-button con uno de los textos conocidos
+LOAD_MORE_PRESENT_SCRIPT = """
+var texts = arguments[0];
+var nodes = document.querySelectorAll('walla-button, button');
+for (var i = 0; i < nodes.length; i++) {
+    var text = ((nodes[i].getAttribute('text') || '') + ' ' + (nodes[i].innerText || '')).toLowerCase();
+    for (var j = 0; j < texts.length; j++) {
+        if (text.indexOf(texts[j]) !== -1) return true;
+    }
+}
+return false;
+"""
+
+def wait_for_load_more_button(driver, timeout=1.5):
+    """Espera corta a que el boton se pinte tras el scroll (sustituye la pausa fija previa al clic)"""
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+            lambda d: d.execute_script(LOAD_MORE_PRESENT_SCRIPT, LOAD_MORE_TEXTS)
+        )
+        return True
+    except:
+        return False
+
 def find_and_click_load_more(driver):
     """
     MEJORADO: Busca y hace clic en 'Ver más productos' más agresivamente
+    Prueba primero el selector que funciono la ultima vez (una busqueda en el caso comun)
+    Devuelve (selector pulsado, selectores fallidos) o None; el llamador registra el
+    resultado con _record_load_more cuando sabe si el clic cargo anuncios
+    Sin boton en la pagina (fin normal del perfil) no se registran fallos: no son
+    errores de los selectores y degradarian al que funciona
     """
+    tried = []
+    
+    # El boton puede pintarse un poco despues del scroll: esperarlo en vez de fallar
+    present = wait_for_load_more_button(driver)
     
-    # SELECTORES MÁS EXTENSOS
-    selectors = [
-        ('css', 'walla-button[text="Ver mas productos"]'),
-        ('css', 'walla-button[text*="Ver mas"]'),
-        ('css', 'walla-button[text*="Ver más"]'),
-        ('css', 'button.walla-button__button'),
-        ('css', '.walla-button__button'),
-        ('xpath', '//walla-button[@text="Ver mas productos"]'),
-        ('xpath', '//walla-button[contains(@text, "Ver mas")]'),
-        ('xpath', '//walla-button[contains(@text, "Ver más")]'),
-        ('xpath', '//span[text()="Ver mas productos"]/ancestor::button'),
-        ('xpath', '//span[contains(text(), "Ver mas")]/ancestor::button'),
-        ('xpath', '//span[contains(text(), "Ver más")]/ancestor::button'),
-        ('xpath', '//span[text()="Ver mas productos"]/ancestor::walla-button'),
-        ('css', '.d-flex.justify-content-center walla-button'),
-        ('css', 'div[class*="justify-content-center"] walla-button'),
-        ('xpath', '//button[contains(@class, "walla-button")]'),
-        ('xpath', '//*[contains(text(), "Ver mas productos")]'),
-        ('xpath', '//*[contains(text(), "Ver más productos")]'),
-        ('css', '[class*="load-more"]'),
-        ('css', '[class*="more-items"]'),
-        ('css', '[class*="show-more"]'),
-        # NUEVOS SELECTORES MÁS AGRESIVOS
-        ('xpath', '//button[contains(text(), "Ver")]'),
-        ('xpath', '//walla-button[contains(text(), "Ver")]'),
-        ('css', 'button[class*="button"]'),
-        ('xpath', '//div[contains(@class, "justify-content-center")]//button'),
-        ('xpath', '//div[contains(@class, "text-center")]//button'),
-    ]
-    
-    for selector_type, selector in selectors:
+    for selector_type, selector in ordered_load_more_selectors():
+        key = _selector_key(selector_type, selector)
         try:
             if selector_type == 'css':
-                elements = driver.find_elements(By.CSS_SELECTOR, selector)
+                elements = find_all(driver, By.CSS_SELECTOR, selector, 'boton_cargar_mas')
             else:  # xpath
-                elements = driver.find_elements(By.XPATH, selector)
+                elements = find_all(driver, By.XPATH, selector, 'boton_cargar_mas')
             
             for element in elements:
                 try:
-                    if not element.is_displayed() or not element.is_enabled():
+                    if not _is_load_more_button(element):
                         continue
                     
-                    # Verificar texto más agresivamente
-                    element_text = element.text.strip().lower()
-                    aria_label = element.get_attribute('aria-label') or ''
-                    
-                    textos_validos = [
-                        'ver mas', 'ver más', 'ver mas productos', 'ver más productos',
-                        'cargar mas', 'cargar más', 'load more', 'show more',
-                        'más productos', 'mas productos'
-                    ]
+                    # Scroll instantaneo: el clic no necesita pausa previa
+                    driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
                     
-                    texto_encontrado = any(texto in element_text or texto in aria_label.lower() 
-                                         for texto in textos_validos)
-                    
-                    if texto_encontrado or not element_text:  # Si no tiene texto, probar igual
-                        # Scroll más agresivo
-                        driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
-                        time.sleep(0.5)  # AUMENTADO
-                        
-                        try:
-                            # Intentar clic normal
-                            element.click()
-                            time.sleep(1)  # AUMENTADO
-                            return True
-                        except:
-                            try:
-                                # Intentar clic JavaScript
-                                driver.execute_script("arguments[0].click();", element)
-                                time.sleep(1)  # AUMENTADO
-                                return True
-                            except:
-                                continue
+                    try:
+                        # Intentar clic normal
+                        element.click()
+                    except:
+                        # Intentar clic JavaScript
+                        driver.execute_script("arguments[0].click();", element)
+                    return key, tried
                 except:
                     continue
         except:
-            continue
+            pass
+        tried.append(key)
+    
+    if present:
+        _record_load_more(tried)
+    return None
+
+# Recolector en la pagina: acumula los href /item/ en un Set de JS y devuelve solo los nuevos
+ITEM_COLLECTOR_SCRIPT = """
+var seen = window.__wallapopItemHrefs || (window.__wallapopItemHrefs = new Set());
+var nuevos = [];
+document.querySelectorAll('a[href*="/item/"]').forEach(function(a) {
+    var href = a.href;
+    if (href && !seen.has(href)) {
+        seen.add(href);
+        nuevos.push(href);
+    }
+});
+return nuevos;
+"""
+
+# Lista final deduplicada (orden de aparicion) en una sola llamada
+ITEM_COLLECTOR_ALL_SCRIPT = ITEM_COLLECTOR_SCRIPT.replace(
+    "return nuevos;", "return Array.from(seen);"
+)
+
+# Esperas fijas de la version anterior, para comparar con la espera real
+LEGACY_CLICK_WAIT = 0.8 + 0.3 + 0.5 + 1 + 2.5   # scroll + pre-clic + post-clic + carga
+LEGACY_NO_BUTTON_WAIT = 0.8 + 0.3 + 1           # scroll + scroll extra
+
+# DEDUPLICACION: cada anuncio pertenece a la primera cuenta en el orden de configuracion
+# ITEM_OWNERS: clave del anuncio -> posicion de la cuenta que lo tiene programado
+# ACCOUNT_ORDER: cuenta -> posicion en la configuracion (lo fija main)
+ITEM_OWNERS = {}
+ACCOUNT_ORDER = {}
+DEDUP_STATS = {'enlaces': 0, 'duplicados_pagina': 0, 'duplicados_cuentas': 0, 'reasignados': 0}
+_dedup_lock = threading.Lock()
+
+def _account_rank(account_name):
+    return ACCOUNT_ORDER.get(account_name, len(ACCOUNT_ORDER))
+
+def claim_item_urls(ad_urls, account_name):
+    """
+    Reserva las URLs canonicas para la cuenta; devuelve las que le tocan
+    Se saltan las que ya tiene una cuenta anterior en la configuracion; las de una
+    posterior pasan a esta (resolve_item_owners descarta luego la copia de la otra)
+    """
+    rank = _account_rank(account_name)
+    propias = []
+    with _dedup_lock:
+        for ad_url in ad_urls:
+            key = patrones.item_key(ad_url)
+            if key is None or ITEM_OWNERS.get(key, rank) < rank:
+                continue
+            ITEM_OWNERS[key] = rank
+            propias.append(ad_url)
+    return propias
+
+def schedule_item_urls(ad_urls, account_name):
+    """
+    URLs canonicas a visitar, en orden de aparicion
+    Descarta variantes del mismo anuncio (query, barra final...) y los de una cuenta anterior
+    """
+    unicas, duplicados_pagina = patrones.dedupe_item_urls(ad_urls)
+    programadas = claim_item_urls(unicas, account_name)
+    duplicados_cuentas = len(unicas) - len(programadas)
+    with _dedup_lock:
+        DEDUP_STATS['enlaces'] += len(ad_urls)
+        DEDUP_STATS['duplicados_pagina'] += duplicados_pagina
+        DEDUP_STATS['duplicados_cuentas'] += duplicados_cuentas
+    if duplicados_pagina or duplicados_cuentas:
+        print(f"[DEDUP] {account_name}: {duplicados_pagina} variantes repetidas | {duplicados_cuentas} de una cuenta anterior")
+    return programadas
+
+def resolve_item_owners(account_results):
+    """
+    Reparto final determinista: cada anuncio se queda en la primera cuenta (orden de
+    configuracion) que lo extrajo. Con cuentas en paralelo una cuenta posterior puede
+    haberlo programado antes que su dueña
+    account_results: [(cuenta, anuncios)] en el orden de configuracion
+    """
+    vistos = set()
+    resueltos = []
+    for account_name, account_ads in account_results:
+        propios = []
+        for ad_data in account_ads:
+            key = patrones.item_key(ad_data.get('URL')) or ad_data.get('URL')
+            if key in vistos:
+                continue
+            vistos.add(key)
+            propios.append(ad_data)
+        if len(propios) < len(account_ads):
+            DEDUP_STATS['reasignados'] += len(account_ads) - len(propios)
+            print(f"[DEDUP] {account_name}: {len(account_ads) - len(propios)} anuncios quedan en una cuenta anterior")
+        resueltos.append((account_name, propios))
+    return resueltos
+
+def print_dedup_report():
+    """Visitas evitadas por la clave canonica del anuncio"""
+    evitadas = DEDUP_STATS['duplicados_pagina'] + DEDUP_STATS['duplicados_cuentas']
+    if not DEDUP_STATS['enlaces']:
+        return
+    print(f"\nDEDUPLICACION DE ANUNCIOS:")
+    print(f"• Enlaces recogidos: {DEDUP_STATS['enlaces']:,} | visitas evitadas: {evitadas:,}")
+    print(f"• Variantes del mismo anuncio: {DEDUP_STATS['duplicados_pagina']:,} | repetidos entre cuentas: {DEDUP_STATS['duplicados_cuentas']:,}")
+    if DEDUP_STATS['reasignados']:
+        print(f"• Extraidos dos veces (cuentas en paralelo), asignados a la cuenta anterior: {DEDUP_STATS['reasignados']:,}")
+
+def collect_new_item_links(driver):
+    """Enlaces /item/ aparecidos desde la llamada anterior (delta del recolector)"""
+    try:
+        return driver.execute_script(ITEM_COLLECTOR_SCRIPT) or []
+    except WebDriverException:
+        return []
+
+def collect_all_item_links(driver):
+    """Todos los enlaces /item/ unicos vistos en la pagina, en orden de aparicion"""
+    try:
+        return driver.execute_script(ITEM_COLLECTOR_ALL_SCRIPT) or []
+    except WebDriverException:
+        return []
+
+def wait_for_more_items(driver, timeout=LOAD_MORE_TIMEOUT):
+    """
+    Espera a que aparezcan enlaces nuevos (sondeo del recolector cada 0.1s)
+    Devuelve (enlaces nuevos, segundos esperados); lista vacia si vence el timeout
+    """
+    start = time.time()
+    nuevos = []
+    
+    def hay_nuevos(d):
+        nuevos.extend(collect_new_item_links(d))
+        return bool(nuevos)
     
-    return False
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(hay_nuevos)
+    except TimeoutException:
+        pass
+    return nuevos, time.time() - start
 
 def smart_load_all_ads(driver, expected_count=400, max_clicks=25):
     """
     MEJORADO: Carga todos los anuncios más agresivamente
+    Espera por eventos: tras cada clic, hasta que el recolector JS ve enlaces nuevos
+    Los enlaces quedan en la pagina: recuperarlos con collect_all_item_links
     """
     print(f"[SMART] Objetivo: {expected_count} anuncios, máximo {max_clicks} clics")
     
@@ -732,32 +1566,34 @@ def smart_load_all_ads(driver, expected_count=400, max_clicks=25):
         driver.execute_script("window.scrollBy(0, 1500);")  # AUMENTADO
         time.sleep(0.3)  # AUMENTADO
     
-    initial_count = len(driver.find_elements(By.XPATH, "//a[contains(@href, '/item/')]"))
+    initial_count = len(collect_new_item_links(driver))
     print(f"[SMART] Anuncios iniciales: {initial_count}")
     
     clicks_realizados = 0
     last_count = initial_count
     intentos_sin_cambio = 0
+    espera_real = 0.0
+    espera_fija = 0.0
     
     for click_num in range(max_clicks):
-        # Scroll más agresivo
+        # Scroll al final para que se pinte el boton
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(0.8)  # AUMENTADO
-        
-        # Scroll adicional para asegurar carga
         driver.execute_script("window.scrollBy(0, 500);")
-        time.sleep(0.3)
         
-        if find_and_click_load_more(driver):
+        click = find_and_click_load_more(driver)
+        if click:
             clicks_realizados += 1
             
-            # Espera más larga para asegurar carga completa
-            time.sleep(2.5)  # AUMENTADO
-            
-            new_count = len(driver.find_elements(By.XPATH, "//a[contains(@href, '/item/')]"))
+            # Esperar a que lleguen los anuncios nuevos (no un tiempo fijo)
+            nuevos, waited = wait_for_more_items(driver)
+            clicked, tried = click
+            _record_load_more(tried, clicked, loaded=bool(nuevos))
+            espera_real += waited
+            espera_fija += LEGACY_CLICK_WAIT
+            new_count = last_count + len(nuevos)
             
             if new_count > last_count:
-                print(f"[SMART] Clic {clicks_realizados}: {last_count} -> {new_count} (+{new_count - last_count})")
+                print(f"[SMART] Clic {clicks_realizados}: {last_count} -> {new_count} (+{new_count - last_count}) en {waited:.1f}s")
                 last_count = new_count
                 intentos_sin_cambio = 0  # Resetear contador
                 
@@ -776,111 +1612,894 @@ def smart_load_all_ads(driver, expected_count=400, max_clicks=25):
             intentos_sin_cambio += 1
             print(f"[SMART] Botón no encontrado (intento {intentos_sin_cambio}/3)")
             
-            # Scroll adicional por si el botón está más abajo
+            # Scroll adicional por si el botón está más abajo (o hay carga por scroll)
             driver.execute_script("window.scrollBy(0, 1000);")
-            time.sleep(1)
+            nuevos, waited = wait_for_more_items(driver, timeout=1)
+            espera_real += waited
+            espera_fija += LEGACY_NO_BUTTON_WAIT
+            last_count += len(nuevos)
             
             if intentos_sin_cambio >= 3:
                 print(f"[SMART] Botón no encontrado tras 3 intentos")
                 break
     
-    final_count = len(driver.find_elements(By.XPATH, "//a[contains(@href, '/item/')]"))
+    final_count = last_count + len(collect_new_item_links(driver))
     print(f"[SMART] Total final: {final_count} anuncios ({clicks_realizados} clics)")
+    print(f"[SMART] Espera real {espera_real:.1f}s vs {espera_fija:.1f}s con esperas fijas")
     
     return final_count
 
-def get_user_ads(driver, user_url, account_name):
-    """Procesa todos los anuncios con extraccion ULTRA ROBUSTA - OPTIMIZADA"""
+# REFRESCO EN DOS NIVELES: campos estaticos de anuncios ya conocidos (URL -> campos)
+KNOWN_ADS_FILE = os.path.join(CACHE_DIR, "known_ads.json")
+STATIC_FIELDS = ('Titulo', 'Ano', 'Kilometraje')
+KNOWN_ADS = {}
+REFRESH_STATS = {'completos': 0, 'tiempo_completos': 0.0, 'refrescos': 0, 'tiempo_refrescos': 0.0}
+_refresh_lock = threading.Lock()
+
+def _static_fields_complete(fila):
+    """Solo se reutilizan campos estaticos que se extrajeron bien"""
+    return (fila.get('Titulo') not in (None, '', 'Titulo no encontrado')
+            and fila.get('Ano') not in (None, '', 'No especificado')
+            and fila.get('Kilometraje') not in (None, '', 'No especificado'))
+
+def _known_ads_from_rows(filas):
+    """URL -> campos estaticos, solo filas completas"""
+    known = {}
+    for fila in filas:
+        url = patrones.canonical_item_url(fila.get('URL', ''))
+        if url and _static_fields_complete(fila):
+            known[url] = {field: str(fila[field]) for field in STATIC_FIELDS}
+    return known
+
+def load_known_ads(gs_handler=None):
+    """
+    Anuncios conocidos: cache local de la ejecucion anterior
+    Si no hay cache, la hoja SCR mas reciente (Data_Historico no guarda el año)
+    """
+    try:
+        with open(KNOWN_ADS_FILE, encoding="utf-8") as f:
+            known = {patrones.canonical_item_url(url): fields for url, fields in json.load(f).items()}
+        print(f"[REFRESCO] {len(known)} anuncios conocidos (cache local)")
+        return known
+    except:
+        pass
+    
+    if gs_handler is None:
+        return {}
+    
+    df, fecha = gs_handler.leer_datos_scraper_reciente()
+    if df is None:
+        return {}
+    known = _known_ads_from_rows(df.to_dict('records'))
+    print(f"[REFRESCO] {len(known)} anuncios conocidos (hoja SCR {fecha})")
+    return known
+
+def save_known_ads(all_results):
+    """Guarda los campos estaticos de esta ejecucion para el siguiente refresco"""
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(KNOWN_ADS_FILE, "w", encoding="utf-8") as f:
+            json.dump(_known_ads_from_rows(all_results), f, ensure_ascii=False)
+    except Exception as e:
+        print(f"[AVISO] No se pudo guardar cache de anuncios: {str(e)}")
+
+def _record_extraction(refresh, elapsed):
+    with _refresh_lock:
+        if refresh:
+            REFRESH_STATS['refrescos'] += 1
+            REFRESH_STATS['tiempo_refrescos'] += elapsed
+        else:
+            REFRESH_STATS['completos'] += 1
+            REFRESH_STATS['tiempo_completos'] += elapsed
+
+def print_refresh_report():
+    """Tiempo ahorrado por el refresco de estadisticas frente a la extraccion completa"""
+    stats = REFRESH_STATS
+    if not stats['refrescos']:
+        return
+    
+    media_refresco = stats['tiempo_refrescos'] / stats['refrescos']
+    print(f"\nREFRESCO EN DOS NIVELES:")
+    print(f"• Refrescos (precio/visitas/likes): {stats['refrescos']} | media {media_refresco:.2f}s")
+    if stats['completos']:
+        media_completa = stats['tiempo_completos'] / stats['completos']
+        ahorro = stats['refrescos'] * (media_completa - media_refresco)
+        print(f"• Extracciones completas (nuevos): {stats['completos']} | media {media_completa:.2f}s")
+        print(f"• Tiempo ahorrado estimado: {ahorro/60:.1f} minutos")
+    else:
+        print(f"• Sin anuncios nuevos: no hay extraccion completa con la que comparar")
+
+# Campos estaticos sacados del listado capturado (LISTING_CAPTURE), URL -> campos
+LISTING_STATIC = {}
+
+def static_fields_for(ad_url):
+    """Titulo/año/km ya conocidos del anuncio (cache de refresco o listado capturado) o None"""
+    if STATS_REFRESH and ad_url in KNOWN_ADS:
+        return KNOWN_ADS[ad_url]
+    return LISTING_STATIC.get(ad_url)
+
+def build_ad_data(title, price, year, km, views, likes, ad_url, account_name):
+    """Fila del anuncio con las columnas del scraper"""
+    return {
+        'ID_Moto': create_moto_id(title, price, year, km),
+        'Cuenta': account_name,
+        'Titulo': title,
+        'Precio': price,
+        'Ano': year,
+        'Kilometraje': km,
+        'Visitas': views,
+        'Likes': likes,
+        'URL': ad_url,
+        'Fecha_Extraccion': datetime.now().strftime("%d/%m/%Y %H:%M")
+    }
+
+def capture_ad(driver, ad_url, account_name):
+    """
+    FASE NAVEGADOR (snapshot): navega y captura el DOM del anuncio (None si no carga)
+    El resultado se parsea con ad_from_capture, sin necesidad del navegador
+    """
+    start = time.time()
+    known = static_fields_for(ad_url)
+    
+    if not safe_navigate(driver, ad_url):
+        check_ad_deadline()  # Carga cortada por el presupuesto: aplazar, no fallar
+        return None
+    
+    if ZERO_IMPLICIT_WAIT or early_return_navigation(driver):
+        # Espera explicita por anuncio (sin esperas implicitas ni carga completa)
+        wait_for_ad_ready(driver, ad_url)
+        wait_for_stats_ready(driver)
+    
+    # Refresco ligero: sin esperar la descripcion
+    snapshot = capture_ad_snapshot(driver, wait_description=not known)
+    check_ad_truncated()
+    drain_network_events(driver)
+    
+    return {
+        'url': ad_url,
+        'cuenta': account_name,
+        'known': known,
+        'snapshot': snapshot,
+        'tiempo_navegador': time.time() - start
+    }
+
+def ad_from_capture(captured):
+    """FASE LOCAL (snapshot): todos los campos a partir del DOM capturado"""
+    start = time.time()
+    snapshot = captured['snapshot']
+    known = captured['known']
+    
+    if known:
+        # REFRESCO LIGERO: titulo, año y km de la cache
+        title, year, km = known['Titulo'], known['Ano'], known['Kilometraje']
+    else:
+        title = title_from_snapshot(snapshot)
+        year, km = year_and_km_from_snapshot(snapshot)
+    price = price_from_snapshot(snapshot)
+    likes = likes_from_snapshot(snapshot)
+    views = views_from_snapshot(snapshot)
+    
+    _record_extraction(bool(known), captured['tiempo_navegador'] + time.time() - start)
+    return build_ad_data(title, price, year, km, views, likes, captured['url'], captured['cuenta'])
+
+def process_ad(driver, ad_url, account_name):
+    """
+    Navega a un anuncio y extrae todos sus campos (None si no carga)
+    Con STATS_REFRESH, los anuncios conocidos solo extraen precio, visitas y likes
+    """
+    if EXTRACTION_MODE == 'snapshot':
+        # EXTRACCION POR SNAPSHOT: una llamada al navegador, resto en local
+        captured = capture_ad(driver, ad_url, account_name)
+        return ad_from_capture(captured) if captured else None
+    
+    start = time.time()
+    known = static_fields_for(ad_url)
+    
+    if not safe_navigate(driver, ad_url):
+        check_ad_deadline()  # Carga cortada por el presupuesto: aplazar, no fallar
+        return None
+    
+    if ZERO_IMPLICIT_WAIT or early_return_navigation(driver):
+        # Espera explicita por anuncio (sin esperas implicitas ni carga completa)
+        wait_for_ad_ready(driver, ad_url)
+        wait_for_stats_ready(driver)
+    
+    if known:
+        # REFRESCO LIGERO: titulo, año y km de la cache, sin esperar la descripcion
+        title, year, km = known['Titulo'], known['Ano'], known['Kilometraje']
+        price = extract_price_robust(driver)
+        check_ad_deadline()
+        likes = extract_likes_robust(driver)
+        views = extract_views_robust(driver)
+        check_ad_truncated()
+    else:
+        # EXTRACCION ROBUSTA 
+        title = extract_title_robust(driver)
+        price = extract_price_robust(driver)
+        check_ad_deadline()
+        likes = extract_likes_robust(driver)
+        year, km = extract_year_and_km_robust(driver)
+        check_ad_deadline()
+        views = extract_views_robust(driver)
+        check_ad_truncated()
+    _record_extraction(bool(known), time.time() - start)
+    drain_network_events(driver)
+    
+    return build_ad_data(title, price, year, km, views, likes, ad_url, account_name)
+
+def format_price_value(price_value):
+    """Formato de precio del scraper ("7.690 €") o None si esta fuera de rango"""
+    # RANGO PARA MOTOS: 500€ - 60,000€
+    if price_value is None or not 500 <= price_value <= 60000:
+        return None
+    return f"{int(price_value):,}".replace(',', '.') + " €"
+
+def _year_and_km_from_item(item):
+    """Año/KM: campos estructurados si existen, si no descripcion + HTML como en Selenium"""
+    year, km = _year_and_km_from_texts(item['description'], lambda: item['html'])
+    if item['km'] is not None and 0 <= item['km'] <= 200000:
+        km = "0 km" if item['km'] == 0 else f"{int(item['km']):,} km".replace(',', '.')
+    if item['year'] is not None and 1990 <= item['year'] <= 2025:
+        year = str(int(item['year']))
+    return year, km
+
+def ad_from_http_item(item, ad_url, account_name):
+    """
+    Construye el anuncio desde el JSON embebido (ruta rapida HTTP o listado capturado)
+    None si faltan titulo o contadores: entonces se usa Selenium
+    """
+    if not item or not item['title'] or item['views'] is None:
+        return None
+    
+    title = item['title']
+    price = format_price_value(item['price']) or "No especificado"
+    year, km = _year_and_km_from_item(item)
+    
+    views = int(item['views'])
+    likes = int(item['likes'] or 0)
+    
+    return build_ad_data(title, price, year, km, views, likes, ad_url, account_name)
+
+def capture_listing_items(driver, events, account_name, dom_urls):
+    """
+    LISTADO POR RED: anuncios de las respuestas JSON que el perfil pidio al paginar
+    Solo /api/v3/users/<id>/items del vendedor del perfil: el usuario cuyos anuncios
+    coinciden con los enlaces del DOM (sin coincidencias no se usa nada). Se descartan
+    los anuncios cuyo vendedor no es el de la respuesta
+    Devuelve {clave del anuncio: item} con los campos de parse_listing_payload
+    """
+    por_usuario = {}
+    total = 0
+    bodies = red.json_response_bodies(driver, events)
+    for url, body in bodies:
+        user_id = red.listing_user_id(url)
+        for item in parse_listing_payload(body):
+            total += 1
+            if item['vendedor'] not in (None, user_id):
+                continue
+            por_usuario.setdefault(user_id, {}).setdefault(patrones.item_key(item['url']), item)
+    
+    dom_keys = set(patrones.item_key(ad_url) for ad_url in dom_urls)
+    coincidencias = {user_id: len(dom_keys & set(items)) for user_id, items in por_usuario.items()}
+    vendedor = max(sorted(coincidencias), key=coincidencias.get, default=None)
+    items = por_usuario[vendedor] if vendedor is not None and coincidencias[vendedor] else {}
+    
+    print(f"[XHR] {account_name}: {len(bodies)} respuestas del listado, {len(items)} anuncios del vendedor, {total - len(items)} descartados")
+    return items
+
+def static_fields_from_listing(item):
+    """Titulo/año/km del listado si estan completos (el anuncio solo refresca estadisticas)"""
+    if not item['title']:
+        return None
+    year, km = _year_and_km_from_item(item)
+    fila = {'Titulo': item['title'], 'Ano': year, 'Kilometraje': km}
+    return fila if _static_fields_complete(fila) else None
+
+# DIARIO DE EXTRACCION: un NDJSON por fecha, cada anuncio se escribe al extraerse
+JOURNAL_DIR = os.path.join(CACHE_DIR, "journal")
+JOURNAL = None  # ScrapeJournal activo (main)
+
+class ScrapeJournal:
+    """
+    DIARIO DE EXTRACCION: cada anuncio se añade al fichero (fsync) en cuanto se extrae
+    - resume=True: recarga el diario del mismo dia y no repite anuncios ni cuentas completas
+      (si hoy aun no hay diario, el mas reciente sin terminar: ejecucion de anoche
+      reanudada tras medianoche)
+    - resume=False: empieza un diario nuevo para hoy
+    - Los diarios de otras fechas solo se borran tras una subida correcta (finish)
+    """
+    
+    def __init__(self, fecha, resume=False):
+        self.path = os.path.join(JOURNAL_DIR, f"{fecha}.ndjson")
+        self.ads = {}               # URL -> ad_data ya extraido
+        self.accounts_done = {}     # cuenta -> URLs de la cuenta completada
+        self._lock = threading.Lock()
+        
+        os.makedirs(JOURNAL_DIR, exist_ok=True)
+        if resume and not os.path.exists(self.path):
+            anteriores = sorted(name for name in os.listdir(JOURNAL_DIR) if name.endswith('.ndjson'))
+            if anteriores and not self._is_finished(os.path.join(JOURNAL_DIR, anteriores[-1])):
+                self.path = os.path.join(JOURNAL_DIR, anteriores[-1])
+        if resume:
+            self._load()
+            print(f"[DIARIO] Reanudando {os.path.basename(self.path)}: {len(self.ads)} anuncios, {len(self.accounts_done)} cuentas completas")
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+    
+    @staticmethod
+    def _is_finished(path):
+        """Diario de una ejecucion que termino con la subida correcta"""
+        try:
+            with open(path, 'rb') as f:
+                return b'"_ejecucion_completa"' in f.read()
+        except OSError:
+            return False
+    
+    def finish(self):
+        """Subida correcta: marca el diario como terminado y borra los de otras fechas"""
+        self._append({'_ejecucion_completa': True})
+        self.prune_other_dates()
+    
+    def prune_other_dates(self):
+        """Tras una ejecucion correcta solo interesa el diario actual"""
+        for name in os.listdir(JOURNAL_DIR):
+            if name.endswith('.ndjson') and os.path.join(JOURNAL_DIR, name) != self.path:
+                try:
+                    os.remove(os.path.join(JOURNAL_DIR, name))
+                except OSError:
+                    pass
+    
+    def _load(self):
+        """Lee el diario; descarta una ultima linea a medio escribir (caida durante la escritura)"""
+        if not os.path.exists(self.path):
+            return
+        
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        complete = data[:data.rfind(b'\n') + 1]
+        if len(complete) != len(data):
+            with open(self.path, 'wb') as f:
+                f.write(complete)
+        
+        for line in complete.decode('utf-8', errors='replace').splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if '_cuenta_completa' in entry:
+                self.accounts_done[entry['_cuenta_completa']] = entry.get('urls', [])
+            elif entry.get('URL'):
+                self.ads[entry['URL']] = entry
+    
+    def _append(self, entry):
+        line = json.dumps(entry, ensure_ascii=False, default=str) + '\n'
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+    
+    def record_ad(self, ad_data):
+        self.ads[ad_data['URL']] = ad_data
+        self._append(ad_data)
+    
+    def record_account(self, account_name, ad_urls):
+        """Marca la cuenta como terminada (al reanudar no se vuelve a abrir el perfil)"""
+        self.accounts_done[account_name] = list(ad_urls)
+        self._append({'_cuenta_completa': account_name, 'urls': list(ad_urls)})
+    
+    def completed_account_ads(self, account_name):
+        """Anuncios de una cuenta ya completada, o None si hay que procesarla"""
+        if account_name not in self.accounts_done:
+            return None
+        return [self.ads[url] for url in self.accounts_done[account_name] if url in self.ads]
+    
+    def done_ad(self, ad_url):
+        """Anuncio ya extraido en este diario (None si falta)"""
+        return self.ads.get(ad_url)
+    
+    def close(self):
+        try:
+            self._file.close()
+        except Exception:
+            pass
+
+def journal_ad(ad_data):
+    """Escribe el anuncio en el diario activo (si lo hay)"""
+    if JOURNAL is not None and isinstance(ad_data, dict):
+        JOURNAL.record_ad(ad_data)
+
+def extract_ads_via_http(ad_urls, account_name):
+    """
+    RUTA RAPIDA HTTP: descarga todas las paginas con pool keep-alive
+    Devuelve lista alineada con ad_urls (None = necesita Selenium)
+    """
+    fetcher = HttpItemFetcher(max_connections=HTTP_MAX_CONNECTIONS)
+    start = time.time()
+    try:
+        items = fetcher.fetch_many(ad_urls)
+    finally:
+        fetcher.close()  # un pool por cuenta: sin cerrar, los sockets se acumulan entre cuentas
+    results = [ad_from_http_item(item, ad_url, account_name) for item, ad_url in zip(items, ad_urls)]
+    elapsed = time.time() - start
+    
+    fetcher.print_stats(elapsed)
+    resueltos = sum(1 for ad_data in results if ad_data is not None)
+    print(f"[HTTP] {account_name}: {resueltos}/{len(ad_urls)} anuncios sin navegador, {len(ad_urls) - resueltos} a Selenium")
+    return results
+
+def extract_ads_with_worker_pool(browser, ad_urls, account_name, num_workers):
+    """
+    POOL DE NAVEGADORES: N navegadores independientes consumen una cola comun de URLs
+    - El worker 0 reutiliza el navegador principal (cookies ya aceptadas)
+    - Cada worker con su DriverLifecycle (reciclaje y reinicio tras caidas)
+    - Resultados devueltos en el mismo orden que ad_urls (None = fallo, AD_DEFERRED = aplazado)
+    """
+    url_queue = queue.Queue()
+    for idx, ad_url in enumerate(ad_urls):
+        url_queue.put((idx, ad_url))
+    
+    results = [None] * len(ad_urls)
+    worker_stats = [None] * num_workers
+    progress_lock = threading.Lock()
+    progress = tqdm(total=len(ad_urls), desc=f"Extrayendo {account_name} ({num_workers} workers)", colour="green")
+    
+    def worker(worker_id):
+        stats = {'ok': 0, 'fallos': 0, 'aplazados': 0, 'tiempo': 0.0}
+        worker_stats[worker_id] = stats
+        start = time.time()
+        
+        if worker_id == 0:
+            worker_browser = browser
+        else:
+            try:
+                worker_browser = DriverLifecycle(f"{account_name}/worker {worker_id}")
+                if safe_navigate(worker_browser.driver, "https://es.wallapop.com"):
+                    accept_cookies(worker_browser.driver)
+            except Exception as e:
+                print(f"[POOL] Worker {worker_id}: no se pudo iniciar navegador: {str(e)}")
+                return
+        
+        try:
+            while True:
+                try:
+                    idx, ad_url = url_queue.get_nowait()
+                except queue.Empty:
+                    break
+                
+                try:
+                    ad_data = worker_browser.run_page(run_ad_with_deadline, ad_url, account_name)
+                except AdDeadlineExceeded:
+                    ad_data = AD_DEFERRED
+                except Exception:
+                    ad_data = None
+                
+                results[idx] = ad_data
+                journal_ad(ad_data)
+                if ad_data is None:
+                    stats['fallos'] += 1
+                elif ad_data is AD_DEFERRED:
+                    stats['aplazados'] += 1
+                else:
+                    stats['ok'] += 1
+                
+                with progress_lock:
+                    progress.update(1)
+        finally:
+            stats['tiempo'] = time.time() - start
+            if worker_id != 0:
+                worker_browser.quit()
+    
+    threads = [threading.Thread(target=worker, args=(worker_id,), daemon=True) for worker_id in range(num_workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    progress.close()
+    
+    # ESTADISTICAS POR WORKER
+    for worker_id, stats in enumerate(worker_stats):
+        if stats is None:
+            print(f"[POOL] Worker {worker_id}: sin navegador")
+            continue
+        ritmo = stats['ok'] / (stats['tiempo'] / 60) if stats['tiempo'] > 0 else 0
+        print(f"[POOL] Worker {worker_id}: {stats['ok']} exitosos, {stats['fallos']} fallos, {stats['aplazados']} aplazados | {stats['tiempo']:.1f}s | {ritmo:.1f} anuncios/min")
+    
+    return results
+
+def extract_ads_pipelined(browser, ad_urls, account_name, num_parsers=PIPELINE_PARSERS):
+    """
+    PIPELINE: el navegador captura el anuncio N+1 mientras un hilo parsea el snapshot N
+    Tiempo por anuncio ~ max(navegador, parseo) en lugar de la suma
+    Resultados en el mismo orden que ad_urls (None = fallo, AD_DEFERRED = aplazado)
+    """
+    stats = {'navegador': 0.0, 'parseo': 0.0}
+    stats_lock = threading.Lock()
+    
+    def parse(captured):
+        start = time.time()
+        ad_data = ad_from_capture(captured)
+        journal_ad(ad_data)
+        with stats_lock:
+            stats['parseo'] += time.time() - start
+        return ad_data
+    
+    start = time.time()
+    futures = [None] * len(ad_urls)
+    with ThreadPoolExecutor(max_workers=num_parsers) as parser:
+        for idx, ad_url in enumerate(tqdm(ad_urls, desc=f"Extrayendo {account_name} (pipeline)", colour="green")):
+            try:
+                captured = browser.run_page(run_ad_with_deadline, ad_url, account_name, capture_ad)
+            except AdDeadlineExceeded:
+                futures[idx] = AD_DEFERRED
+                continue
+            except Exception:
+                captured = None
+            
+            if captured is not None:
+                stats['navegador'] += captured['tiempo_navegador']
+                futures[idx] = parser.submit(parse, captured)
+    
+    results = []
+    for future in futures:
+        if future is None or future is AD_DEFERRED:
+            results.append(future)
+            continue
+        try:
+            results.append(future.result())
+        except Exception:
+            results.append(None)
+    
+    elapsed = time.time() - start
+    en_serie = stats['navegador'] + stats['parseo']
+    print(f"[PIPELINE] {account_name}: navegador {stats['navegador']:.1f}s + parseo {stats['parseo']:.1f}s = {en_serie:.1f}s en serie | real {elapsed:.1f}s")
+    return results
+
+# La pestaña ya muestra el anuncio pedido (aunque le falten titulo o precio)
+TAB_ON_AD_SCRIPT = "return location.href.indexOf(arguments[0]) !== -1;"
+
+def extract_ads_multitab(browser, ad_urls, account_name, num_tabs=BROWSER_TABS):
+    """
+    MULTI-PESTAÑA: un solo Chrome con K pestañas cargando anuncios a la vez
+    - Cada pestaña navega con location.href (la llamada vuelve sin esperar la carga)
+    - Ronda entre pestañas: se extrae la primera que este lista y se le da la siguiente URL
+    - Cada pestaña tiene tab_timeout desde que empezo a cargar, captura incluida: si las
+      esperas se recortan el anuncio se aplaza en vez de frenar a las demas
+    - Entre rondas se comprueban los limites de paginas y RSS: las pestañas en curso
+      vuelven a la cola, se recicla Chrome y se abren de nuevo
+    - Resultados en el mismo orden que ad_urls (None = fallo, AD_DEFERRED = aplazado)
+    """
+    browser.ensure_fresh()
+    driver = browser.driver
+    tab_timeout = AD_DEADLINE or 10  # sin condicion de listo tras este tiempo: ver si es el anuncio
+    
+    results = [None] * len(ad_urls)
+    pending = deque(enumerate(ad_urls))
+    handles = []
+    tabs = {}
+    latencies = []
+    progress = tqdm(total=len(ad_urls), desc=f"Extrayendo {account_name} ({num_tabs} pestañas)", colour="green")
+    
+    def assign(handle):
+        """Siguiente URL a la pestaña (o la deja libre)"""
+        tabs[handle] = None
+        if not pending:
+            return
+        driver.switch_to.window(handle)
+        idx, ad_url = pending.popleft()
+        tabs[handle] = (idx, ad_url, time.time())  # antes de navegar: si Chrome cae, se aplaza
+        driver.execute_script("window.location.href = arguments[0];", ad_url)
+    
+    def open_tabs():
+        """Abre las pestañas en el navegador actual y les da URL"""
+        handles[:] = [driver.current_window_handle]
+        tabs.clear()
+        for _ in range(num_tabs - 1):
+            driver.switch_to.new_window('tab')
+            handles.append(driver.current_window_handle)
+            if BLOCK_RESOURCES:
+                red.enable_request_blocking(driver, BLOCK_RESOURCES, BLOCK_ALLOWLIST)
+        
+        for handle in handles:
+            assign(handle)
+    
+    try:
+        open_tabs()
+        
+        while any(tabs.values()):
+            extracted = False
+            recycle_reason = None
+            for handle in handles:
+                job = tabs[handle]
+                if job is None:
+                    continue
+                idx, ad_url, start = job
+                driver.switch_to.window(handle)
+                
+                expected = ad_url.split('/item/')[-1].split('?')[0]
+                try:
+                    ready = driver.execute_script(AD_READY_SCRIPT, expected, PRICE_ANY_XPATH)
+                except WebDriverException:
+                    ready = False
+                if not ready and time.time() - start < tab_timeout:
+                    continue
+                
+                try:
+                    on_ad = ready or driver.execute_script(TAB_ON_AD_SCRIPT, expected)
+                except WebDriverException:
+                    on_ad = False
+                
+                if not on_ad:
+                    # La pestaña sigue en el anuncio anterior, about:blank o una pagina de error:
+                    # extraer guardaria datos ajenos bajo esta URL. Se aplaza sin diario
+                    results[idx] = AD_DEFERRED
+                else:
+                    known = static_fields_for(ad_url)
+                    # Presupuesto de la pestaña: lo que quede de tab_timeout desde que empezo a cargar
+                    _ad_deadline.fin = start + tab_timeout
+                    _ad_deadline.recortado = False
+                    try:
+                        snapshot = capture_ad_snapshot(driver, wait_description=not known)
+                        check_ad_truncated()
+                        results[idx] = ad_from_capture({
+                            'url': ad_url,
+                            'cuenta': account_name,
+                            'known': known,
+                            'snapshot': snapshot,
+                            'tiempo_navegador': time.time() - start
+                        })
+                        journal_ad(results[idx])
+                    except AdDeadlineExceeded:
+                        results[idx] = AD_DEFERRED
+                    except WebDriverException as e:
+                        # Pestaña o navegador caidos: a la cola de reintentos (si Chrome cayo,
+                        # la siguiente llamada lo detecta y se aplaza todo lo que falte)
+                        print(f"[PESTAÑAS] Error de navegador en {ad_url}: {str(e)[:80]}")
+                        results[idx] = AD_DEFERRED
+                    except Exception as e:
+                        print(f"[PESTAÑAS] Error en {ad_url}: {str(e)[:80]}")
+                        results[idx] = None
+                    finally:
+                        _ad_deadline.fin = None
+                        _ad_deadline.recortado = False
+                
+                latencies.append(time.time() - start)
+                _record_ad_latency(latencies[-1])
+                browser.add_pages(1, latencies[-1:])
+                progress.update(1)
+                extracted = True
+                recycle_reason = recycle_reason or browser.recycle_reason()
+                assign(handle)
+            
+            if recycle_reason:
+                # Las pestañas en curso vuelven a la cola en su orden y se reabren en un Chrome nuevo
+                in_flight = sorted(job for job in tabs.values() if job)
+                for idx, ad_url, _ in reversed(in_flight):
+                    pending.appendleft((idx, ad_url))
+                browser.recycle(recycle_reason)
+                driver = browser.driver
+                open_tabs()
+            elif not extracted:
+                time.sleep(0.05)
+    
+    except WebDriverException as e:
+        # Navegador caido: lo que falte va a la cola de reintentos (run_page lo reinicia)
+        print(f"[PESTAÑAS] {account_name}: error de navegador, {len(pending) + sum(1 for job in tabs.values() if job)} anuncios aplazados: {str(e)[:80]}")
+        for job in tabs.values():
+            if job:
+                results[job[0]] = AD_DEFERRED
+        for idx, _ in pending:
+            results[idx] = AD_DEFERRED
+    
+    finally:
+        progress.close()
+        drain_network_events(driver)
+        for handle in handles[1:]:
+            try:
+                driver.switch_to.window(handle)
+                driver.close()
+            except Exception:
+                pass
+        try:
+            driver.switch_to.window(handles[0])
+        except Exception:
+            pass
+    
+    return results
+
+def benchmark_multitab(ad_urls, tab_counts=(1, 2, 4, 8)):
+    """Throughput y memoria (pico de RSS) del modo multi-pestaña para cada K"""
+    print(f"BENCHMARK MULTI-PESTAÑA ({len(ad_urls)} anuncios)")
+    for num_tabs in tab_counts:
+        browser = DriverLifecycle(f"benchmark K={num_tabs}")
+        try:
+            if safe_navigate(browser.driver, "https://es.wallapop.com"):
+                accept_cookies(browser.driver)
+            browser.rss_mb()
+            
+            start = time.time()
+            results = extract_ads_multitab(browser, ad_urls, "BENCHMARK", num_tabs)
+            elapsed = time.time() - start
+            
+            ok = sum(1 for ad_data in results if isinstance(ad_data, dict))
+            campos = sum(_fields_found(ad_data) for ad_data in results if isinstance(ad_data, dict))
+            rss_text = f"{browser.peak_rss_mb:.0f} MB" if browser.peak_rss_mb else "n/d"
+            print(f"• K={num_tabs}: {ok}/{len(ad_urls)} anuncios | {ok / (elapsed / 60):.1f} anuncios/min | pico RSS {rss_text} | campos {campos}/{len(ad_urls) * 5}")
+        finally:
+            browser.quit()
+
+def get_user_ads(browser, user_url, account_name, num_workers=None):
+    """
+    Procesa todos los anuncios con extraccion ULTRA ROBUSTA - OPTIMIZADA
+    browser: DriverLifecycle (recicla Chrome entre paginas si hace falta)
+    """
     print(f"\n[INFO] === PROCESANDO: {account_name} ===")
     print(f"[INFO] URL: {user_url}")
     
+    if num_workers is None:
+        num_workers = AD_WORKERS
+    
     all_ads = []
+    successful_ads = 0
+    failed_ads = 0
+    
+    # CONTADORES PARA MONITORING RAPIDO
+    calidad = {'precios_ok': 0, 'km_ok': 0, 'anos_ok': 0, 'ejemplos_mostrados': 0}
+    
+    def registrar_anuncio(ad_data):
+        # CONTEO PARA MONITORING
+        if ad_data['Precio'] != "No especificado":
+            calidad['precios_ok'] += 1
+        if ad_data['Kilometraje'] != "No especificado":
+            calidad['km_ok'] += 1
+        if ad_data['Ano'] != "No especificado":
+            calidad['anos_ok'] += 1
+        
+        # MOSTRAR EJEMPLOS DE LOS PRIMEROS 3 ANUNCIOS
+        if calidad['ejemplos_mostrados'] < 3:
+            print(f"[EJEMPLO {calidad['ejemplos_mostrados'] + 1}] {ad_data['Titulo'][:30]}... | {ad_data['Precio']} | {ad_data['Kilometraje']} | {ad_data['Ano']}")
+            calidad['ejemplos_mostrados'] += 1
+        
+        all_ads.append(ad_data)
+        procesados = len(all_ads)
+        
+        # MOSTRAR PROGRESO CADA 50 ANUNCIOS
+        if procesados % 50 == 0:
+            precio_pct = calidad['precios_ok'] / procesados * 100
+            km_pct = calidad['km_ok'] / procesados * 100
+            ano_pct = calidad['anos_ok'] / procesados * 100
+            print(f"[PROGRESO] {procesados} procesados | Precios: {precio_pct:.1f}% | KM: {km_pct:.1f}% | Años: {ano_pct:.1f}%")
     
     try:
+        # REANUDAR: cuenta ya completada en el diario de hoy, sin abrir el perfil
+        if JOURNAL is not None:
+            restored_ads = JOURNAL.completed_account_ads(account_name)
+            if restored_ads is not None:
+                print(f"[DIARIO] {account_name}: completada en el diario, {len(restored_ads)} anuncios recuperados")
+                claim_item_urls(JOURNAL.accounts_done[account_name], account_name)
+                for ad_data in restored_ads:
+                    registrar_anuncio(ad_data)
+                    successful_ads += 1
+                return all_ads
+        
+        browser.ensure_fresh()
+        driver = browser.driver
         if not safe_navigate(driver, user_url):
             print(f"[ERROR] No se pudo acceder al perfil")
             return all_ads
         
         accept_cookies(driver)
+        if early_return_navigation(driver):
+            wait_for_profile_ready(driver, user_url)
         
         # CARGA MÁS AGRESIVA de anuncios
         final_count = smart_load_all_ads(driver, expected_count=400, max_clicks=25)
         
-        ad_elements = driver.find_elements(By.XPATH, "//a[contains(@href, '/item/')]")
-        ad_urls = list(set([elem.get_attribute('href') for elem in ad_elements if elem.get_attribute('href')]))
+        # Lista deduplicada del recolector JS en una sola llamada
+        ad_urls = collect_all_item_links(driver)
+        events = drain_network_events(driver)
+        
+        # LISTADO POR RED: datos de las respuestas JSON (antes de salir del perfil)
+        listing = capture_listing_items(driver, events, account_name, ad_urls) if LISTING_CAPTURE else {}
+        ad_urls += [item['url'] for item in listing.values()]
+        
+        # URLs canonicas sin repetir (ni en la pagina ni en cuentas ya procesadas)
+        ad_urls = schedule_item_urls(ad_urls, account_name)
         
         print(f"[INFO] Enlaces únicos: {len(ad_urls)}")
         
-        successful_ads = 0
-        failed_ads = 0
+        # REANUDAR: anuncios ya extraidos en el diario de hoy
+        if JOURNAL is not None:
+            resultados = [JOURNAL.done_ad(ad_url) for ad_url in ad_urls]
+            recuperados = sum(1 for ad_data in resultados if ad_data is not None)
+            if recuperados:
+                print(f"[DIARIO] {account_name}: {recuperados} anuncios recuperados del diario")
+        else:
+            resultados = [None] * len(ad_urls)
+        
+        # LISTADO POR RED: completos sin visita; con titulo/año/km solo se refrescan estadisticas
+        if listing:
+            completos = parciales = 0
+            for idx, ad_url in enumerate(ad_urls):
+                item = listing.get(patrones.item_key(ad_url))
+                if item is None or resultados[idx] is not None:
+                    continue
+                resultados[idx] = ad_from_http_item(item, ad_url, account_name)
+                if resultados[idx] is not None:
+                    journal_ad(resultados[idx])
+                    completos += 1
+                else:
+                    fields = static_fields_from_listing(item)
+                    if fields:
+                        LISTING_STATIC[ad_url] = fields
+                        parciales += 1
+            print(f"[XHR] {account_name}: {completos} completos sin visitar | {parciales} solo estadisticas | {sum(1 for ad_data in resultados if ad_data is None) - parciales} extraccion completa")
         
-        # CONTADORES PARA MONITORING RAPIDO
-        precios_ok = 0
-        km_ok = 0
-        anos_ok = 0
-        ejemplos_mostrados = 0
+        # RUTA RAPIDA HTTP: Selenium solo para los anuncios sin JSON embebido
+        http_pendientes = [idx for idx, ad_data in enumerate(resultados) if ad_data is None]
+        if HTTP_FAST_PATH and http_pendientes:
+            http_urls = [ad_urls[idx] for idx in http_pendientes]
+            for idx, ad_data in zip(http_pendientes, extract_ads_via_http(http_urls, account_name)):
+                resultados[idx] = ad_data
+                journal_ad(ad_data)
+        pendientes = [idx for idx, ad_data in enumerate(resultados) if ad_data is None]
+        selenium_urls = [ad_urls[idx] for idx in pendientes]
         
-        for idx, ad_url in enumerate(tqdm(ad_urls, desc=f"Extrayendo {account_name}", colour="green")):
-            try:
-                if not safe_navigate(driver, ad_url):
-                    failed_ads += 1
+        if num_workers > 1 and len(selenium_urls) > 1:
+            # POOL DE NAVEGADORES: resultados fusionados en orden determinista
+            num_workers = min(num_workers, len(selenium_urls))
+            for idx, ad_data in zip(pendientes, extract_ads_with_worker_pool(browser, selenium_urls, account_name, num_workers)):
+                resultados[idx] = ad_data
+        elif BROWSER_TABS > 1 and len(selenium_urls) > 1:
+            # MULTI-PESTAÑA: concurrencia dentro de un solo navegador
+            for idx, ad_data in zip(pendientes, extract_ads_multitab(browser, selenium_urls, account_name)):
+                resultados[idx] = ad_data
+        elif PIPELINE_MODE and selenium_urls:
+            # PIPELINE: navegacion y parseo solapados
+            for idx, ad_data in zip(pendientes, extract_ads_pipelined(browser, selenium_urls, account_name)):
+                resultados[idx] = ad_data
+        else:
+            for idx, ad_url in zip(pendientes, tqdm(selenium_urls, desc=f"Extrayendo {account_name}", colour="green")):
+                try:
+                    resultados[idx] = browser.run_page(run_ad_with_deadline, ad_url, account_name)
+                    journal_ad(resultados[idx])
+                    
+                    # SIN DELAY entre anuncios para maxima velocidad
+                    
+                except AdDeadlineExceeded:
+                    resultados[idx] = AD_DEFERRED
+                except Exception as e:
                     continue
-                
-                # EXTRACCION ROBUSTA 
-                title = extract_title_robust(driver)
-                price = extract_price_robust(driver)
-                likes = extract_likes_robust(driver)
-                year, km = extract_year_and_km_robust(driver)
-                views = extract_views_robust(driver)
-                moto_id = create_moto_id(title, price, year, km)
-                
-                # CONTEO PARA MONITORING
-                if price != "No especificado":
-                    precios_ok += 1
-                if km != "No especificado":
-                    km_ok += 1
-                if year != "No especificado":
-                    anos_ok += 1
-                
-                # MOSTRAR EJEMPLOS DE LOS PRIMEROS 3 ANUNCIOS
-                if ejemplos_mostrados < 3:
-                    print(f"[EJEMPLO {ejemplos_mostrados + 1}] {title[:30]}... | {price} | {km} | {year}")
-                    ejemplos_mostrados += 1
-                
-                ad_data = {
-                    'ID_Moto': moto_id,
-                    'Cuenta': account_name,
-                    'Titulo': title,
-                    'Precio': price,
-                    'Ano': year,
-                    'Kilometraje': km,
-                    'Visitas': views,
-                    'Likes': likes,
-                    'URL': ad_url,
-                    'Fecha_Extraccion': datetime.now().strftime("%d/%m/%Y %H:%M")
-                }
-                
-                all_ads.append(ad_data)
-                successful_ads += 1
-                
-                # MOSTRAR PROGRESO CADA 50 ANUNCIOS
-                if successful_ads % 50 == 0:
-                    precio_pct = (precios_ok / successful_ads * 100) if successful_ads > 0 else 0
-                    km_pct = (km_ok / successful_ads * 100) if successful_ads > 0 else 0
-                    ano_pct = (anos_ok / successful_ads * 100) if successful_ads > 0 else 0
-                    print(f"[PROGRESO] {successful_ads} procesados | Precios: {precio_pct:.1f}% | KM: {km_pct:.1f}% | Años: {ano_pct:.1f}%")
-                
-                # SIN DELAY entre anuncios para maxima velocidad
-                
-            except Exception as e:
+        
+        # COLA DE REINTENTOS: anuncios lentos al final de la cuenta, con mas presupuesto
+        diferidos = [idx for idx, ad_data in enumerate(resultados) if ad_data is AD_DEFERRED]
+        if diferidos:
+            print(f"[PLAZO] {account_name}: {len(diferidos)} anuncios aplazados, reintento con {AD_RETRY_DEADLINE:.0f}s (0 = sin limite)")
+            for idx in diferidos:
+                try:
+                    resultados[idx] = browser.run_page(run_ad_with_deadline, ad_urls[idx], account_name, process_ad, AD_RETRY_DEADLINE)
+                    journal_ad(resultados[idx])
+                except Exception:
+                    resultados[idx] = None
+            recuperados = sum(1 for idx in diferidos if resultados[idx] is not None)
+            print(f"[PLAZO] {account_name}: {recuperados}/{len(diferidos)} recuperados en el reintento")
+        
+        for ad_data in resultados:
+            if ad_data is None:
                 failed_ads += 1
-                continue
+            else:
+                registrar_anuncio(ad_data)
+                successful_ads += 1
+        
+        if JOURNAL is not None:
+            JOURNAL.record_account(account_name, ad_urls)
     
     except Exception as e:
         print(f"[ERROR] Error procesando cuenta {account_name}: {str(e)}")
     
     # RESUMEN DETALLADO POR CUENTA
     if successful_ads > 0:
+        precios_ok = calidad['precios_ok']
+        km_ok = calidad['km_ok']
+        anos_ok = calidad['anos_ok']
         precio_pct = (precios_ok / successful_ads * 100)
         km_pct = (km_ok / successful_ads * 100)
         ano_pct = (anos_ok / successful_ads * 100)
@@ -899,6 +2518,66 @@ def get_user_ads(driver, user_url, account_name):
         
     return all_ads
 
+ACCOUNT_SIZES_FILE = os.path.join(CACHE_DIR, "account_sizes.json")
+
+def load_account_sizes():
+    """Lee el numero de anuncios por cuenta de la ejecucion anterior"""
+    try:
+        with open(ACCOUNT_SIZES_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except:
+        return {}
+
+def save_account_sizes(sizes):
+    """Guarda el numero de anuncios por cuenta para planificar la siguiente ejecucion"""
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        previous = load_account_sizes()
+        previous.update(sizes)
+        with open(ACCOUNT_SIZES_FILE, "w", encoding="utf-8") as f:
+            json.dump(previous, f, indent=2)
+    except Exception as e:
+        print(f"[AVISO] No se pudo guardar tamaño de cuentas: {str(e)}")
+
+def schedule_accounts(moto_accounts):
+    """
+    Orden de arranque: la cuenta mas grande primero (segun la ejecucion anterior)
+    Las cuentas sin historial van delante para no convertirse en la cola larga
+    """
+    sizes = load_account_sizes()
+    names = list(moto_accounts.keys())
+    return sorted(names, key=lambda name: (name in sizes, -sizes.get(name, 0), names.index(name)))
+
+def process_account_with_own_browser(account_name, account_url):
+    """Procesa una cuenta completa con su propio navegador (modo concurrente)"""
+    account_browser = DriverLifecycle(account_name)
+    try:
+        return get_user_ads(account_browser, account_url, account_name)
+    finally:
+        account_browser.quit()
+
+def process_accounts_concurrently(moto_accounts, num_workers):
+    """
+    PLANIFICADOR DE CUENTAS: varias cuentas a la vez, la mas grande primero
+    Devuelve los anuncios de cada cuenta en el mismo orden que moto_accounts
+    """
+    order = schedule_accounts(moto_accounts)
+    print(f"[PLANIFICADOR] {num_workers} cuentas en paralelo | Orden: {', '.join(order)}")
+    
+    results = {}
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        futures = {name: executor.submit(process_account_with_own_browser, name, moto_accounts[name]) for name in order}
+        
+        for name in order:
+            try:
+                results[name] = futures[name].result()
+                print(f"[RESUMEN] {name}: {len(results[name])} anuncios procesados")
+            except Exception as e:
+                print(f"[ERROR] Error procesando {name}: {str(e)}")
+                results[name] = []
+    
+    return [results[name] for name in moto_accounts]
+
 def extraer_km_para_ordenar(km_str):
     """Extrae valor numérico de kilómetros para ordenar correctamente"""
     try:
@@ -914,8 +2593,53 @@ def extraer_km_para_ordenar(km_str):
     except:
         return 999999
 
-def main():
-    """Funcion principal del scraper automatizado - CORREGIDA"""
+def _fields_found(ad_data):
+    """Campos extraidos de un anuncio (titulo, precio, año, km, visitas)"""
+    if not ad_data:
+        return 0
+    return sum([
+        ad_data['Titulo'] != "Titulo no encontrado",
+        ad_data['Precio'] != "No especificado",
+        ad_data['Ano'] != "No especificado",
+        ad_data['Kilometraje'] != "No especificado",
+        bool(ad_data['Visitas']),
+    ])
+
+def benchmark_page_load_strategies(ad_urls, strategies=('normal', 'eager', 'none')):
+    """Latencia por pagina y campos completos con cada estrategia de carga de Chrome"""
+    print(f"BENCHMARK ESTRATEGIA DE CARGA ({len(ad_urls)} anuncios, extraccion {EXTRACTION_MODE})")
+    for strategy in strategies:
+        driver = setup_browser(page_load_strategy=strategy)
+        try:
+            if safe_navigate(driver, "https://es.wallapop.com"):
+                accept_cookies(driver)
+            
+            latencies = []
+            campos = 0
+            for ad_url in ad_urls:
+                start = time.time()
+                try:
+                    ad_data = process_ad(driver, ad_url, "BENCHMARK")
+                except Exception:
+                    ad_data = None
+                latencies.append(time.time() - start)
+                campos += _fields_found(ad_data)
+            
+            latencies.sort()
+            total_campos = len(ad_urls) * 5
+            print(f"• {strategy:6s}: p50 {percentile(latencies, 50):.2f}s | p95 {percentile(latencies, 95):.2f}s | media {sum(latencies)/len(latencies):.2f}s | campos {campos}/{total_campos} ({campos/total_campos*100:.1f}%)")
+        finally:
+            try:
+                driver.quit()
+            except:
+                pass
+
+def main(resume=False):
+    """
+    Funcion principal del scraper automatizado - CORREGIDA
+    resume: reanuda la extraccion de hoy desde el diario local
+    """
+    global JOURNAL
     print("="*80)
     print("    SCRAPER - VERSION CORREGIDA COMPLETA")
     print("="*80)
@@ -926,6 +2650,8 @@ def main():
     print("   • Logs de debug para verificar extracción")
     print()
     
+    browser = None
+    
     try:
         # Configurar Google Sheets
         credentials_json = os.getenv('GOOGLE_CREDENTIALS_JSON')
@@ -955,31 +2681,63 @@ def main():
         test_mode = os.getenv('TEST_MODE', 'false').lower() == 'true'
         moto_accounts = get_moto_accounts(test_mode)
         
-        print(f"[INFO] Inicializando navegador...")
-        driver = setup_browser()
+        if STATS_REFRESH:
+            KNOWN_ADS.update(load_known_ads(gs_handler))
+        
+        # DIARIO: cada anuncio queda en disco al extraerse (reanudable con --resume)
+        JOURNAL = ScrapeJournal(datetime.now().strftime("%Y-%m-%d"), resume=resume)
         
         all_results = []
+        account_results = []
+        account_sizes = {}
+        ACCOUNT_ORDER.update({name: rank for rank, name in enumerate(moto_accounts)})
         
         print(f"[INFO] Procesando {len(moto_accounts)} cuentas")
+        print(f"[INFO] Navegadores por cuenta: {AD_WORKERS} | Extraccion: {EXTRACTION_MODE}")
         
         start_time = time.time()
         
-        for account_name, account_url in moto_accounts.items():
-            print(f"\n{'='*60}")
-            print(f"PROCESANDO: {account_name}")
-            print(f"{'='*60}")
+        if ACCOUNT_WORKERS > 1 and len(moto_accounts) > 1:
+            # Cuentas independientes: cada una con su navegador
+            num_workers = min(ACCOUNT_WORKERS, len(moto_accounts))
+            account_results = list(zip(moto_accounts, process_accounts_concurrently(moto_accounts, num_workers)))
+        else:
+            print(f"[INFO] Inicializando navegador...")
+            browser = DriverLifecycle()
             
-            try:
-                account_ads = get_user_ads(driver, account_url, account_name)
-                all_results.extend(account_ads)
-                
-                print(f"[RESUMEN] {account_name}: {len(account_ads)} anuncios procesados")
-                
-                time.sleep(1)  # Entre cuentas
+            for account_name, account_url in moto_accounts.items():
+                print(f"\n{'='*60}")
+                print(f"PROCESANDO: {account_name}")
+                print(f"{'='*60}")
                 
-            except Exception as e:
-                print(f"[ERROR] Error procesando {account_name}: {str(e)}")
-                continue
+                try:
+                    account_ads = get_user_ads(browser, account_url, account_name)
+                    account_results.append((account_name, account_ads))
+                    
+                    print(f"[RESUMEN] {account_name}: {len(account_ads)} anuncios procesados")
+                    
+                    time.sleep(1)  # Entre cuentas
+                    
+                except Exception as e:
+                    print(f"[ERROR] Error procesando {account_name}: {str(e)}")
+                    continue
+        
+        # Anuncios repetidos entre cuentas: se quedan en la primera segun la configuracion
+        for account_name, account_ads in resolve_item_owners(account_results):
+            all_results.extend(account_ads)
+            account_sizes[account_name] = len(account_ads)
+        
+        save_account_sizes({name: size for name, size in account_sizes.items() if size > 0})
+        save_load_more_stats()
+        if all_results:
+            save_known_ads(all_results)
+        print_wait_report()
+        print_load_more_report()
+        print_refresh_report()
+        print_dedup_report()
+        red.NETWORK_STATS.print_report()
+        print_lifecycle_report()
+        print_latency_report()
         
         # Procesar y subir resultados
         if all_results:
@@ -1051,8 +2809,10 @@ def main():
             print(f"\n[INFO] Subiendo datos a Google Sheets...")
             
             success, sheet_name = gs_handler.subir_datos_scraper(df, fecha_extraccion)
+            gs_handler.mostrar_estadisticas_api()
             
             if success:
+                JOURNAL.finish()
                 print(f"EXITO: Datos subidos correctamente a {sheet_name}")
                 print(f"ORDENAMIENTO: Por kilómetros de más a menos KM")
                 print(f"URL: https://docs.google.com/spreadsheets/d/{sheet_id}")
@@ -1072,14 +2832,36 @@ def main():
         return False
     
     finally:
-        try:
-            driver.quit()
-        except:
-            pass
+        if browser is not None:
+            browser.quit()
+        if JOURNAL is not None:
+            JOURNAL.close()
         
         print(f"\nScraper completado!")
         return True
 
 if __name__ == "__main__":
-    success = main()
+    parser = argparse.ArgumentParser(description="Scraper de motos -> Google Sheets")
+    parser.add_argument('--resume', action='store_true',
+                        help="Reanuda la extraccion de hoy: no repite anuncios ya guardados en el diario")
+    parser.add_argument('--benchmark-page-load', nargs='+', metavar='URL',
+                        help="Compara normal/eager/none sobre estas URLs de anuncio (o un fichero con una por linea)")
+    parser.add_argument('--benchmark-tabs', nargs='+', metavar='URL',
+                        help="Throughput y RSS con 1, 2, 4 y 8 pestañas sobre estas URLs (o un fichero)")
+    args = parser.parse_args()
+    
+    def benchmark_urls(urls):
+        if len(urls) == 1 and not urls[0].startswith('http'):
+            with open(urls[0], encoding='utf-8') as f:
+                return [line.strip() for line in f if line.strip()]
+        return urls
+    
+    if args.benchmark_page_load:
+        benchmark_page_load_strategies(benchmark_urls(args.benchmark_page_load))
+        sys.exit(0)
+    if args.benchmark_tabs:
+        benchmark_multitab(benchmark_urls(args.benchmark_tabs))
+        sys.exit(0)
+    
+    success = main(resume=args.resume or RESUME)
     sys.exit(0 if success else 1)
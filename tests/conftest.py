@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Los modulos viven en scr/ y se importan entre si por nombre (como al ejecutar desde scr/)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scr'))
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
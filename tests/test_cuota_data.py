@@ -0,0 +1,69 @@
+"""
+Reintentos del cliente de cuota: un 5xx solo se repite si la llamada es idempotente
+"""
+
+import json
+
+import pytest
+from gspread.exceptions import APIError
+from requests import Response
+
+import cuota_data
+from cuota_data import QuotaHTTPClient, is_idempotent
+
+SHEET_URL = 'https://sheets.googleapis.com/v4/spreadsheets/abc'
+
+def make_response(status):
+    response = Response()
+    response.status_code = status
+    response._content = json.dumps({'error': {'code': status, 'message': 'fallo', 'status': 'X'}}).encode()
+    return response
+
+class FakeSession:
+    """Responde con los codigos dados en orden y guarda las llamadas"""
+
+    def __init__(self, *statuses):
+        self.statuses = list(statuses)
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url))
+        return make_response(self.statuses.pop(0))
+
+@pytest.fixture(autouse=True)
+def no_wait(monkeypatch):
+    monkeypatch.setattr(cuota_data.time, 'sleep', lambda seconds: None)
+    monkeypatch.setattr(cuota_data, 'SHEETS_MAX_RETRIES', 3)
+
+@pytest.mark.parametrize('method, endpoint, expected', [
+    ('GET', SHEET_URL, True),
+    ('PUT', SHEET_URL + '/values/Hoja1!A1', True),
+    ('POST', SHEET_URL + '/values:batchUpdate', True),
+    ('POST', SHEET_URL + '/values/Hoja1:clear', True),
+    ('POST', SHEET_URL + ':batchUpdate', False),
+    ('POST', SHEET_URL + '/values/Hoja1!A1:append', False),
+])
+def test_is_idempotent(method, endpoint, expected):
+    assert is_idempotent(method, endpoint) is expected
+
+def test_values_write_is_retried_on_5xx():
+    session = FakeSession(503, 200)
+    client = QuotaHTTPClient(None, session)
+
+    assert client.request('PUT', SHEET_URL + '/values/Hoja1!A1').ok
+    assert len(session.calls) == 2
+
+def test_add_sheet_is_not_retried_on_5xx():
+    session = FakeSession(503, 200)
+    client = QuotaHTTPClient(None, session)
+
+    with pytest.raises(APIError):
+        client.request('POST', SHEET_URL + ':batchUpdate')
+    assert len(session.calls) == 1
+
+def test_add_sheet_is_retried_on_quota_error():
+    session = FakeSession(429, 200)
+    client = QuotaHTTPClient(None, session)
+
+    assert client.request('POST', SHEET_URL + ':batchUpdate').ok
+    assert len(session.calls) == 2
@@ -0,0 +1,38 @@
+"""
+Reparto de anuncios repetidos entre cuentas: siempre la primera en la configuracion
+"""
+
+import pytest
+
+import scraper_data
+from scraper_data import claim_item_urls, resolve_item_owners
+
+HONDA = 'https://es.wallapop.com/item/honda-cbr500r-1001'
+YAMAHA = 'https://es.wallapop.com/item/yamaha-mt07-1002'
+
+@pytest.fixture(autouse=True)
+def account_order(monkeypatch):
+    monkeypatch.setattr(scraper_data, 'ITEM_OWNERS', {})
+    monkeypatch.setattr(scraper_data, 'ACCOUNT_ORDER', {'primera': 0, 'segunda': 1})
+    monkeypatch.setitem(scraper_data.DEDUP_STATS, 'reasignados', 0)
+
+def test_claim_skips_items_of_an_earlier_account():
+    assert claim_item_urls([HONDA], 'primera') == [HONDA]
+    assert claim_item_urls([HONDA, YAMAHA], 'segunda') == [YAMAHA]
+
+def test_claim_does_not_depend_on_which_account_finishes_first():
+    # La segunda cuenta llega antes (paralelo): la primera lo sigue reclamando
+    assert claim_item_urls([HONDA], 'segunda') == [HONDA]
+    assert claim_item_urls([HONDA], 'primera') == [HONDA]
+    assert claim_item_urls([HONDA], 'segunda') == []
+
+def test_resolve_keeps_the_earlier_account_copy():
+    resueltos = resolve_item_owners([
+        ('primera', [{'URL': HONDA, 'Cuenta': 'primera'}]),
+        ('segunda', [{'URL': HONDA, 'Cuenta': 'segunda'}, {'URL': YAMAHA, 'Cuenta': 'segunda'}]),
+    ])
+
+    assert [(name, [ad['URL'] for ad in ads]) for name, ads in resueltos] == [
+        ('primera', [HONDA]), ('segunda', [YAMAHA]),
+    ]
+    assert scraper_data.DEDUP_STATS['reasignados'] == 1
@@ -0,0 +1,60 @@
+"""
+Data_Historico por diferencias: tras aplicar el delta la hoja queda igual que con
+la escritura completa (motos nuevas en su posicion por KM, no al final)
+"""
+
+import pandas as pd
+
+from google_sheets_data import GoogleSheetsData
+
+CABECERA = ['URL', 'Titulo', 'Kilometraje', 'Estado', 'Visitas_17/10/26']
+
+def ad_url(slug):
+    return f'https://es.wallapop.com/item/{slug}'
+
+def handler_with_grid(grid):
+    handler = GoogleSheetsData.__new__(GoogleSheetsData)
+    handler.historico_grid = grid
+    return handler
+
+def apply_delta(grid, inserciones, rangos):
+    """Aplica inserciones y rangos como lo haria el API sobre una copia del grid"""
+    filas = [list(fila) for fila in grid]
+    for inicio, cantidad in inserciones:
+        filas[inicio:inicio] = [[] for _ in range(cantidad)]
+    for fila, columna, valores in rangos:
+        for i, valores_fila in enumerate(valores):
+            destino = filas[fila - 1 + i]
+            destino.extend([''] * (columna - 1 + len(valores_fila) - len(destino)))
+            destino[columna - 1:columna - 1 + len(valores_fila)] = valores_fila
+    return filas
+
+GRID = [
+    CABECERA,
+    [ad_url('honda-1'), 'Honda', '30.000 km', 'activa', '10'],
+    [ad_url('yamaha-3'), 'Yamaha', '10.000 km', 'activa', '5'],
+]
+
+def historico(km_yamaha='10.000 km'):
+    return pd.DataFrame([
+        [ad_url('honda-1'), 'Honda', '30.000 km', 'activa', '10', '12'],
+        [ad_url('suzuki-2'), 'Suzuki', '20.000 km', 'activa', '', '1'],
+        [ad_url('yamaha-3'), 'Yamaha', km_yamaha, 'activa', '5', '7'],
+        [ad_url('bmw-4'), 'BMW', '5.000 km', 'activa', '', '2'],
+    ], columns=CABECERA + ['Visitas_18/10/26'])
+
+def test_new_ads_are_inserted_in_km_order():
+    handler = handler_with_grid(GRID)
+    df = historico()
+
+    inserciones, rangos, num_filas, num_columnas, _ = handler.calcular_delta_historico(df)
+
+    assert inserciones == [(2, 1), (4, 1)]
+    assert (num_filas, num_columnas) == (5, 6)
+    esperado = [list(df.columns)] + df.values.tolist()
+    assert apply_delta(GRID, inserciones, rangos) == esperado
+
+def test_existing_ads_that_change_order_fall_back_to_full_write():
+    handler = handler_with_grid(GRID)
+
+    assert handler.calcular_delta_historico(historico(km_yamaha='40.000 km')) is None
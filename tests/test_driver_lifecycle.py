@@ -0,0 +1,59 @@
+"""
+DriverLifecycle.run_page: un timeout es una pagina fallida, una caida reinicia Chrome
+"""
+
+import pytest
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from scraper_data import DriverLifecycle
+
+class FakeLifecycle(DriverLifecycle):
+    """DriverLifecycle sin Chrome: cuenta reciclajes y simula si el navegador sigue vivo"""
+
+    def __init__(self, alive):
+        self.name = 'test'
+        self.max_pages = 0
+        self.max_rss_mb = 0
+        self.driver = object()
+        self.pages = 0
+        self.pages_since_start = 0
+        self.latencies = []
+        self.recycles = []
+        self.alive = alive
+
+    def is_alive(self):
+        return self.alive
+
+    def recycle(self, reason):
+        self.recycles.append(reason)
+        self.alive = True
+
+def failing_page(error):
+    calls = []
+
+    def page(driver):
+        calls.append(driver)
+        if len(calls) == 1:
+            raise error
+        return 'ok'
+    return page, calls
+
+def test_timeout_is_a_failed_page_without_restart():
+    browser = FakeLifecycle(alive=True)
+    page, calls = failing_page(TimeoutException('page load'))
+
+    assert browser.run_page(page) is None
+    assert len(calls) == 1
+    assert browser.recycles == []
+    assert browser.pages == 1
+
+@pytest.mark.parametrize('alive, expected, recycles', [
+    (False, 'ok', ['caida del navegador']),
+    (True, None, []),
+])
+def test_webdriver_error_restarts_only_a_dead_browser(alive, expected, recycles):
+    browser = FakeLifecycle(alive=alive)
+    page, calls = failing_page(WebDriverException('session deleted'))
+
+    assert browser.run_page(page) == expected
+    assert browser.recycles == recycles
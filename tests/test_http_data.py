@@ -0,0 +1,85 @@
+"""
+Ruta rapida HTTP contra un servidor local que sirve paginas /item/ grabadas
+Los campos deben salir con el mismo formato que la extraccion por Selenium
+"""
+
+import functools
+import os
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from conftest import FIXTURES_DIR
+from http_data import HttpItemFetcher, _number_value
+from scraper_data import ad_from_http_item
+
+ITEMS_DIR = os.path.join(FIXTURES_DIR, 'items')
+
+# Campos que da la extraccion por Selenium en estas mismas paginas
+SELENIUM_FIELDS = {
+    'honda-cbr500r-1001.html': {
+        'Titulo': 'Honda CBR500R ABS', 'Precio': '4.990 €', 'Ano': '2018',
+        'Kilometraje': '25.000 km', 'Visitas': 1234, 'Likes': 17,
+    },
+    'yamaha-mt07-1002.html': {
+        'Titulo': 'Yamaha MT-07', 'Precio': '5.990 €', 'Ano': '2021',
+        'Kilometraje': '12.400 km', 'Visitas': 1050, 'Likes': 3,
+    },
+}
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture(scope='module')
+def item_server():
+    handler = functools.partial(QuietHandler, directory=ITEMS_DIR)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+def test_http_items_match_selenium_fields(item_server):
+    names = sorted(SELENIUM_FIELDS)
+    urls = [f"{item_server}/{name}" for name in names]
+
+    fetcher = HttpItemFetcher(max_connections=2, timeout=5)
+    items = fetcher.fetch_many(urls)
+
+    assert fetcher.stats['con_json'] == len(names)
+    for name, url, item in zip(names, urls, items):
+        ad_data = ad_from_http_item(item, url, 'CUIMO.1')
+        assert ad_data is not None, name
+        extracted = {field: ad_data[field] for field in SELENIUM_FIELDS[name]}
+        assert extracted == SELENIUM_FIELDS[name], name
+        assert ad_data['URL'] == url
+        assert ad_data['Cuenta'] == 'CUIMO.1'
+
+def test_missing_page_falls_back_to_selenium(item_server):
+    fetcher = HttpItemFetcher(max_connections=1, timeout=5)
+    assert fetcher.fetch_item(f"{item_server}/no-existe-9999.html") is None
+    assert fetcher.stats['errores'] == 1
+
+def test_close_releases_pooled_connections(item_server):
+    fetcher = HttpItemFetcher(max_connections=1, timeout=5)
+    fetcher.fetch_item(f"{item_server}/honda-cbr500r-1001.html")
+    assert len(fetcher.pool.pools) == 1
+
+    fetcher.close()
+    assert len(fetcher.pool.pools) == 0
+
+@pytest.mark.parametrize('text, expected', [
+    ('7.690 €', 7690),
+    ('3,500', 3500),
+    ('3500.50', 3500),
+    ('1.234,5', 1234),
+    ('1,234.56', 1234),
+    ('25.000 km', 25000),
+    ('1.234.567', 1234567),
+    ('sin precio', None),
+])
+def test_number_value_decimal_separators(text, expected):
+    assert _number_value(text) == expected
@@ -0,0 +1,75 @@
+"""
+Listado por red con respuestas JSON grabadas del API de Wallapop
+Solo cuentan las respuestas /api/v3/users/<id>/items del vendedor del perfil
+"""
+
+import os
+
+from conftest import FIXTURES_DIR
+from http_data import parse_listing_payload
+from scraper_data import capture_listing_items
+
+LISTING_DIR = os.path.join(FIXTURES_DIR, 'listing')
+USER_ITEMS_URL = 'https://api.wallapop.com/api/v3/users/u123/items?since=0'
+RECOMMENDATIONS_URL = 'https://api.wallapop.com/api/v3/search/recommendations?item_id=p1001'
+OTHER_USER_URL = 'https://api.wallapop.com/api/v3/users/u999/items'
+
+def read_fixture(name):
+    with open(os.path.join(LISTING_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+class FakeDriver:
+    """Devuelve los cuerpos grabados a Network.getResponseBody"""
+
+    def __init__(self, bodies):
+        self.bodies = bodies
+
+    def execute_cdp_cmd(self, cmd, params):
+        assert cmd == 'Network.getResponseBody'
+        return {'body': self.bodies[params['requestId']], 'base64Encoded': False}
+
+def response_event(request_id, url, mime_type='application/json'):
+    return {
+        'method': 'Network.responseReceived',
+        'params': {'requestId': request_id, 'response': {'url': url, 'mimeType': mime_type}},
+    }
+
+def test_parse_listing_payload_fields():
+    items = {item['url']: item for item in parse_listing_payload(read_fixture('user-u123-items.json'))}
+
+    honda = items['https://es.wallapop.com/item/honda-cbr500r-1001']
+    assert honda['vendedor'] == 'u123'
+    assert honda['title'] == 'Honda CBR500R ABS'
+    assert (honda['price'], honda['km'], honda['year']) == (4990.0, 25000, 2018)
+    assert (honda['views'], honda['likes']) == (1234, 17)
+    assert items['https://es.wallapop.com/item/yamaha-mt07-1002']['price'] == 5990.5
+    assert items['https://es.wallapop.com/item/kawasaki-z650-9001']['vendedor'] == 'u999'
+
+def test_parse_listing_payload_rejects_invalid_json():
+    assert parse_listing_payload('<html>no es json</html>') == []
+
+def test_capture_keeps_only_the_profile_seller():
+    driver = FakeDriver({
+        '1': read_fixture('user-u123-items.json'),
+        '2': read_fixture('recommendations.json'),
+        '3': read_fixture('recommendations.json'),
+    })
+    events = [
+        response_event('1', USER_ITEMS_URL),
+        response_event('2', RECOMMENDATIONS_URL),
+        response_event('3', USER_ITEMS_URL, mime_type='text/html'),
+    ]
+    dom_urls = ['https://es.wallapop.com/item/honda-cbr500r-1001']
+
+    items = capture_listing_items(driver, events, 'cuenta', dom_urls)
+
+    # Fuera: el anuncio de u999 dentro de la respuesta, las recomendaciones y lo que no es JSON
+    assert sorted(items) == ['honda-cbr500r-1001', 'yamaha-mt07-1002']
+
+def test_capture_ignores_listings_that_do_not_match_the_profile():
+    driver = FakeDriver({'1': read_fixture('user-u123-items.json')})
+    events = [response_event('1', OTHER_USER_URL)]
+    dom_urls = ['https://es.wallapop.com/item/honda-cbr500r-1001']
+
+    # La respuesta dice ser de u999 pero sus anuncios de u999 no estan en el perfil
+    assert capture_listing_items(driver, events, 'cuenta', dom_urls) == {}
@@ -0,0 +1,29 @@
+"""
+Estadisticas de selectores de "Ver más": el final normal del perfil no cuenta como fallo
+"""
+
+import pytest
+
+import scraper_data
+from scraper_data import find_and_click_load_more
+
+@pytest.fixture(autouse=True)
+def clean_stats(monkeypatch):
+    monkeypatch.setattr(scraper_data, 'LOAD_MORE_STATS', {})
+    monkeypatch.setattr(scraper_data, 'LOAD_MORE_USAGE', {'clics': 0, 'busquedas': 0, 'cache_directa': 0})
+    monkeypatch.setattr(scraper_data, '_load_more_state', {'cargado': True, 'ultimo': None})
+    monkeypatch.setattr(scraper_data, 'find_all', lambda driver, by, selector, field: [])
+
+def test_no_button_at_the_end_of_the_profile_records_nothing(monkeypatch):
+    monkeypatch.setattr(scraper_data, 'wait_for_load_more_button', lambda driver: False)
+
+    assert find_and_click_load_more(None) is None
+    assert scraper_data.LOAD_MORE_STATS == {}
+    assert scraper_data.LOAD_MORE_USAGE['busquedas'] == 0
+
+def test_button_present_but_not_matched_records_misses(monkeypatch):
+    monkeypatch.setattr(scraper_data, 'wait_for_load_more_button', lambda driver: True)
+
+    assert find_and_click_load_more(None) is None
+    assert scraper_data.LOAD_MORE_STATS
+    assert all(stats == {'aciertos': 0, 'fallos': 1} for stats in scraper_data.LOAD_MORE_STATS.values())
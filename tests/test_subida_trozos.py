@@ -0,0 +1,78 @@
+"""
+Subida por trozos: cada trozo se escribe en su rango y lo que sobra de la tabla
+anterior solo se borra cuando todos estan confirmados
+"""
+
+import pandas as pd
+import pytest
+
+import google_sheets_data
+from google_sheets_data import GoogleSheetsData
+
+class FakeWorksheet:
+    """Hoja en memoria con el grid y las llamadas que hace la subida"""
+
+    def __init__(self, rows, cols, fallos=0):
+        self.title = 'SCR 18/10/26'
+        self.row_count = rows
+        self.col_count = cols
+        self.fallos = fallos
+        self.escrituras = []
+        self.llamadas = []
+
+    def update(self, filas, rango='A1'):
+        if self.fallos:
+            self.fallos -= 1
+            raise Exception('503 fallo temporal')
+        self.escrituras.append((rango, filas))
+        self.llamadas.append('update')
+
+    def clear(self):
+        self.llamadas.append('clear')
+
+    def batch_clear(self, rangos):
+        self.llamadas.append(('batch_clear', rangos))
+
+    def resize(self, rows, cols):
+        self.row_count, self.col_count = rows, cols
+
+@pytest.fixture
+def handler(monkeypatch):
+    monkeypatch.setattr(google_sheets_data, 'SHEETS_UPLOAD_WORKERS', 1)
+    return GoogleSheetsData.__new__(GoogleSheetsData)
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({'Titulo': [f'Moto {i}' for i in range(10)], 'Likes': list(range(10))})
+
+def test_single_request_when_chunking_is_off(monkeypatch, handler, df):
+    monkeypatch.setattr(google_sheets_data, 'SHEETS_CHUNK_MB', 0)
+    worksheet = FakeWorksheet(rows=50, cols=5)
+
+    handler.subir_tabla(worksheet, df)
+
+    assert worksheet.llamadas == ['clear', 'update']
+    assert worksheet.escrituras[0][1] == [['Titulo', 'Likes']] + df.values.tolist()
+
+def test_chunks_cover_the_table_and_clear_the_rest_last(monkeypatch, handler, df):
+    monkeypatch.setattr(google_sheets_data, 'SHEETS_CHUNK_MB', 60 / 1024 / 1024)
+    worksheet = FakeWorksheet(rows=50, cols=5, fallos=1)
+
+    handler.subir_tabla(worksheet, df)
+
+    filas = {}
+    for rango, trozo in worksheet.escrituras:
+        inicio = int(rango[1:])
+        filas.update({inicio + i: fila for i, fila in enumerate(trozo)})
+    assert len(worksheet.escrituras) > 1
+    assert [filas[i] for i in sorted(filas)] == [['Titulo', 'Likes']] + df.values.tolist()
+    assert worksheet.llamadas[-1] == ('batch_clear', ['A12:E50', 'C1:E11'])
+    assert 'clear' not in worksheet.llamadas
+
+def test_failed_upload_keeps_the_previous_table(monkeypatch, handler, df):
+    monkeypatch.setattr(google_sheets_data, 'SHEETS_CHUNK_MB', 60 / 1024 / 1024)
+    worksheet = FakeWorksheet(rows=50, cols=5, fallos=100)
+
+    with pytest.raises(Exception, match='incompleta'):
+        handler.subir_tabla(worksheet, df)
+    assert worksheet.llamadas == []